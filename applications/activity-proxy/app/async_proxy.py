@@ -0,0 +1,115 @@
+#
+# Copyright (c) 2019 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import asyncio
+import json
+import logging
+
+from aiohttp import web, ClientSession, TCPConnector, ClientTimeout
+from multidict import CIMultiDict
+from yarl import URL
+
+import database
+from models import InactivityResponse
+
+logging.basicConfig(level=logging.INFO)
+
+redirect_to = 'http://127.0.0.1:{}/'.format('6006')
+
+CHUNK_SIZE = 64 * 1024
+
+# maximal number of connections (kept alive between requests) to the upstream server
+CONNECTIONS_LIMIT = 32
+
+# headers describing a single connection - they must not be passed by a proxy (RFC 7230, section 6.1)
+HOP_BY_HOP_HEADERS = {'connection', 'keep-alive', 'proxy-authenticate', 'proxy-authorization', 'te', 'trailer',
+                      'transfer-encoding', 'upgrade'}
+
+CLIENT_SESSION_KEY = 'client_session'
+
+
+database.init_db()
+
+
+def filter_headers(headers) -> CIMultiDict:
+    connection_headers = {value.strip().lower() for value in headers.get('Connection', '').split(',')}
+
+    return CIMultiDict((key, value) for key, value in headers.items()
+                       if key.lower() not in HOP_BY_HOP_HEADERS and key.lower() not in connection_headers)
+
+
+async def proxy(request: web.Request) -> web.StreamResponse:
+    headers = filter_headers(request.headers)
+    headers.pop('Host', None)
+
+    # path and query are passed as they were received - without decoding and encoding them again
+    final_url = URL(redirect_to.rstrip('/') + request.rel_url.raw_path_qs, encoded=True)
+
+    session: ClientSession = request.app[CLIENT_SESSION_KEY]
+
+    async with session.request(request.method, final_url,
+                               data=request.content if request.body_exists else None,
+                               headers=headers,
+                               allow_redirects=False) as upstream_response:
+        response = web.StreamResponse(status=upstream_response.status, reason=upstream_response.reason,
+                                      headers=filter_headers(upstream_response.headers))
+        await response.prepare(request)
+
+        async for chunk in upstream_response.content.iter_chunked(CHUNK_SIZE):
+            await response.write(chunk)
+
+        await response.write_eof()
+
+    database.update_timestamp()
+
+    return response
+
+
+async def inactivity(request: web.Request) -> web.Response:
+    timestamp = await asyncio.get_event_loop().run_in_executor(None, database.get_timestamp)
+    response = InactivityResponse(last_request_datetime=timestamp)
+    return web.Response(text=json.dumps(response.to_dict()), content_type='application/json')
+
+
+async def healthz(request: web.Request) -> web.Response:
+    async with request.app[CLIENT_SESSION_KEY].get(redirect_to) as resp:
+        return web.Response(status=resp.status)
+
+
+async def create_client_session(app: web.Application):
+    # bodies of responses are passed without decompression, so Content-Encoding and Content-Length of
+    # upstream responses stay valid
+    app[CLIENT_SESSION_KEY] = ClientSession(connector=TCPConnector(limit=CONNECTIONS_LIMIT),
+                                            timeout=ClientTimeout(total=None), auto_decompress=False)
+
+
+async def close_client_session(app: web.Application):
+    await app[CLIENT_SESSION_KEY].close()
+
+
+def create_app() -> web.Application:
+    application = web.Application()
+    application.on_startup.append(create_client_session)
+    application.on_cleanup.append(close_client_session)
+
+    application.router.add_get('/inactivity', inactivity)
+    application.router.add_get('/healthz', healthz)
+    application.router.add_route('*', '/{url:.*}', proxy)
+
+    return application
+
+
+app = create_app()
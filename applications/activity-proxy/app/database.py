@@ -14,13 +14,28 @@
 # limitations under the License.
 #
 
+import atexit
 from datetime import datetime
+import logging
+import os
 import sqlite3
+import threading
+from time import sleep
+from typing import Optional
 
 DATABASE_FILENAME = 'proxy.db'
 
 DATETIME_STRING_FORMAT = '%d.%m.%Y %H:%M:%S'
 
+# last activity is kept in memory and saved in the database at most once per this interval (in seconds)
+# and at exit - so proxied requests don't wait for writes to the disk
+PERSIST_INTERVAL = float(os.getenv('ACTIVITY_PERSIST_INTERVAL', 10))
+
+_lock = threading.Lock()
+_last_activity: Optional[datetime] = None
+_persisted_activity: Optional[datetime] = None
+_persisting_thread: Optional[threading.Thread] = None
+
 
 def init_db():
     c = sqlite3.connect(DATABASE_FILENAME)
@@ -39,11 +54,51 @@ def init_db():
 
 
 def update_timestamp():
+    global _last_activity
+    global _persisting_thread
+
+    with _lock:
+        _last_activity = datetime.utcnow()
+
+        # thread is started lazily, so every worker process of a server gets its own one
+        if not _persisting_thread:
+            _persisting_thread = threading.Thread(target=_persist_periodically, name='activity-persisting',
+                                                  daemon=True)
+            _persisting_thread.start()
+
+
+def persist_timestamp():
+    global _persisted_activity
+
+    with _lock:
+        activity = _last_activity
+    if not activity or activity == _persisted_activity:
+        return
+
     c = sqlite3.connect(DATABASE_FILENAME)
-    current_datetime = datetime.utcnow().strftime(DATETIME_STRING_FORMAT)
-    c.execute(f"UPDATE main SET datetimestamp='{current_datetime}'")
-    c.commit()
-    c.close()
+    try:
+        # many processes can persist their activities - the saved timestamp never goes back
+        c.execute('BEGIN IMMEDIATE')
+        db_datetimestamp = c.execute('SELECT * FROM main').fetchone()
+        if not db_datetimestamp or activity > datetime.strptime(db_datetimestamp[0], DATETIME_STRING_FORMAT):
+            c.execute("UPDATE main SET datetimestamp=?", (activity.strftime(DATETIME_STRING_FORMAT),))
+        c.commit()
+    finally:
+        c.close()
+
+    _persisted_activity = activity
+
+
+def _persist_periodically():
+    while True:
+        sleep(PERSIST_INTERVAL)
+        try:
+            persist_timestamp()
+        except Exception:
+            logging.exception('failed to persist last activity')
+
+
+atexit.register(persist_timestamp)
 
 
 def get_timestamp() -> datetime:
@@ -54,4 +109,9 @@ def get_timestamp() -> datetime:
 
     result = datetime.strptime(db_datetimestamp[0], DATETIME_STRING_FORMAT)
 
+    # activity of this process may be not persisted yet
+    with _lock:
+        if _last_activity and _last_activity > result:
+            result = _last_activity.replace(microsecond=0)
+
     return result
@@ -0,0 +1,86 @@
+#
+# Copyright (c) 2019 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+from datetime import datetime
+from http import HTTPStatus
+
+from aiohttp import web
+import pytest
+
+import database
+
+
+@pytest.fixture
+def async_proxy(mocker):
+    mocker.patch('database.init_db')
+    import async_proxy
+    return async_proxy
+
+
+@pytest.fixture
+async def upstream_server(aiohttp_server):
+    async def handler(request: web.Request):
+        body = await request.read()
+        return web.Response(body=b'echo:' + request.rel_url.raw_path_qs.encode('utf-8') + b':' + body,
+                            headers={'Set-Cookie': 'key=value', 'X-Upstream': 'true'})
+
+    upstream_app = web.Application()
+    upstream_app.router.add_route('*', '/{url:.*}', handler)
+    return await aiohttp_server(upstream_app)
+
+
+@pytest.fixture
+async def proxy_client(mocker, async_proxy, upstream_server, aiohttp_client):
+    mocker.patch.object(async_proxy, 'redirect_to', str(upstream_server.make_url('/')))
+    return await aiohttp_client(async_proxy.create_app())
+
+
+@pytest.mark.parametrize('url', ['/', '/random/url?tag=a%20b%26c&run=1'])
+async def test_proxy(mocker, proxy_client, url):
+    mocker.patch('database.update_timestamp')
+
+    response = await proxy_client.post(url, data=b'payload')
+
+    assert response.status == HTTPStatus.OK
+    assert await response.read() == f'echo:{url}:payload'.encode('utf-8')
+    assert response.headers['X-Upstream'] == 'true'
+    assert response.cookies['key'].value == 'value'
+    # noinspection PyUnresolvedReferences
+    assert database.update_timestamp.call_count == 1
+
+
+async def test_inactivity(mocker, proxy_client):
+    fake_timestamp = datetime(2018, 7, 26, 12, 19, 34, 867831)
+    mocker.patch('database.get_timestamp').return_value = fake_timestamp
+
+    response = await proxy_client.get('/inactivity')
+    response_json = await response.json()
+
+    assert response_json['lastRequestDatetime'] == fake_timestamp.isoformat()
+    assert response.status == HTTPStatus.OK
+
+
+async def test_healthz(proxy_client):
+    response = await proxy_client.get('/healthz')
+
+    assert response.status == HTTPStatus.OK
+
+
+def test_filter_headers(async_proxy):
+    headers = {'Connection': 'keep-alive, X-Private', 'Keep-Alive': 'timeout=5', 'X-Private': 'a',
+               'Content-Type': 'text/html', 'Transfer-Encoding': 'chunked'}
+
+    assert dict(async_proxy.filter_headers(headers)) == {'Content-Type': 'text/html'}
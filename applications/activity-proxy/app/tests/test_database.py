@@ -57,14 +57,54 @@ def test_init_db_unknown_error(mocker):
 def test_update_timestamp(mocker):
     fake_connection = mocker.MagicMock()
     mocker.patch('sqlite3.connect').return_value = fake_connection
+    mocker.patch('database._last_activity', None)
+    mocker.patch('database._persisting_thread', None)
+    thread_mock = mocker.patch('threading.Thread')
+    database.update_timestamp()
     database.update_timestamp()
 
-    assert fake_connection.execute.call_count == 1
-    assert fake_connection.commit.call_count == 1
-    assert fake_connection.close.call_count == 1
+    assert database._last_activity is not None
+    assert fake_connection.execute.call_count == 0
+    assert thread_mock.return_value.start.call_count == 1
+
+
+def test_persist_timestamp(mocker, tmpdir):
+    mocker.patch('database.DATABASE_FILENAME', str(tmpdir.join('proxy.db')))
+    mocker.patch('database._persisted_activity', None)
+    database.init_db()
+
+    mocker.patch('database._last_activity', datetime(year=2099, month=1, day=2, hour=3, minute=4, second=5))
+    database.persist_timestamp()
+
+    mocker.patch('database._last_activity', None)
+    assert database.get_timestamp() == datetime(year=2099, month=1, day=2, hour=3, minute=4, second=5)
+
+
+def test_persist_timestamp_older_activity(mocker, tmpdir):
+    mocker.patch('database.DATABASE_FILENAME', str(tmpdir.join('proxy.db')))
+    mocker.patch('database._persisted_activity', None)
+    database.init_db()
+    initial_timestamp = database.get_timestamp()
+
+    mocker.patch('database._last_activity', datetime(year=2000, month=1, day=1))
+    database.persist_timestamp()
+
+    mocker.patch('database._last_activity', None)
+    assert database.get_timestamp() == initial_timestamp
+
+
+def test_get_timestamp_not_persisted_activity(mocker, tmpdir):
+    mocker.patch('database.DATABASE_FILENAME', str(tmpdir.join('proxy.db')))
+    database.init_db()
+
+    mocker.patch('database._last_activity', datetime(year=2099, month=1, day=2, hour=3, minute=4, second=5,
+                                                     microsecond=6))
+
+    assert database.get_timestamp() == datetime(year=2099, month=1, day=2, hour=3, minute=4, second=5)
 
 
 def test_get_timestamp(mocker):
+    mocker.patch('database._last_activity', None)
     expected_datetime_return = datetime(year=2018, month=7, day=26, hour=11, minute=41, second=26)
     fake_cursor = mocker.MagicMock(fetchone=lambda: ('26.07.2018 11:41:26',))
     mocker.spy(fake_cursor, 'fetchone')
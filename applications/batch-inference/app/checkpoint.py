@@ -0,0 +1,97 @@
+#
+# Copyright (c) 2019 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""
+Durable checkpoint of batch inference stored in the output directory.
+
+Checkpoint is an append-only manifest - one JSON line per completed input file, with a path relative
+to the input directory and a number of processed records. Every line is flushed and synced to disk
+before processing goes on, so after a restart exactly the completed files can be skipped. Records of
+a file which was in progress are recovered from its result stream (see result_stream module). In sharded
+mode every shard has its own checkpoint.
+"""
+
+import json
+import logging
+import os
+from typing import BinaryIO, Dict, Optional
+
+CHECKPOINT_FILENAME = '.batch-inference-checkpoint'
+
+FILE_KEY = 'file'
+RECORDS_KEY = 'records'
+
+
+class Checkpoint:
+    def __init__(self, output_dir_path: str, input_dir_path: str, shard: Optional[int] = None):
+        filename = CHECKPOINT_FILENAME if shard is None else f'{CHECKPOINT_FILENAME}-shard-{shard}'
+        self.path = os.path.join(output_dir_path, filename)
+        self.input_dir_path = input_dir_path
+
+        self._file: Optional[BinaryIO] = None
+
+    def _relative_path(self, data_file: str) -> str:
+        return os.path.relpath(data_file, self.input_dir_path)
+
+    def load(self) -> Dict[str, int]:
+        """
+        Returns completed input files (with paths within the input directory) mapped to numbers of their
+        processed records. Incomplete trailing line, left after a crash, is ignored.
+        """
+        completed_files = {}
+
+        if not os.path.isfile(self.path):
+            return completed_files
+
+        with open(self.path, mode='rb') as checkpoint_file:
+            for line in checkpoint_file:
+                try:
+                    entry = json.loads(line.decode('utf_8'))
+                    completed_files[os.path.join(self.input_dir_path, entry[FILE_KEY])] = entry[RECORDS_KEY]
+                except (ValueError, KeyError):
+                    logging.warning(f"skipping malformed checkpoint entry: {line}")
+
+        return completed_files
+
+    def mark_completed(self, data_file: str, records: int):
+        if not self._file:
+            self._truncate_incomplete_line()
+            self._file = open(self.path, mode='ab')
+
+        entry = {FILE_KEY: self._relative_path(data_file), RECORDS_KEY: records}
+        self._file.write(json.dumps(entry).encode('utf_8') + b'\n')
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def _truncate_incomplete_line(self):
+        if not os.path.isfile(self.path):
+            return
+
+        with open(self.path, mode='r+b') as checkpoint_file:
+            content = checkpoint_file.read()
+            if content and not content.endswith(b'\n'):
+                checkpoint_file.truncate(content.rfind(b'\n') + 1)
+
+    def close(self):
+        if self._file:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
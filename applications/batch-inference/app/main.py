@@ -15,23 +15,45 @@
 #
 
 import argparse
+from collections import deque, namedtuple
+from concurrent.futures import ThreadPoolExecutor
 from enum import Enum
+from http import HTTPStatus
 import logging
+from multiprocessing import Process
 import os
-from time import sleep
-from threading import Thread
-from typing import Optional
+import queue
+from time import monotonic
+from threading import Condition, Event, Thread
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 import pickle
+import zlib
 
+import numpy as np
 from retry.api import retry_call
 import tensorflow as tf
 
 from experiment_metrics.api import publish
+from checkpoint import Checkpoint
+from result_stream import ResultStreamWriter, STREAM_FILE_EXTENSION, count_complete_results
 import grpc
 from kubernetes import config, client
+from kubernetes.client.rest import ApiException
 from tensorflow_serving.apis import predict_pb2, prediction_service_pb2_grpc
 
 PROGRESS_METRIC_KEY = 'progress'
+# in sharded mode every shard stores its own progress as "<processed files>/<files of shard>" under this key
+# suffixed with an index of a shard - overall progress of a run is aggregated from them
+SHARD_PROGRESS_METRIC_KEY_PREFIX = 'progress-shard-'
+
+MAX_PUBLISH_RETRIES_COUNT = 5
+
+# progress is published when it has grown by at least PROGRESS_MIN_DELTA percents, but not more often than
+# every PROGRESS_MIN_INTERVAL seconds - smaller changes are published after PROGRESS_MAX_INTERVAL seconds.
+# Final progress (also when processing has failed) is always published.
+PROGRESS_MIN_DELTA = 1.0
+PROGRESS_MIN_INTERVAL = 5.0
+PROGRESS_MAX_INTERVAL = 60.0
 
 API_GROUP_NAME = 'aggregator.aipg.intel.com'
 RUN_PLURAL = 'runs'
@@ -40,10 +62,28 @@ RUN_VERSION = 'v1'
 LABEL_KEY = "label"
 RESULT_KEY = "result"
 
+DEFAULT_MAX_IN_FLIGHT = 1
+DEFAULT_MAX_BATCH_SIZE = 1
+DEFAULT_MAX_BATCH_WAIT = 0.1
+
+# single unit of work - one input file (or one example from a tf-record file) sent to the model server;
+# label is None for plain protobuf files, input is None for tf-record files without any examples
+WorkItem = namedtuple('WorkItem', ['data_file', 'label', 'input', 'last_in_file'])
+
 progress = 0
 max_progress = 1
 stop_thread = False
 
+# notified on every change of progress (and on stop) - progress_version lets the publishing thread
+# detect changes which happened while it was busy
+progress_changed = Condition()
+progress_version = 0
+
+# index and number of shards processed by this process and number of files of all shards
+shard_index = 0
+shard_count = 1
+all_files_count = 1
+
 log_level_env_var = os.getenv('LOG_LEVEL')
 
 
@@ -51,6 +91,28 @@ class APPLICABLE_FORMATS(Enum):
     TF_RECORD = "tf-record"
 
 
+class OUTPUT_FORMATS(Enum):
+    # all results of a tf-record file are pickled as one list when the whole file is processed
+    PICKLE = "pickle"
+    # results of a tf-record file are appended one by one to a stream file (see result_stream module)
+    STREAM = "stream"
+
+
+class SHARDING_MODES(Enum):
+    # files of i-th shard are every n-th file of the sorted list of files, starting with i-th one
+    INDEX = "index"
+    # files are assigned to shards by a hash of their paths within an input directory
+    HASH = "hash"
+
+
+class RESUME_MODES(Enum):
+    # position is reverted from the progress metric of a run - the file which was in progress is processed again
+    PROGRESS = "progress"
+    # completed files (and records of a file in progress in the stream output format) are read from
+    # the checkpoint stored in the output directory and skipped exactly
+    CHECKPOINT = "checkpoint"
+
+
 if log_level_env_var:
     desired_log_level = logging.getLevelName(log_level_env_var.upper())
     if desired_log_level not in (logging.CRITICAL, logging.ERROR, logging.WARNING, logging.INFO, logging.DEBUG):
@@ -67,7 +129,11 @@ k8s_rest_logger.setLevel(logging.INFO)
 
 
 def do_batch_inference(server_address: str, input_dir_path: str, output_dir_path: str, related_run_name: str,
-                       input_format: str):
+                       input_format: str, max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+                       max_batch_size: int = DEFAULT_MAX_BATCH_SIZE, max_batch_wait: float = DEFAULT_MAX_BATCH_WAIT,
+                       output_format: str = OUTPUT_FORMATS.PICKLE.value,
+                       resume_mode: str = RESUME_MODES.PROGRESS.value, shard: int = 0, shards: int = 1,
+                       sharding: str = SHARDING_MODES.INDEX.value):
     detected_files = []
 
     for root, _, files in os.walk(input_dir_path):
@@ -76,6 +142,18 @@ def do_batch_inference(server_address: str, input_dir_path: str, output_dir_path
 
     detected_files.sort()
 
+    global shard_index
+    global shard_count
+    global all_files_count
+    shard_index = shard
+    shard_count = shards
+    all_files_count = len(detected_files)
+
+    if shard_count > 1:
+        detected_files = get_shard_files(files=detected_files, input_dir_path=input_dir_path, shard=shard_index,
+                                         shards=shard_count, sharding=sharding)
+        logging.info(f"shard {shard_index}/{shard_count}: {len(detected_files)} of {all_files_count} files")
+
     channel = grpc.insecure_channel(server_address)
     stub = prediction_service_pb2_grpc.PredictionServiceStub(channel)
 
@@ -83,62 +161,300 @@ def do_batch_inference(server_address: str, input_dir_path: str, output_dir_path
     global progress
     max_progress = len(detected_files)
 
-    reverted_progress = try_revert_progress(related_run_name)
-    if reverted_progress:
-        logging.debug(f"new progress for processing: {progress}")
-        progress = reverted_progress
+    checkpoint = Checkpoint(output_dir_path=output_dir_path, input_dir_path=input_dir_path,
+                            shard=shard_index if shard_count > 1 else None)
+    results_writer = TfRecordResultsWriter(output_dir_path=output_dir_path, output_format=output_format)
+    records_to_skip = {}
+
+    if resume_mode == RESUME_MODES.CHECKPOINT.value:
+        completed_files = checkpoint.load()
+        files_to_process = [data_file for data_file in detected_files if data_file not in completed_files]
+        progress = max_progress - len(files_to_process)
+        notify_progress()
+        logging.debug(f"files completed according to checkpoint: {progress}")
+
+        # files are processed in order, so only the first of remaining files could have been in progress
+        if files_to_process and input_format == APPLICABLE_FORMATS.TF_RECORD.value \
+                and output_format == OUTPUT_FORMATS.STREAM.value:
+            in_progress_file = files_to_process[0]
+            # the same records are kept by the results stream when new results are appended to it
+            records_to_skip[in_progress_file] = count_complete_results(
+                results_writer.get_output_path(in_progress_file))
+            logging.debug(f"records of {in_progress_file} completed according to results stream: "
+                          f"{records_to_skip[in_progress_file]}")
+            results_writer.append_files.add(in_progress_file)
     else:
-        logging.debug("no progress reverted")
+        reverted_progress = try_revert_progress(related_run_name)
+        if reverted_progress:
+            logging.debug(f"new progress for processing: {progress}")
+            progress = reverted_progress
+            notify_progress()
+        else:
+            logging.debug("no progress reverted")
 
-    files_to_process = detected_files[progress:]
+        files_to_process = detected_files[progress:]
 
-    for data_file in files_to_process:
-        logging.debug(f"processing file: {data_file}")
+    def predict(batch: List[WorkItem]) -> List[Optional[bytes]]:
+        return make_batch_prediction(items=batch, stub=stub, output_dir_path=output_dir_path)
 
-        if input_format == APPLICABLE_FORMATS.TF_RECORD.value:
-            record_iterator = tf.python_io.tf_record_iterator(path=data_file)
+    # reading and parsing of input files is done in a separate thread when inputs are batched (and in this thread
+    # otherwise), predictions (and writing of results of plain protobuf files) are done by a pool of workers -
+    # results are consumed in the order of input files, so outputs and progress stay deterministic regardless
+    # of the number of requests in flight
+    processed_records = 0
+
+    with ThreadPoolExecutor(max_workers=max_in_flight) as executor, results_writer, checkpoint:
+        work_items = read_work_items(files_to_process=files_to_process, input_format=input_format,
+                                     records_to_skip=records_to_skip)
+        batches = batch_work_items(items=work_items, max_batch_size=max_batch_size, max_batch_wait=max_batch_wait)
+
+        for batch, binary_results in process_in_order(executor=executor, func=predict, items=batches,
+                                                      max_in_flight=max_in_flight):
+            for item, binary_result in zip(batch, binary_results):
+                if input_format == APPLICABLE_FORMATS.TF_RECORD.value:
+                    results_writer.write(item=item, binary_result=binary_result)
+
+                if item.input is not None:
+                    processed_records += 1
+
+                if item.last_in_file:
+                    checkpoint.mark_completed(data_file=item.data_file,
+                                              records=records_to_skip.get(item.data_file, 0) + processed_records)
+                    processed_records = 0
 
-            id = 0
-            # if tf-record input format is chosen, results are stored in Python list containing dictionary items
-            # each item contains label (key - label) and binary object (key - result)
-            output_list = []
+                    progress += 1
+                    notify_progress()
+                    logging.info(f'progress: {progress}/{max_progress}')
 
-            filename, _ = os.path.splitext(data_file)
 
-            for string_record in record_iterator:
-                example = tf.train.Example()
-                example.ParseFromString(string_record)
+def get_shard_files(files: List[str], input_dir_path: str, shard: int, shards: int, sharding: str) -> List[str]:
+    """
+    Returns files (from the sorted list of all files) belonging to given shard. Split is deterministic, so
+    every worker computes the same assignment independently.
+    """
+    if sharding == SHARDING_MODES.HASH.value:
+        # built-in hash() of strings is salted per process, so a stable checksum is used instead
+        return [data_file for data_file in files
+                if zlib.crc32(os.path.relpath(data_file, input_dir_path).encode('utf_8')) % shards == shard]
 
-                label = example.features.feature['label'].bytes_list.value[0].decode('utf_8') \
-                    if example.features.feature.get('label') else None
+    return files[shard::shards]
 
-                if not label:
-                    label = data_file
-                    if len(record_iterator) > 1:
-                        label = "{}_{}".format(filename, id)
-                        id += 1
 
-                binary_result = make_prediction(input=example.features.feature['data_pb'].bytes_list.value[0],
-                                                stub=stub)
+class TfRecordResultsWriter:
+    """
+    Stores results of examples from tf-record files, in order of examples, in the chosen output format.
+    """
 
-                output_list.append({LABEL_KEY: label, RESULT_KEY: binary_result})
+    def __init__(self, output_dir_path: str, output_format: str):
+        self.output_dir_path = output_dir_path
+        self.output_format = output_format
 
-            output_filename = "{}.result".format(data_file)
+        # in pickle format results are stored in Python list containing dictionary items
+        # each item contains label (key - label) and binary object (key - result)
+        # results of these files are appended to already existing result streams
+        self.append_files = set()
 
-            with open(f'{output_dir_path}/{os.path.basename(output_filename)}', mode='wb') as fi:
-                pickle.dump(obj=output_list, file=fi, protocol=pickle.HIGHEST_PROTOCOL)
+        self._output_list = []
+        self._stream_writer: Optional[ResultStreamWriter] = None
 
+    def get_output_path(self, data_file: str) -> str:
+        output_filename = "{}.result".format(data_file)
+        output_path = f'{self.output_dir_path}/{os.path.basename(output_filename)}'
+
+        if self.output_format == OUTPUT_FORMATS.STREAM.value:
+            return f'{output_path}.{STREAM_FILE_EXTENSION}'
+        return output_path
+
+    def write(self, item: WorkItem, binary_result: Optional[bytes]):
+        if self.output_format == OUTPUT_FORMATS.STREAM.value:
+            if not self._stream_writer:
+                self._stream_writer = ResultStreamWriter(self.get_output_path(item.data_file),
+                                                         append=item.data_file in self.append_files)
+
+            if binary_result is not None:
+                self._stream_writer.write(label=item.label, result=binary_result)
+
+            if item.last_in_file:
+                self._stream_writer.close()
+                self._stream_writer = None
+        else:
+            if binary_result is not None:
+                self._output_list.append({LABEL_KEY: item.label, RESULT_KEY: binary_result})
+
+            if item.last_in_file:
+                with open(self.get_output_path(item.data_file), mode='wb') as fi:
+                    pickle.dump(obj=self._output_list, file=fi, protocol=pickle.HIGHEST_PROTOCOL)
+
+                self._output_list = []
+
+    def close(self):
+        if self._stream_writer:
+            self._stream_writer.close()
+            self._stream_writer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+def read_work_items(files_to_process: List[str], input_format: str,
+                    records_to_skip: Dict[str, int] = None) -> Iterator[WorkItem]:
+    records_to_skip = records_to_skip or {}
+
+    for data_file in files_to_process:
+        logging.debug(f"reading file: {data_file}")
+
+        if input_format == APPLICABLE_FORMATS.TF_RECORD.value:
+            yield from skip_work_items(read_tf_record_work_items(data_file), count=records_to_skip.get(data_file, 0))
         else:
             with open(data_file, mode='rb') as fi:
                 pb_bytes = fi.read()
 
-                make_prediction(input=pb_bytes,
-                                stub=stub,
-                                output_filename=data_file,
-                                output_dir_path=output_dir_path)
+            yield WorkItem(data_file=data_file, label=None, input=pb_bytes, last_in_file=True)
+
+
+def skip_work_items(items: Iterable[WorkItem], count: int) -> Iterator[WorkItem]:
+    """
+    Skips first count items. If the last item of a file is skipped, it is replaced with an item without
+    input - so the end of the file is still marked.
+    """
+    for index, item in enumerate(items):
+        if index >= count:
+            yield item
+        elif item.last_in_file:
+            yield item._replace(input=None)
+
+
+def read_tf_record_work_items(data_file: str) -> Iterator[WorkItem]:
+    record_iterator = tf.python_io.tf_record_iterator(path=data_file)
+    filename, _ = os.path.splitext(data_file)
+
+    # examples are yielded with one record delay - it is needed to know whether the example is the last one
+    # in a file and whether a file contains more than one example (used for building default labels)
+    id = 0
+    records_count = 0
+    pending = None
+
+    for string_record in record_iterator:
+        example = tf.train.Example()
+        example.ParseFromString(string_record)
+
+        label = example.features.feature['label'].bytes_list.value[0].decode('utf_8') \
+            if example.features.feature.get('label') else None
+
+        if pending:
+            pending_label, pending_input = pending
+            yield WorkItem(data_file=data_file, label=pending_label or "{}_{}".format(filename, id),
+                           input=pending_input, last_in_file=False)
+            id += 0 if pending_label else 1
+
+        pending = (label, example.features.feature['data_pb'].bytes_list.value[0])
+        records_count += 1
+
+    if not pending:
+        yield WorkItem(data_file=data_file, label=None, input=None, last_in_file=True)
+        return
+
+    pending_label, pending_input = pending
+    if not pending_label:
+        pending_label = data_file if records_count == 1 else "{}_{}".format(filename, id)
+
+    yield WorkItem(data_file=data_file, label=pending_label, input=pending_input, last_in_file=True)
+
+
+def batch_work_items(items: Iterable[WorkItem], max_batch_size: int,
+                     max_batch_wait: float) -> Iterator[List[WorkItem]]:
+    """
+    Groups work items into batches of at most max_batch_size items. A batch is also closed when
+    max_batch_wait seconds have elapsed since its first item was read, even if no other item has been
+    read since then - items are read by a separate thread, so slow inputs do not hold back predictions
+    of already read items.
+    """
+    if max_batch_size <= 1:
+        for item in items:
+            yield [item]
+        return
+
+    read_items: queue.Queue = queue.Queue(maxsize=max_batch_size)
+    stopped = Event()
+    end_of_items = object()
+
+    def put(entry) -> bool:
+        while not stopped.is_set():
+            try:
+                read_items.put(entry, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def read():
+        try:
+            for item in items:
+                if not put(item):
+                    return
+        except Exception as ex:
+            put(ex)
+            return
+        put(end_of_items)
+
+    Thread(target=read, daemon=True).start()
+
+    batch = []
+    batch_deadline = None
+    try:
+        while True:
+            try:
+                entry = read_items.get(timeout=max(batch_deadline - monotonic(), 0) if batch else None)
+            except queue.Empty:
+                yield batch
+                batch = []
+                continue
+
+            if entry is end_of_items:
+                break
+            if isinstance(entry, Exception):
+                raise entry
+
+            if not batch:
+                batch_deadline = monotonic() + max_batch_wait
+            batch.append(entry)
+
+            if len(batch) >= max_batch_size:
+                yield batch
+                batch = []
+    finally:
+        stopped.set()
+
+    if batch:
+        yield batch
+
+
+def process_in_order(executor: ThreadPoolExecutor, func: Callable, items: Iterable,
+                     max_in_flight: int) -> Iterator[Tuple]:
+    """
+    Submits func(item) for every item to the executor keeping at most max_in_flight calls pending and
+    yields (item, result) pairs in the order of items. If any call fails, calls which were not started
+    yet are cancelled and the exception is propagated.
+    """
+    in_flight = deque()
+
+    try:
+        for item in items:
+            in_flight.append((item, executor.submit(func, item)))
+
+            if len(in_flight) >= max_in_flight:
+                done_item, future = in_flight.popleft()
+                yield done_item, future.result()
 
-        progress += 1
-        logging.info(f'progress: {progress}/{max_progress}')
+        while in_flight:
+            done_item, future = in_flight.popleft()
+            yield done_item, future.result()
+    finally:
+        for _, future in in_flight:
+            future.cancel()
 
 
 def build_label_from_filename(filename: str, id: int):
@@ -168,26 +484,160 @@ def make_prediction(input: bytes, stub: prediction_service_pb2_grpc.PredictionSe
     return result_pb_serialized
 
 
-def publish_progress():
-    logging.debug("starting publish_progress ...")
-    progress_percent = 0
-    while progress_percent != 100 and not stop_thread:
-        new_progress_percent = progress/max_progress * 100 if max_progress else 100
-        logging.debug(f"new_progress_percent: %.1f" % new_progress_percent)
-        if new_progress_percent != progress_percent:
-            progress_percent = new_progress_percent
-
-            metrics = {
-                PROGRESS_METRIC_KEY: str("%.1f" % progress_percent)
-            }
-            logging.debug("publishing metrics ...")
-            publish(metrics)
+def make_batch_prediction(items: List[WorkItem], stub: prediction_service_pb2_grpc.PredictionServiceStub,
+                          output_dir_path: str = None) -> List[Optional[bytes]]:
+    """
+    Returns serialized prediction results for given work items (None for items without input). Requests
+    of all items are sent to the model server as one request concatenated along the batch dimension;
+    if they cannot be merged, they are sent one by one.
+    """
+    results = [None] * len(items)
+    indexes = [index for index, item in enumerate(items) if item.input is not None]
+
+    batch_results = None
+    if len(indexes) > 1:
+        requests = []
+        for index in indexes:
+            request = predict_pb2.PredictRequest()
+            try:
+                request.ParseFromString(items[index].input)
+            except Exception as ex:
+                raise RuntimeError(f"failed to parse {items[index].data_file}") from ex
+            requests.append(request)
+
+        batch_results = predict_merged(requests=requests, stub=stub)
+
+    if batch_results is None:
+        for index in indexes:
+            # results of plain protobuf files are written to separate files
+            output_filename = items[index].data_file if items[index].label is None else None
+            results[index] = make_prediction(input=items[index].input, stub=stub, output_filename=output_filename,
+                                             output_dir_path=output_dir_path)
+        return results
+
+    for index, result_pb_serialized in zip(indexes, batch_results):
+        results[index] = result_pb_serialized
+
+        if items[index].label is None:
+            with open(f'{output_dir_path}/{os.path.basename(items[index].data_file)}', mode='wb') as fi:
+                fi.write(result_pb_serialized)
+
+    return results
+
+
+def predict_merged(requests: List[predict_pb2.PredictRequest],
+                   stub: prediction_service_pb2_grpc.PredictionServiceStub) -> Optional[List[bytes]]:
+    """
+    Sends given requests as one request, with inputs concatenated along the first (batch) dimension, and
+    splits outputs of the response back into per-request serialized responses. Returns None if requests
+    cannot be merged - e.g. they target different models or their inputs differ in names or shapes - or if
+    outputs of the merged request cannot be split along the batch dimension.
+    """
+    first = requests[0]
+    if any(request.model_spec != first.model_spec or set(request.inputs) != set(first.inputs)
+           or request.output_filter != first.output_filter for request in requests):
+        return None
 
-        sleep(1)
+    batch_request = predict_pb2.PredictRequest()
+    batch_request.model_spec.CopyFrom(first.model_spec)
+    batch_request.output_filter.extend(first.output_filter)
 
+    batch_sizes = None
+    for key in first.inputs:
+        arrays = [tf.make_ndarray(request.inputs[key]) for request in requests]
 
-def try_revert_progress(run_name: str) -> Optional[int]:
-    logging.debug("trying to revert progress...")
+        if any(array.ndim == 0 or array.shape[1:] != arrays[0].shape[1:] for array in arrays):
+            return None
+
+        sizes = [array.shape[0] for array in arrays]
+        if batch_sizes is not None and sizes != batch_sizes:
+            return None
+        batch_sizes = sizes
+
+        batch_request.inputs[key].CopyFrom(tf.make_tensor_proto(np.concatenate(arrays, axis=0)))
+
+    # actual call without retry:
+    # result = stub.Predict(batch_request, timeout=30.0)  # timeout 30 seconds
+    result = retry_call(stub.Predict, fargs=[batch_request], fkwargs={"timeout": 30.0}, tries=5, delay=30)
+
+    outputs = {key: tf.make_ndarray(result.outputs[key]) for key in result.outputs}
+
+    # outputs which are not batch-major (e.g. scalars) cannot be split back into per-request responses
+    if any(output.ndim == 0 or output.shape[0] != sum(batch_sizes) for output in outputs.values()):
+        return None
+
+    responses = [predict_pb2.PredictResponse() for _ in requests]
+    split_indexes = np.cumsum(batch_sizes)[:-1]
+
+    for key, output in outputs.items():
+        parts = np.split(output, split_indexes, axis=0)
+        for response, part in zip(responses, parts):
+            response.outputs[key].CopyFrom(tf.make_tensor_proto(part))
+
+    for response in responses:
+        response.model_spec.CopyFrom(result.model_spec)
+
+    return [response.SerializeToString() for response in responses]
+
+
+def notify_progress(stop: bool = False):
+    global progress_version
+    global stop_thread
+
+    with progress_changed:
+        progress_version += 1
+        if stop:
+            stop_thread = True
+        progress_changed.notify_all()
+
+
+def publish_progress(run_name: str = None):
+    logging.debug("starting publish_progress ...")
+    published_percent = 0
+    published_at = monotonic()
+    seen_version = progress_version
+    timeout = None
+
+    while True:
+        with progress_changed:
+            progress_changed.wait_for(lambda: progress_version != seen_version or stop_thread, timeout=timeout)
+            seen_version = progress_version
+            finished = stop_thread
+            progress_percent = progress/max_progress * 100 if max_progress else 100
+
+        logging.debug(f"progress_percent: %.1f" % progress_percent)
+        timeout = None
+
+        if progress_percent != published_percent:
+            if progress_percent - published_percent >= PROGRESS_MIN_DELTA:
+                publish_at = published_at + PROGRESS_MIN_INTERVAL
+            else:
+                publish_at = published_at + PROGRESS_MAX_INTERVAL
+
+            if finished or progress_percent == 100 or monotonic() >= publish_at:
+                logging.debug("publishing metrics ...")
+                publish_progress_metric(run_name=run_name, progress_percent=progress_percent)
+                published_percent = progress_percent
+                published_at = monotonic()
+            else:
+                # change is published when its time comes, unless a bigger change is notified earlier
+                timeout = publish_at - monotonic()
+
+        if finished or published_percent == 100:
+            return
+
+
+def publish_progress_metric(run_name: str, progress_percent: float):
+    if shard_count > 1:
+        publish_shard_progress(run_name)
+    else:
+        metrics = {
+            PROGRESS_METRIC_KEY: str("%.1f" % progress_percent)
+        }
+        publish(metrics)
+
+
+def get_run(run_name: str) -> Tuple[client.CustomObjectsApi, str, Optional[dict]]:
     config.load_incluster_config()
 
     with open("/var/run/secrets/kubernetes.io/serviceaccount/namespace", mode='r') as file:
@@ -204,8 +654,83 @@ def try_revert_progress(run_name: str) -> Optional[int]:
                                                                   name=run_name)
     except Exception:
         logging.exception("error when contacting to kubernetes API")
+        run = None
+
+    return runs_custom_obj_client, my_current_namespace, run
+
+
+def get_shard_progress_metric_key(shard: int) -> str:
+    return f'{SHARD_PROGRESS_METRIC_KEY_PREFIX}{shard}'
+
+
+def aggregate_shards_progress(metrics: dict) -> float:
+    """
+    Returns overall progress (in percents) of a run based on progress metrics of its shards.
+    """
+    processed_files = 0
+    for key, value in metrics.items():
+        if key.startswith(SHARD_PROGRESS_METRIC_KEY_PREFIX):
+            processed_files += int(value.split('/')[0])
+
+    return processed_files/all_files_count * 100 if all_files_count else 100
+
+
+def publish_shard_progress(run_name: str):
+    """
+    Publishes progress of this shard and aggregated progress of a run. Metrics are read and patched with
+    resourceVersion of a run, so concurrent updates of other shards are never overwritten with a stale
+    aggregated value - in case of a conflict the update is repeated.
+    """
+    shard_metric_key = get_shard_progress_metric_key(shard_index)
+
+    for i in range(MAX_PUBLISH_RETRIES_COUNT):
+        runs_custom_obj_client, namespace, run = get_run(run_name)
+        if not run:
+            return
+
+        metrics = dict(run['spec'].get('metrics') or {})
+        metrics[shard_metric_key] = f'{progress}/{max_progress}'
+
+        body = {
+            "metadata": {
+                "resourceVersion": run['metadata']['resourceVersion']
+            },
+            "spec": {
+                "metrics": {
+                    shard_metric_key: metrics[shard_metric_key],
+                    PROGRESS_METRIC_KEY: str("%.1f" % aggregate_shards_progress(metrics))
+                }
+            }
+        }
+
+        try:
+            runs_custom_obj_client.patch_namespaced_custom_object(group=API_GROUP_NAME, version=RUN_VERSION,
+                                                                  plural=RUN_PLURAL, namespace=namespace,
+                                                                  name=run_name, body=body)
+            return
+        except ApiException as e:
+            if e.status != HTTPStatus.CONFLICT or i == MAX_PUBLISH_RETRIES_COUNT - 1:
+                logging.exception(f"error when publishing progress of shard {shard_index}")
+                return
+
+
+def try_revert_progress(run_name: str) -> Optional[int]:
+    logging.debug("trying to revert progress...")
+
+    _, _, run = get_run(run_name)
+    if not run:
         return None
 
+    if shard_count > 1:
+        try:
+            saved_shard_progress: str = run['spec']['metrics'][get_shard_progress_metric_key(shard_index)]
+        except KeyError:
+            logging.debug(f"no progress metric of shard {shard_index} detected")
+            return None
+
+        logging.debug(f"progress reverted! progress of shard {shard_index} from metrics: {saved_shard_progress}")
+        return int(saved_shard_progress.split('/')[0])
+
     try:
         saved_progress: str = run['spec']['metrics']['progress']
     except KeyError:
@@ -219,7 +744,22 @@ def try_revert_progress(run_name: str) -> Optional[int]:
 
     progress = int(real_progress)
     return progress
-    
+
+
+def run_shard(shard: int, shards: int, **kwargs):
+    """
+    Processes one shard with its own progress publishing thread - final progress is always published,
+    also when processing fails.
+    """
+    progress_thread = Thread(target=publish_progress, args=(kwargs['related_run_name'],))
+    progress_thread.start()
+
+    try:
+        do_batch_inference(shard=shard, shards=shards, **kwargs)
+    finally:
+        notify_progress(stop=True)
+        progress_thread.join()
+
 
 def main():
     related_run_name = os.getenv('RUN_NAME')
@@ -230,6 +770,28 @@ def main():
     parser.add_argument('--input_dir_path', type=str)
     parser.add_argument('--output_dir_path', type=str)
     parser.add_argument('--input_format', type=str)
+    parser.add_argument('--output_format', type=str, default=OUTPUT_FORMATS.PICKLE.value,
+                        choices=[output_format.value for output_format in OUTPUT_FORMATS],
+                        help='format of results of tf-record files')
+    parser.add_argument('--resume_mode', type=str, default=RESUME_MODES.PROGRESS.value,
+                        choices=[resume_mode.value for resume_mode in RESUME_MODES],
+                        help='source of information about already processed inputs after a restart')
+    parser.add_argument('--max_in_flight', type=int, default=DEFAULT_MAX_IN_FLIGHT,
+                        help='maximal number of prediction requests sent concurrently to the model server')
+    parser.add_argument('--max_batch_size', type=int, default=DEFAULT_MAX_BATCH_SIZE,
+                        help='maximal number of inputs sent to the model server in one prediction request')
+    parser.add_argument('--max_batch_wait', type=float, default=DEFAULT_MAX_BATCH_WAIT,
+                        help='maximal time (in seconds) of collecting inputs for one prediction request - '
+                             'a batch is sent when this time has elapsed since its first input was read')
+    parser.add_argument('--shard_index', type=int,
+                        help='index of a shard of input files processed by this worker (SHARD_INDEX env var)')
+    parser.add_argument('--shard_count', type=int,
+                        help='number of workers (e.g. pods) processing input files (SHARD_COUNT env var)')
+    parser.add_argument('--sharding', type=str, default=SHARDING_MODES.INDEX.value,
+                        choices=[sharding.value for sharding in SHARDING_MODES],
+                        help='method of splitting input files between shards')
+    parser.add_argument('--processes', type=int, default=1,
+                        help='number of processes of this worker - each of them processes a separate shard')
 
     args = parser.parse_args()
 
@@ -243,19 +805,54 @@ def main():
     if not os.path.isdir(input_dir_path) or len(os.listdir(input_dir_path)) == 0:
         raise RuntimeError(f"input directory: '{input_dir_path}' does not exist or is empty!")
 
-    progress_thread = Thread(target=publish_progress)
-    progress_thread.start()
+    if args.max_in_flight < 1:
+        parser.error("'max_in_flight' must be a positive number!")
 
-    try:
-        do_batch_inference(server_address=os.getenv('TENSORFLOW_MODEL_SERVER_SVC_NAME', ''),
-                           input_dir_path=input_dir_path,
-                           output_dir_path=output_dir_path,
-                           related_run_name=related_run_name,
-                           input_format=input_format)
-    except Exception:
-        global stop_thread
-        stop_thread = True
-        raise
+    if args.max_batch_size < 1:
+        parser.error("'max_batch_size' must be a positive number!")
+
+    shard_index = args.shard_index if args.shard_index is not None else int(os.getenv('SHARD_INDEX', 0))
+    shard_count = args.shard_count if args.shard_count is not None else int(os.getenv('SHARD_COUNT', 1))
+
+    if shard_count < 1 or not 0 <= shard_index < shard_count:
+        parser.error("'shard_index' must be lower than 'shard_count'!")
+
+    if args.processes < 1:
+        parser.error("'processes' must be a positive number!")
+
+    inference_kwargs = dict(server_address=os.getenv('TENSORFLOW_MODEL_SERVER_SVC_NAME', ''),
+                            input_dir_path=input_dir_path,
+                            output_dir_path=output_dir_path,
+                            related_run_name=related_run_name,
+                            input_format=input_format,
+                            max_in_flight=args.max_in_flight,
+                            max_batch_size=args.max_batch_size,
+                            max_batch_wait=args.max_batch_wait,
+                            output_format=args.output_format,
+                            resume_mode=args.resume_mode,
+                            sharding=args.sharding)
+
+    # every process of a worker processes a separate shard - shards of i-th worker are
+    # i*processes ... (i+1)*processes-1 out of shard_count*processes
+    shards = shard_count * args.processes
+
+    if args.processes == 1:
+        run_shard(shard=shard_index, shards=shards, **inference_kwargs)
+        return
+
+    shard_processes = [Process(target=run_shard, kwargs=dict(shard=shard_index * args.processes + i,
+                                                             shards=shards, **inference_kwargs))
+                       for i in range(args.processes)]
+
+    for shard_process in shard_processes:
+        shard_process.start()
+
+    for shard_process in shard_processes:
+        shard_process.join()
+
+    failed_shards = [shard_process.name for shard_process in shard_processes if shard_process.exitcode != 0]
+    if failed_shards:
+        raise RuntimeError(f"processing of shards failed in processes: {', '.join(failed_shards)}")
 
 
 if __name__ == '__main__':
@@ -0,0 +1,192 @@
+#
+# Copyright (c) 2019 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""
+Streaming storage of batch inference results.
+
+Results are appended to a data file as length-prefixed records:
+
+    [label length: uint32][label: utf-8][result length: uint64][result: bytes]
+
+and offsets of consecutive records are appended to an index file as uint64 values. All integers are
+big-endian. Both files are flushed after every record, so results written before a crash are kept and
+can be read lazily - record by record or directly by its position in the index. Files are also synced to
+disk when a writer is closed, so a checkpoint written after that never refers to lost results.
+"""
+
+import os
+import struct
+from typing import BinaryIO, Dict, Iterator, Optional, Tuple, Union
+
+STREAM_FILE_EXTENSION = 'stream'
+INDEX_FILE_EXTENSION = 'index'
+
+LABEL_KEY = "label"
+RESULT_KEY = "result"
+
+_LABEL_LENGTH = struct.Struct('>I')
+_RESULT_LENGTH = struct.Struct('>Q')
+_OFFSET = struct.Struct('>Q')
+
+
+def get_index_path(stream_path: str) -> str:
+    return f'{stream_path}.{INDEX_FILE_EXTENSION}'
+
+
+class ResultStreamWriter:
+    def __init__(self, stream_path: str, append: bool = False):
+        """
+        :param stream_path: path of a stream file, index file is stored next to it
+        :param append: if True and the stream file exists, new results are appended after its complete
+         records - incomplete record left after a crash is removed. Otherwise the stream file is overwritten.
+        """
+        self.stream_path = stream_path
+        self.records_count = 0
+
+        if append and count_results(stream_path) > 0:
+            self.records_count, stream_end = _find_complete_records(stream_path)
+
+            self._stream_file: BinaryIO = open(stream_path, mode='r+b')
+            self._stream_file.truncate(stream_end)
+            self._stream_file.seek(stream_end)
+
+            self._index_file: BinaryIO = open(get_index_path(stream_path), mode='r+b')
+            self._index_file.truncate(self.records_count * _OFFSET.size)
+            self._index_file.seek(self.records_count * _OFFSET.size)
+        else:
+            self._stream_file = open(stream_path, mode='wb')
+            self._index_file = open(get_index_path(stream_path), mode='wb')
+
+    def write(self, label: str, result: bytes):
+        label_bytes = label.encode('utf_8')
+        offset = self._stream_file.tell()
+
+        self._stream_file.write(_LABEL_LENGTH.pack(len(label_bytes)))
+        self._stream_file.write(label_bytes)
+        self._stream_file.write(_RESULT_LENGTH.pack(len(result)))
+        self._stream_file.write(result)
+        self._stream_file.flush()
+
+        # index entry is written after the record, so every indexed record is complete on disk
+        self._index_file.write(_OFFSET.pack(offset))
+        self._index_file.flush()
+
+        self.records_count += 1
+
+    def close(self):
+        for file in (self._stream_file, self._index_file):
+            file.flush()
+            os.fsync(file.fileno())
+            file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+def _read_record(stream_file: BinaryIO) -> Optional[Dict[str, Union[str, bytes]]]:
+    """
+    Reads a record starting at the current position of the stream file. Returns None if there is no
+    complete record - it happens at the end of the file or when the last record was not fully written.
+    """
+    header = stream_file.read(_LABEL_LENGTH.size)
+    if len(header) < _LABEL_LENGTH.size:
+        return None
+    label_bytes = stream_file.read(_LABEL_LENGTH.unpack(header)[0])
+
+    header = stream_file.read(_RESULT_LENGTH.size)
+    if len(header) < _RESULT_LENGTH.size:
+        return None
+    result_length = _RESULT_LENGTH.unpack(header)[0]
+    result = stream_file.read(result_length)
+    if len(result) < result_length:
+        return None
+
+    return {LABEL_KEY: label_bytes.decode('utf_8'), RESULT_KEY: result}
+
+
+def _find_complete_records(stream_path: str) -> Tuple[int, int]:
+    """
+    Returns number of complete, indexed records of a stream file and the position where the last of them ends.
+    """
+    records_count = count_results(stream_path)
+
+    while records_count > 0:
+        with open(get_index_path(stream_path), mode='rb') as index_file:
+            index_file.seek((records_count - 1) * _OFFSET.size)
+            offset = _OFFSET.unpack(index_file.read(_OFFSET.size))[0]
+
+        with open(stream_path, mode='rb') as stream_file:
+            stream_file.seek(offset)
+            if _read_record(stream_file) is not None:
+                return records_count, stream_file.tell()
+
+        records_count -= 1
+
+    return 0, 0
+
+
+def read_results(stream_path: str) -> Iterator[Dict[str, Union[str, bytes]]]:
+    """
+    Lazily yields results stored in a stream file as {label, result} dictionaries - the same items
+    which are stored in a list in pickled result files. Incomplete trailing record is skipped.
+    """
+    with open(stream_path, mode='rb') as stream_file:
+        record = _read_record(stream_file)
+        while record is not None:
+            yield record
+            record = _read_record(stream_file)
+
+
+def count_complete_results(stream_path: str) -> int:
+    """
+    Returns number of complete, indexed records of a stream file - the records which are kept when new results
+    are appended to it. Unlike count_results, index entries of records which are not complete are not counted.
+    """
+    return _find_complete_records(stream_path)[0]
+
+
+def count_results(stream_path: str) -> int:
+    """
+    Returns number of records stored in a stream file, based on its index file.
+    """
+    index_path = get_index_path(stream_path)
+    if not os.path.isfile(stream_path) or not os.path.isfile(index_path):
+        return 0
+    return os.path.getsize(index_path) // _OFFSET.size
+
+
+def read_result(stream_path: str, position: int) -> Dict[str, Union[str, bytes]]:
+    """
+    Returns a result stored at given position of a stream file, located with its index file.
+    """
+    if position < 0 or position >= count_results(stream_path):
+        raise IndexError(f"result {position} does not exist in {stream_path}")
+
+    with open(get_index_path(stream_path), mode='rb') as index_file:
+        index_file.seek(position * _OFFSET.size)
+        offset = _OFFSET.unpack(index_file.read(_OFFSET.size))[0]
+
+    with open(stream_path, mode='rb') as stream_file:
+        stream_file.seek(offset)
+        record = _read_record(stream_file)
+
+    if record is None:
+        raise IndexError(f"result {position} is not complete in {stream_path}")
+
+    return record
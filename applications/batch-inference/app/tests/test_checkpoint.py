@@ -0,0 +1,55 @@
+#
+# Copyright (c) 2019 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import os
+
+from checkpoint import Checkpoint
+
+
+def test_checkpoint_load_completed_files(tmpdir):
+    input_dir_path = str(tmpdir.mkdir('input'))
+    output_dir_path = str(tmpdir.mkdir('output'))
+
+    with Checkpoint(output_dir_path=output_dir_path, input_dir_path=input_dir_path) as checkpoint:
+        checkpoint.mark_completed(data_file=os.path.join(input_dir_path, 'a.tfrecord'), records=10)
+        checkpoint.mark_completed(data_file=os.path.join(input_dir_path, 'sub', 'b.tfrecord'), records=3)
+
+    completed_files = Checkpoint(output_dir_path=output_dir_path, input_dir_path=input_dir_path).load()
+
+    assert completed_files == {os.path.join(input_dir_path, 'a.tfrecord'): 10,
+                               os.path.join(input_dir_path, 'sub', 'b.tfrecord'): 3}
+
+
+def test_checkpoint_no_checkpoint(tmpdir):
+    assert Checkpoint(output_dir_path=str(tmpdir), input_dir_path='/input').load() == {}
+
+
+def test_checkpoint_incomplete_line(tmpdir):
+    output_dir_path = str(tmpdir)
+
+    with Checkpoint(output_dir_path=output_dir_path, input_dir_path='/input') as checkpoint:
+        checkpoint.mark_completed(data_file='/input/a', records=1)
+
+    with open(checkpoint.path, mode='ab') as checkpoint_file:
+        checkpoint_file.write(b'{"file": "b", "rec')
+
+    assert Checkpoint(output_dir_path=output_dir_path, input_dir_path='/input').load() == {'/input/a': 1}
+
+    with Checkpoint(output_dir_path=output_dir_path, input_dir_path='/input') as checkpoint:
+        checkpoint.mark_completed(data_file='/input/c', records=2)
+
+    assert Checkpoint(output_dir_path=output_dir_path, input_dir_path='/input').load() == {'/input/a': 1,
+                                                                                          '/input/c': 2}
@@ -14,6 +14,10 @@
 # limitations under the License.
 #
 
+from concurrent.futures import ThreadPoolExecutor
+from threading import Event, Lock, Thread
+from time import sleep
+
 import main
 
 from grpc._channel import _Rendezvous
@@ -64,3 +68,206 @@ def test_input_dir_is_empty(mocker):
 
     with pytest.raises(RuntimeError):
         main.main()
+
+
+def test_process_in_order_keeps_order_of_items():
+    def delayed_square(item):
+        sleep(0.01 * (5 - item))
+        return item * item
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        results = list(main.process_in_order(executor=executor, func=delayed_square, items=range(5),
+                                             max_in_flight=4))
+
+    assert results == [(0, 0), (1, 1), (2, 4), (3, 9), (4, 16)]
+
+
+def test_process_in_order_limits_requests_in_flight():
+    lock = Lock()
+    in_flight = []
+    max_observed = []
+
+    def tracked(item):
+        with lock:
+            in_flight.append(item)
+            max_observed.append(len(in_flight))
+        sleep(0.01)
+        with lock:
+            in_flight.remove(item)
+        return item
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(main.process_in_order(executor=executor, func=tracked, items=range(20), max_in_flight=3))
+
+    assert max(max_observed) <= 3
+
+
+def test_process_in_order_propagates_failure():
+    def failing(item):
+        if item == 2:
+            raise RuntimeError
+        return item
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        with pytest.raises(RuntimeError):
+            list(main.process_in_order(executor=executor, func=failing, items=range(10), max_in_flight=2))
+
+
+def test_batch_work_items_max_batch_size():
+    batches = list(main.batch_work_items(items=range(7), max_batch_size=3, max_batch_wait=60))
+
+    assert batches == [[0, 1, 2], [3, 4, 5], [6]]
+
+
+def test_batch_work_items_max_batch_wait():
+    first_batch_received = Event()
+
+    def slow_items():
+        yield 0
+        yield 1
+        # the next item is read only after the batch of already read items has been received
+        assert first_batch_received.wait(timeout=10)
+        yield 2
+
+    batches = main.batch_work_items(items=slow_items(), max_batch_size=10, max_batch_wait=0.1)
+
+    assert next(batches) == [0, 1]
+    first_batch_received.set()
+    assert list(batches) == [[2]]
+
+
+def test_batch_work_items_reading_failure():
+    def failing_items():
+        yield 0
+        raise RuntimeError
+
+    with pytest.raises(RuntimeError):
+        list(main.batch_work_items(items=failing_items(), max_batch_size=10, max_batch_wait=60))
+
+
+def test_batch_work_items_without_batching():
+    assert list(main.batch_work_items(items=range(3), max_batch_size=1, max_batch_wait=60)) == [[0], [1], [2]]
+
+
+def test_make_batch_prediction_falls_back_to_single_requests(mocker):
+    mocker.patch('builtins.open')
+    mocker.patch('tensorflow_serving.apis.predict_pb2.PredictRequest')
+    mocker.patch('main.predict_merged').return_value = None
+    make_prediction_mock = mocker.patch('main.make_prediction', side_effect=[b'first', b'second'])
+
+    items = [main.WorkItem(data_file='a', label='a_0', input=b'a', last_in_file=False),
+             main.WorkItem(data_file='a', label='a_1', input=b'b', last_in_file=True),
+             main.WorkItem(data_file='b', label=None, input=None, last_in_file=True)]
+
+    results = main.make_batch_prediction(items=items, stub=mocker.MagicMock(), output_dir_path='/output')
+
+    assert results == [b'first', b'second', None]
+    assert make_prediction_mock.call_count == 2
+
+
+def _predict_request(batch_size: int):
+    request = main.predict_pb2.PredictRequest()
+    request.model_spec.name = 'model'
+    request.inputs['input'].CopyFrom(main.tf.make_tensor_proto(main.np.zeros((batch_size, 2))))
+    return request
+
+
+def test_predict_merged_splits_outputs(mocker):
+    response = main.predict_pb2.PredictResponse()
+    response.outputs['output'].CopyFrom(main.tf.make_tensor_proto(main.np.arange(3)))
+    stub = mocker.MagicMock()
+    stub.Predict.return_value = response
+
+    results = main.predict_merged(requests=[_predict_request(1), _predict_request(2)], stub=stub)
+
+    parts = []
+    for result in results:
+        result_pb = main.predict_pb2.PredictResponse()
+        result_pb.ParseFromString(result)
+        parts.append(main.tf.make_ndarray(result_pb.outputs['output']).tolist())
+    assert parts == [[0], [1, 2]]
+
+
+@pytest.mark.parametrize('output', [5, [1, 2], [[1, 2, 3]]])
+def test_predict_merged_output_not_batch_major(mocker, output):
+    response = main.predict_pb2.PredictResponse()
+    response.outputs['output'].CopyFrom(main.tf.make_tensor_proto(main.np.array(output)))
+    stub = mocker.MagicMock()
+    stub.Predict.return_value = response
+
+    assert main.predict_merged(requests=[_predict_request(1), _predict_request(2)], stub=stub) is None
+
+
+def test_skip_work_items_keeps_end_of_file():
+    items = [main.WorkItem(data_file='a', label='a_0', input=b'0', last_in_file=False),
+             main.WorkItem(data_file='a', label='a_1', input=b'1', last_in_file=True)]
+
+    assert list(main.skip_work_items(items, count=1)) == items[1:]
+    assert list(main.skip_work_items(items, count=2)) == [items[1]._replace(input=None)]
+
+
+def test_get_shard_files_by_index():
+    files = [f'/input/{i}' for i in range(7)]
+
+    shards = [main.get_shard_files(files=files, input_dir_path='/input', shard=shard, shards=3,
+                                   sharding=main.SHARDING_MODES.INDEX.value) for shard in range(3)]
+
+    assert shards == [['/input/0', '/input/3', '/input/6'], ['/input/1', '/input/4'], ['/input/2', '/input/5']]
+
+
+def test_get_shard_files_by_hash():
+    files = [f'/input/{i}' for i in range(50)]
+
+    shards = [main.get_shard_files(files=files, input_dir_path='/input', shard=shard, shards=4,
+                                   sharding=main.SHARDING_MODES.HASH.value) for shard in range(4)]
+
+    assert sorted(sum(shards, [])) == sorted(files)
+    assert shards == [main.get_shard_files(files=files, input_dir_path='/input', shard=shard, shards=4,
+                                           sharding=main.SHARDING_MODES.HASH.value) for shard in range(4)]
+
+
+def test_aggregate_shards_progress(mocker):
+    mocker.patch('main.all_files_count', 10)
+
+    metrics = {'progress': '10.0', 'progress-shard-0': '3/5', 'progress-shard-1': '1/5', 'accuracy': '0.9'}
+
+    assert main.aggregate_shards_progress(metrics) == 40.0
+
+
+def test_publish_progress_publishes_final_progress_on_stop(mocker):
+    mocker.patch('main.progress', 3)
+    mocker.patch('main.max_progress', 1000)
+    mocker.patch('main.stop_thread', False)
+    publish_mock = mocker.patch('main.publish_progress_metric')
+
+    progress_thread = Thread(target=main.publish_progress, args=('run-name',))
+    progress_thread.start()
+
+    main.notify_progress(stop=True)
+    progress_thread.join(timeout=5)
+
+    assert not progress_thread.is_alive()
+    publish_mock.assert_called_once_with(run_name='run-name', progress_percent=0.3)
+
+
+def test_publish_progress_skips_small_changes(mocker):
+    mocker.patch('main.progress', 0)
+    mocker.patch('main.max_progress', 1000)
+    mocker.patch('main.stop_thread', False)
+    publish_mock = mocker.patch('main.publish_progress_metric')
+
+    progress_thread = Thread(target=main.publish_progress, args=('run-name',))
+    progress_thread.start()
+
+    for _ in range(5):
+        main.progress += 1
+        main.notify_progress()
+    sleep(0.1)
+
+    assert publish_mock.call_count == 0
+
+    main.progress = 1000
+    main.notify_progress()
+    progress_thread.join(timeout=5)
+
+    publish_mock.assert_called_once_with(run_name='run-name', progress_percent=100)
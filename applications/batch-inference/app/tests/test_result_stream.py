@@ -0,0 +1,87 @@
+#
+# Copyright (c) 2019 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import pytest
+
+from result_stream import ResultStreamWriter, read_results, read_result, count_results, count_complete_results, \
+    get_index_path, LABEL_KEY, RESULT_KEY
+
+RESULTS = [("first", b'\x00\x01'), ("second", b''), ("third-ą", b'result' * 100)]
+
+
+@pytest.fixture
+def stream_path(tmpdir):
+    path = str(tmpdir.join('data.tfrecord.result.stream'))
+
+    with ResultStreamWriter(path) as writer:
+        for label, result in RESULTS:
+            writer.write(label=label, result=result)
+
+    return path
+
+
+def test_read_results(stream_path):
+    results = [(item[LABEL_KEY], item[RESULT_KEY]) for item in read_results(stream_path)]
+
+    assert results == RESULTS
+
+
+def test_read_result_by_position(stream_path):
+    assert count_results(stream_path) == len(RESULTS)
+
+    result = read_result(stream_path, 2)
+
+    assert (result[LABEL_KEY], result[RESULT_KEY]) == RESULTS[2]
+
+
+def test_read_result_wrong_position(stream_path):
+    with pytest.raises(IndexError):
+        read_result(stream_path, len(RESULTS))
+
+
+def test_read_results_skips_incomplete_record(stream_path):
+    with open(stream_path, mode='ab') as stream_file:
+        stream_file.write(b'\x00\x00\x00\x05lab')
+
+    assert len(list(read_results(stream_path))) == len(RESULTS)
+
+
+def test_append_after_incomplete_record(stream_path):
+    with open(stream_path, mode='ab') as stream_file:
+        stream_file.write(b'\x00\x00\x00\x05lab')
+
+    with ResultStreamWriter(stream_path, append=True) as writer:
+        assert writer.records_count == len(RESULTS)
+        writer.write(label="fourth", result=b'4')
+
+    results = [(item[LABEL_KEY], item[RESULT_KEY]) for item in read_results(stream_path)]
+
+    assert results == RESULTS + [("fourth", b'4')]
+    assert count_results(stream_path) == len(RESULTS) + 1
+
+
+def test_count_complete_results_skips_indexed_incomplete_record(stream_path):
+    with open(stream_path, mode='ab') as stream_file:
+        offset = stream_file.tell()
+        stream_file.write(b'\x00\x00\x00\x05lab')
+    with open(get_index_path(stream_path), mode='ab') as index_file:
+        index_file.write(offset.to_bytes(8, byteorder='big'))
+
+    assert count_results(stream_path) == len(RESULTS) + 1
+    assert count_complete_results(stream_path) == len(RESULTS)
+
+    with ResultStreamWriter(stream_path, append=True) as writer:
+        assert writer.records_count == count_complete_results(stream_path)
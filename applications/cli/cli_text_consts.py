@@ -675,7 +675,12 @@ class ExperimentCommonTexts:
     PREPARING_RESOURCE_DEFINITIONS_MSG = "Preparing resources' definitions..."
     CLUSTER_CONNECTION_MSG = "Connecting to the cluster..."
     CREATING_ENVIRONMENT_MSG = "Creating {run_name} environment..."
+    CREATING_ENVIRONMENTS_MSG = "Creating environments of runs ({prepared}/{count})..."
     CREATING_RESOURCES_MSG = "Creating {run_name} resources..."
+    CREATING_RESOURCES_OF_RUNS_MSG = "Creating resources of runs ({submitted}/{count} submitted, {failed} failed)..."
+    UPLOADING_EXPERIMENT_MSG = "Uploading experiment..."
+    BUILDING_IMAGE_MSG = "Building experiment image..."
+    BUILDING_IMAGE_STEP_MSG = "Building experiment image... ({step_name}: {step_phase})"
     CLUSTER_CONNECTION_CLOSING_MSG = "Closing tunnel to the cluster..."
     INCORRECT_TEMPLATE_NAME = "Incorrect template name."
     INCORRECT_ENV_PARAMETER = "-e/--env option must be in <KEY>=<VALUE> format."
@@ -15,9 +15,9 @@
 #
 
 
-from collections import namedtuple
+from collections import namedtuple, deque
 from sys import exit
-from typing import List
+from typing import Iterable, List, Set
 
 import click
 from tabulate import tabulate
@@ -74,12 +74,12 @@ def list_unitialized_experiments_in_cli(verbosity_lvl: int, all_users: bool,
                                                state=ExperimentStatus.CREATING,
                                                run_kinds_filter=listed_runs_kinds,
                                                name_filter=name)
-        runs = Run.list(namespace=namespace, name_filter=name, run_kinds_filter=listed_runs_kinds)
 
         # Get Experiments without associated Runs
         names_of_experiment_with_runs = set()
-        for run in runs:
-            names_of_experiment_with_runs.add(run.experiment_name)
+        for runs in Run.list_pages(namespace=namespace, name_filter=name, run_kinds_filter=listed_runs_kinds):
+            for run in runs:
+                names_of_experiment_with_runs.add(run.experiment_name)
 
         uninitialized_experiments = [experiment for experiment in creating_experiments
                                      if experiment.name not in names_of_experiment_with_runs]
@@ -119,28 +119,17 @@ def list_runs_in_cli(verbosity_lvl: int, all_users: bool, name: str,
 
         # List experiments command is actually listing Run resources instead of Experiment resources with one
         # exception - if run is initialized - nctl displays data of an experiment instead of data of a run
-        runs = replace_initializing_runs(
-            Run.list(namespace=namespace, state_list=[status], name_filter=name, run_kinds_filter=listed_runs_kinds))
-        runs_representations = [run.cli_representation for run in runs]
-        if brief:
-            runs_table_data = [
-                (run_representation.name, run_representation.submission_date, run_representation.submitter,
-                 run_representation.status)
-                for run_representation in runs_representations
-            ]
-        elif with_metrics:
-            runs_table_data = runs_representations
-        else:
-            runs_table_data = [
-                (run_representation.name, run_representation.parameters,  # type: ignore
-                 run_representation.submission_date,
-                 run_representation.start_date, run_representation.duration,
-                 run_representation.submitter, run_representation.status, run_representation.template_name,
-                 run_representation.template_version)
-                for run_representation in runs_representations
-            ]
-        click.echo(tabulate(runs_table_data if not count else runs_table_data[-count:],
-                            headers=runs_list_headers, tablefmt=TBLT_TABLE_FORMAT))
+        run_pages = Run.list_pages(namespace=namespace, state_list=[status], name_filter=name,
+                                   run_kinds_filter=listed_runs_kinds)
+        initializing_experiments: Set[str] = set()
+
+        # rows of all pages are displayed in one table, so headers are shown once and columns are aligned for all
+        # runs - only table rows (limited to the last ones if count is given) are kept while pages are received
+        runs_table_data: deque = deque(maxlen=count) if count else deque()
+        for page in run_pages:
+            runs_table_data.extend(get_runs_table_data(replace_initializing_runs(page, initializing_experiments),
+                                                       with_metrics=with_metrics, brief=brief))
+        click.echo(tabulate(list(runs_table_data), headers=runs_list_headers, tablefmt=TBLT_TABLE_FORMAT))
     except InvalidRegularExpressionError:
         handle_error(logger, Texts.INVALID_REGEX_ERROR_MSG, Texts.INVALID_REGEX_ERROR_MSG,
                      add_verbosity_msg=verbosity_lvl == 0)
@@ -150,15 +139,39 @@ def list_runs_in_cli(verbosity_lvl: int, all_users: bool, name: str,
         exit(1)
 
 
-def replace_initializing_runs(run_list: List[Run]):
+def get_runs_table_data(runs: Iterable[Run], with_metrics: bool, brief: bool) -> list:
+    runs_representations = [run.cli_representation for run in runs]
+    if brief:
+        return [
+            (run_representation.name, run_representation.submission_date, run_representation.submitter,
+             run_representation.status)
+            for run_representation in runs_representations
+        ]
+    elif with_metrics:
+        return runs_representations
+    else:
+        return [
+            (run_representation.name, run_representation.parameters,  # type: ignore
+             run_representation.submission_date,
+             run_representation.start_date, run_representation.duration,
+             run_representation.submitter, run_representation.status, run_representation.template_name,
+             run_representation.template_version)
+            for run_representation in runs_representations
+        ]
+
+
+def replace_initializing_runs(run_list: List[Run], initializing_experiments: Set[str] = None):
     """
     Creates a list of runs with initializing runs replaced by fake runs created based
     on experiment data. If there is at least one initializing run within a certain
     experiment - none of runs creating this experiment is displayed.
     :param run_list: list of runs to be checked
+    :param initializing_experiments: names of experiments already found to be initializing - it is updated,
+     so it can be shared between calls for consecutive pages of runs
     :return: list without runs that are initialized at the moment
     """
-    initializing_experiments: set = set()
+    if initializing_experiments is None:
+        initializing_experiments = set()
     ret_list = []
     for run in run_list:
         exp_name = run.experiment_name
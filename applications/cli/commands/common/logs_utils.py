@@ -15,9 +15,13 @@
 #
 
 
+from concurrent.futures import Future, ThreadPoolExecutor
 import os
+import queue
+import re
 from sys import exit
-from typing import List, Generator
+import threading
+from typing import List, Generator, Iterable, Optional
 
 import click
 import dateutil.parser
@@ -34,6 +38,80 @@ from util.system import handle_error
 
 logger = initialize_logger(__name__)
 
+# maximal number of runs whose logs are fetched at the same time
+LOGS_FETCHING_WORKERS = 8
+# maximal number of log entries of a single run fetched in advance, before they are shown or saved
+LOGS_PREFETCH_QUEUE_SIZE = 10000
+
+# dates of logs are usually in ISO format with an optional fraction of a second, e.g.
+# 2018-04-17T09:28:39.123456789+00:00 - they can be formatted without parsing
+LOG_DATE_REGEX = re.compile(r'^(?P<datetime>\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2})(?:[.,]\d+)?'
+                            r'(?P<offset>Z|[+-]\d{2}:\d{2})?$')
+
+
+class LogsPrefetcher:
+    """
+    Fetches logs from many generators concurrently, each into its own bounded queue, so logs of next runs are
+    downloaded while logs of the current one are shown or saved. Generators returned when entering the context
+    yield logs of each run in their original order. When the context is exited, fetching of remaining logs
+    is stopped and logs of runs which weren't fetched yet are not requested at all.
+    """
+    _END = object()
+
+    def __init__(self, logs_generators: List[Iterable[LogEntry]], workers: int = LOGS_FETCHING_WORKERS,
+                 queue_size: int = LOGS_PREFETCH_QUEUE_SIZE):
+        self.logs_generators = logs_generators
+        self.workers = workers
+        self.queues: List[queue.Queue] = [queue.Queue(maxsize=queue_size) for _ in logs_generators]
+        self._stopped = threading.Event()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._futures: List[Future] = []
+
+    def __enter__(self) -> List[Generator[LogEntry, None, None]]:
+        self._executor = ThreadPoolExecutor(max_workers=self.workers)
+        self._futures = [self._executor.submit(self._fetch_logs, logs_generator, logs_queue)
+                         for logs_generator, logs_queue in zip(self.logs_generators, self.queues)]
+        return [self._read_logs(logs_queue) for logs_queue in self.queues]
+
+    def __exit__(self, *args):
+        self._stopped.set()
+        # shutdown() doesn't cancel fetching which hasn't started yet
+        for future in self._futures:
+            future.cancel()
+        self._executor.shutdown()
+
+    def _put(self, logs_queue: queue.Queue, item) -> bool:
+        while not self._stopped.is_set():
+            try:
+                logs_queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _fetch_logs(self, logs_generator: Iterable[LogEntry], logs_queue: queue.Queue):
+        # logs are requested only when the generator is iterated, so nothing is requested after stopping
+        if self._stopped.is_set():
+            return
+        try:
+            for log_entry in logs_generator:
+                if not self._put(logs_queue, log_entry):
+                    return
+        except Exception as exe:
+            # exception is raised (and handled) when logs are read
+            self._put(logs_queue, exe)
+            return
+        self._put(logs_queue, self._END)
+
+    def _read_logs(self, logs_queue: queue.Queue) -> Generator[LogEntry, None, None]:
+        while True:
+            item = logs_queue.get()
+            if item is self._END:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+
 
 def get_logs(experiment_name: str, min_severity: SeverityLevel, start_date: str,
              end_date: str, pod_ids: str, pod_status: PodStatus, match: str, output: bool,
@@ -67,20 +145,24 @@ def get_logs(experiment_name: str, min_severity: SeverityLevel, start_date: str,
         follow_logs = True if follow and not output else False
         if output and len(runs) > 1:
             click.echo(Texts.MORE_EXP_LOGS_MESSAGE)
+        runs_logs_generators = []
         for run in runs:
             start_date = start_date if start_date else run.creation_timestamp
-            run_logs_generator = es_client.get_experiment_logs_generator(run=run, namespace=namespace,
-                                                                         min_severity=min_severity,
-                                                                         start_date=start_date, end_date=end_date,
-                                                                         pod_ids=pod_ids, pod_status=pod_status,
-                                                                         follow=follow_logs)
-            if output:
-                save_logs_to_file(logs_generator=run_logs_generator, instance_name=run.name,
-                                  instance_type=instance_type)
-            else:
-                if len(runs) > 1:
-                    click.echo(f'Experiment : {run.name}')
-                print_logs(run_logs_generator=run_logs_generator, pager=pager)
+            runs_logs_generators.append(es_client.get_experiment_logs_generator(run=run, namespace=namespace,
+                                                                                min_severity=min_severity,
+                                                                                start_date=start_date,
+                                                                                end_date=end_date,
+                                                                                pod_ids=pod_ids,
+                                                                                pod_status=pod_status,
+                                                                                follow=follow_logs))
+        if follow_logs:
+            show_runs_logs(runs=runs, runs_logs_generators=runs_logs_generators, output=output, pager=pager,
+                           instance_type=instance_type)
+        else:
+            # logs of all runs are fetched concurrently, and shown or saved one run after another
+            with LogsPrefetcher(runs_logs_generators) as prefetched_logs_generators:
+                show_runs_logs(runs=runs, runs_logs_generators=prefetched_logs_generators, output=output,
+                               pager=pager, instance_type=instance_type)
     except ValueError:
         handle_error(logger, Texts.EXPERIMENT_NOT_EXISTS_ERROR_MSG.format(experiment_name=experiment_name,
                                                                           instance_type=instance_type.capitalize()),
@@ -93,7 +175,25 @@ def get_logs(experiment_name: str, min_severity: SeverityLevel, start_date: str,
         exit(1)
 
 
+def show_runs_logs(runs: List[Run], runs_logs_generators: List[Iterable[LogEntry]], output: bool, pager: bool,
+                   instance_type: str):
+    for run, run_logs_generator in zip(runs, runs_logs_generators):
+        if output:
+            save_logs_to_file(logs_generator=run_logs_generator, instance_name=run.name,
+                              instance_type=instance_type)
+        else:
+            if len(runs) > 1:
+                click.echo(f'Experiment : {run.name}')
+            print_logs(run_logs_generator=run_logs_generator, pager=pager)
+
+
 def format_log_date(date: str):
+    # dates in the most common format are formatted without (slow) parsing
+    match = LOG_DATE_REGEX.match(date)
+    if match:
+        offset = match.group('offset')
+        return match.group('datetime') + ('+00:00' if offset == 'Z' else offset or '')
+
     log_date = dateutil.parser.parse(date)
     log_date = log_date.replace(microsecond=0)
     formatted_date = log_date.isoformat()
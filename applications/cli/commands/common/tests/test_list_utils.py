@@ -64,8 +64,8 @@ TEST_LIST_HEADERS = ["Name", "Parameters", "Metrics", "Submission date", "Owner"
 
 
 def test_list_unitialized_experiments_in_cli_success(mocker, capsys):
-    api_list_runs_mock = mocker.patch("commands.common.list_utils.Run.list")
-    api_list_runs_mock.return_value = TEST_RUNS
+    api_list_runs_mock = mocker.patch("commands.common.list_utils.Run.list_pages")
+    api_list_runs_mock.return_value = [TEST_RUNS]
 
     api_list_experiments_mock = mocker.patch("commands.common.list_utils.Experiment.list")
     api_list_experiments_mock.return_value = TEST_NONINITIALIZED_EXPERIMENTS
@@ -86,8 +86,8 @@ def test_list_unitialized_experiments_in_cli_success(mocker, capsys):
 
 
 def test_list_unitialized_experiments_in_cli_one_row(mocker, capsys):
-    api_list_runs_mock = mocker.patch("commands.common.list_utils.Run.list")
-    api_list_runs_mock.return_value = TEST_RUNS
+    api_list_runs_mock = mocker.patch("commands.common.list_utils.Run.list_pages")
+    api_list_runs_mock.return_value = [TEST_RUNS]
 
     api_list_experiments_mock = mocker.patch("commands.common.list_utils.Experiment.list")
     api_list_experiments_mock.return_value = TEST_NONINITIALIZED_EXPERIMENTS
@@ -108,8 +108,8 @@ def test_list_unitialized_experiments_in_cli_one_row(mocker, capsys):
 
 
 def test_list_experiments_success(mocker):
-    api_list_runs_mock = mocker.patch("commands.common.list_utils.Run.list")
-    api_list_runs_mock.return_value = TEST_RUNS
+    api_list_runs_mock = mocker.patch("commands.common.list_utils.Run.list_pages")
+    api_list_runs_mock.return_value = [TEST_RUNS]
     mocker.patch("commands.common.list_utils.Experiment.get", return_value=TEST_EXPERIMENT)
     get_namespace_mock = mocker.patch("commands.common.list_utils.get_kubectl_current_context_namespace")
 
@@ -121,8 +121,8 @@ def test_list_experiments_success(mocker):
 
 
 def test_list_experiments_all_users_success(mocker):
-    api_list_runs_mock = mocker.patch("commands.common.list_utils.Run.list")
-    api_list_runs_mock.return_value = TEST_RUNS
+    api_list_runs_mock = mocker.patch("commands.common.list_utils.Run.list_pages")
+    api_list_runs_mock.return_value = [TEST_RUNS]
 
     mocker.patch("commands.common.list_utils.Experiment.get", return_value=TEST_EXPERIMENT)
 
@@ -136,7 +136,7 @@ def test_list_experiments_all_users_success(mocker):
 
 
 def test_list_experiments_failure(mocker):
-    api_list_runs_mock = mocker.patch("commands.common.list_utils.Run.list")
+    api_list_runs_mock = mocker.patch("commands.common.list_utils.Run.list_pages")
     api_list_runs_mock.side_effect = RuntimeError
 
     get_namespace_mock = mocker.patch("commands.common.list_utils.get_kubectl_current_context_namespace")
@@ -152,9 +152,9 @@ def test_list_experiments_failure(mocker):
 
 
 def test_list_experiments_one_user_success(mocker, capsys):
-    api_list_runs_mock = mocker.patch("commands.common.list_utils.Run.list")
+    api_list_runs_mock = mocker.patch("commands.common.list_utils.Run.list_pages")
     mocker.patch("dateutil.tz.tzlocal").return_value = dateutil.tz.UTC
-    api_list_runs_mock.return_value = TEST_RUNS
+    api_list_runs_mock.return_value = [TEST_RUNS]
     mocker.patch("commands.common.list_utils.Experiment.get", return_value=TEST_EXPERIMENT)
 
     get_namespace_mock = mocker.patch("commands.common.list_utils.get_kubectl_current_context_namespace")
@@ -175,8 +175,8 @@ def test_list_experiments_one_user_success(mocker, capsys):
 
 
 def test_list_experiments_brief_success(mocker, capsys):
-    api_list_runs_mock = mocker.patch("commands.common.list_utils.Run.list")
-    api_list_runs_mock.return_value = TEST_RUNS
+    api_list_runs_mock = mocker.patch("commands.common.list_utils.Run.list_pages")
+    api_list_runs_mock.return_value = [TEST_RUNS]
 
     mocker.patch("commands.common.list_utils.Experiment.get", return_value=TEST_EXPERIMENT)
 
@@ -193,6 +193,49 @@ def test_list_experiments_brief_success(mocker, capsys):
     assert api_list_runs_mock.call_count == 1, "Runs were not retrieved"
 
 
+def test_list_experiments_pages_success(mocker, capsys):
+    api_list_runs_mock = mocker.patch("commands.common.list_utils.Run.list_pages")
+    api_list_runs_mock.return_value = [[TEST_RUNS[0]], [], [TEST_RUNS[1]]]
+
+    mocker.patch("commands.common.list_utils.Experiment.get", return_value=TEST_EXPERIMENT)
+    mocker.patch("commands.common.list_utils.get_kubectl_current_context_namespace")
+
+    list_utils.list_runs_in_cli(verbosity_lvl=0, all_users=True, name="", status=None, listed_runs_kinds=[],
+                                runs_list_headers=TEST_LIST_HEADERS, with_metrics=False, brief=True)
+
+    captured = capsys.readouterr()
+
+    assert "test-experiment " in captured.out
+    assert "test-experiment-2" in captured.out
+    assert captured.out.count("Submission date") == 1
+
+    # runs from many pages are displayed in the same table as runs from a single page
+    api_list_runs_mock.return_value = [TEST_RUNS]
+    list_utils.list_runs_in_cli(verbosity_lvl=0, all_users=True, name="", status=None, listed_runs_kinds=[],
+                                runs_list_headers=TEST_LIST_HEADERS, with_metrics=False, brief=True)
+
+    assert capsys.readouterr().out == captured.out
+
+
+def test_list_experiments_pages_count(mocker, capsys):
+    api_list_runs_mock = mocker.patch("commands.common.list_utils.Run.list_pages")
+    api_list_runs_mock.return_value = [[TEST_RUNS[0]], [TEST_RUNS[1], TEST_RUNS_CREATING[0]],
+                                       [TEST_RUNS_CREATING[1]]]
+
+    mocker.patch("commands.common.list_utils.Experiment.get", return_value=TEST_EXPERIMENT)
+    mocker.patch("commands.common.list_utils.get_kubectl_current_context_namespace")
+
+    list_utils.list_runs_in_cli(verbosity_lvl=0, all_users=True, name="", status=None, listed_runs_kinds=[],
+                                runs_list_headers=TEST_LIST_HEADERS, with_metrics=False, count=2, brief=True)
+
+    captured = capsys.readouterr()
+
+    assert "test-experiment " not in captured.out
+    assert "test-experiment-1" in captured.out
+    assert "test-experiment-2" in captured.out
+    assert captured.out.count("Submission date") == 1
+
+
 def test_create_fake_run():
     assert TEST_RUN == list_utils.create_fake_run(TEST_EXPERIMENT)
 
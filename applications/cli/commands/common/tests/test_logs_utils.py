@@ -0,0 +1,82 @@
+#
+# Copyright (c) 2019 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+
+import dateutil.parser
+import pytest
+
+from commands.common.logs_utils import format_log_date, LogsPrefetcher
+from logs_aggregator.k8s_log_entry import LogEntry
+
+
+@pytest.mark.parametrize('date', ['2018-04-17T09:28:39+00:00', '2018-04-17T09:28:39.123456789+00:00',
+                                  '2018-04-17T09:28:39.123Z', '2018-04-17T09:28:39-05:30',
+                                  '2018-04-17T09:28:39', '2018-04-17 09:28:39.123+0000'])
+def test_format_log_date(date):
+    assert format_log_date(date) == dateutil.parser.parse(date).replace(microsecond=0).isoformat()
+
+
+def _log_entries(run_name: str, count: int):
+    for i in range(count):
+        yield LogEntry(date='2018-04-17T09:28:39+00:00', content=f'{run_name} {i}', pod_name='pod',
+                       namespace='default')
+
+
+def test_logs_prefetcher():
+    logs_generators = [_log_entries(f'run-{i}', 20) for i in range(5)]
+
+    with LogsPrefetcher(logs_generators, workers=2, queue_size=3) as prefetched_logs_generators:
+        runs_logs = [[log_entry.content for log_entry in logs_generator]
+                     for logs_generator in prefetched_logs_generators]
+
+    assert runs_logs == [[f'run-{i} {j}' for j in range(20)] for i in range(5)]
+
+
+def test_logs_prefetcher_failure():
+    def failing_logs_generator():
+        yield from _log_entries('run', 2)
+        raise RuntimeError
+
+    with LogsPrefetcher([failing_logs_generator()]) as prefetched_logs_generators:
+        logs_generator = prefetched_logs_generators[0]
+        assert next(logs_generator).content == 'run 0'
+        assert next(logs_generator).content == 'run 1'
+        with pytest.raises(RuntimeError):
+            next(logs_generator)
+
+
+def test_logs_prefetcher_stopped():
+    logs_generators = [_log_entries(f'run-{i}', 1000) for i in range(3)]
+
+    # logs which were not read must not block exiting of the context
+    with LogsPrefetcher(logs_generators, queue_size=1) as prefetched_logs_generators:
+        assert next(prefetched_logs_generators[0]).content == 'run-0 0'
+
+
+def test_logs_prefetcher_stopped_before_fetching_all_runs():
+    started_runs = []
+
+    def logs_generator(run_name: str):
+        started_runs.append(run_name)
+        yield from _log_entries(run_name, 1000)
+
+    logs_generators = [logs_generator(f'run-{i}') for i in range(20)]
+
+    with LogsPrefetcher(logs_generators, workers=2, queue_size=1) as prefetched_logs_generators:
+        assert next(prefetched_logs_generators[0]).content == 'run-0 0'
+
+    # only logs of runs fetched by workers when the context was exited were requested
+    assert len(started_runs) <= 2
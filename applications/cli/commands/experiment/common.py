@@ -15,6 +15,7 @@
 #
 
 from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait
 from distutils.dir_util import copy_tree
 import itertools
 import os
@@ -28,7 +29,7 @@ import yaml
 
 import click
 
-from typing import Tuple, List, Dict, Union, Optional
+from typing import Callable, Tuple, List, Dict, Union, Optional
 from pathlib import Path
 from tabulate import tabulate
 from marshmallow import ValidationError
@@ -41,8 +42,8 @@ from packs.tf_training import update_configuration, get_pod_count
 import platform_resources.experiment as experiments_model
 from platform_resources.run import Run, RunStatus, RunKinds
 
-from platform_resources.workflow import ExperimentImageBuildWorkflow, ArgoWorkflow
-from util.filesystem import get_total_directory_size_in_bytes
+from platform_resources.workflow import ExperimentImageBuildWorkflow, ArgoWorkflow, ArgoWorkflowStep
+from util.filesystem import get_total_directory_size_in_bytes, ContentStore
 from util.config import EXPERIMENTS_DIR_NAME, FOLDER_DIR_NAME, Config, TBLT_TABLE_FORMAT
 from util.helm import delete_helm_release
 from util.k8s.kubectl import delete_k8s_object
@@ -85,6 +86,16 @@ TEMPL_FOLDER_NAME = "templates"
 
 EXP_IMAGE_BUILD_WORKFLOW_SPEC = "exp-image-build.yaml"
 
+# environmental variable with a number of runs of an experiment processed in parallel during submission
+NCTL_SUBMIT_WORKERS_ENV_NAME = 'NCTL_SUBMIT_WORKERS'
+DEFAULT_SUBMIT_WORKERS = 8
+
+# if set to a non-empty value, environments of runs of an experiment share one copy of a script folder and a pack
+# - files are hardlinked from a content-addressed store, and only generated files differ between runs
+NCTL_DEDUPLICATE_ENVIRONMENTS_ENV_NAME = 'NCTL_DEDUPLICATE_ENVIRONMENTS'
+# name of a directory (in the experiments directory) with content-addressed stores of experiments
+CONTENT_STORE_DIR_NAME = '.store'
+
 log = initialize_logger(__name__)
 
 
@@ -122,6 +133,27 @@ def get_run_environment_path(run_name: str) -> str:
     return os.path.join(Config().config_path, EXPERIMENTS_DIR_NAME, run_name)
 
 
+def get_submit_workers_count() -> int:
+    workers = os.environ.get(NCTL_SUBMIT_WORKERS_ENV_NAME)
+    if not workers:
+        return DEFAULT_SUBMIT_WORKERS
+    try:
+        return max(int(workers), 1)
+    except ValueError:
+        log.warning(f'Invalid value of {NCTL_SUBMIT_WORKERS_ENV_NAME}: {workers}, '
+                    f'{DEFAULT_SUBMIT_WORKERS} workers will be used.')
+        return DEFAULT_SUBMIT_WORKERS
+
+
+def is_environments_deduplication_enabled() -> bool:
+    return bool(os.environ.get(NCTL_DEDUPLICATE_ENVIRONMENTS_ENV_NAME))
+
+
+def get_content_store(experiment_name: str) -> ContentStore:
+    return ContentStore(os.path.join(Config().config_path, EXPERIMENTS_DIR_NAME, CONTENT_STORE_DIR_NAME,
+                                     experiment_name))
+
+
 def check_run_environment(run_environment_path: str):
     """
     If Run environment is not empty, ask user if it should be deleted in order to proceed with Run environment creation.
@@ -146,7 +178,8 @@ def check_run_environment(run_environment_path: str):
 
 
 def create_environment(experiment_name: str, file_location: str = None, folder_location: str = None,
-                       show_folder_size_warning=True, max_folder_size_in_bytes=1024*1024, spinner_to_hide=None) -> str:
+                       show_folder_size_warning=True, max_folder_size_in_bytes=1024*1024, spinner_to_hide=None,
+                       content_store: ContentStore = None) -> str:
     """
     Creates a complete environment for executing a training using draft.
 
@@ -158,6 +191,7 @@ def create_environment(experiment_name: str, file_location: str = None, folder_l
      value in max_folder_size_in_bytes param
     :param max_folder_size_in_bytes: maximum script folder size,
     :param spinner_to_hide: provide spinner, if it should be hidden before folder size warning
+    :param content_store: if given, files are hardlinked from this store instead of being copied
     :return: (experiment_folder)
     experiment_folder - folder with experiment's artifacts
     In case of any problems during creation of an enviornment it throws an
@@ -183,7 +217,10 @@ def create_environment(experiment_name: str, file_location: str = None, folder_l
     # copy training script - it overwrites the file taken from a folder_location
     if file_location:
         try:
-            shutil.copy2(file_location, folder_path)
+            if content_store:
+                content_store.link_file(file_location, folder_path)
+            else:
+                shutil.copy2(file_location, folder_path)
             if get_current_os() == OS.WINDOWS:
                 os.chmod(os.path.join(folder_path, os.path.basename(file_location)), 0o666)  # nosec
         except Exception:
@@ -192,20 +229,14 @@ def create_environment(experiment_name: str, file_location: str = None, folder_l
 
     # copy folder content
     if folder_location:
-        folder_size = get_total_directory_size_in_bytes(folder_location)
-        if show_folder_size_warning and folder_size >= max_folder_size_in_bytes:
-            if spinner_to_hide:
-                spinner_to_hide.hide()
-            if (not click.get_current_context().obj.force) and not (click.confirm(
-                    f'Experiment\'s script folder location size ({folder_size / 1024 / 1024:.2f} MB) '
-                    f'exceeds {max_folder_size_in_bytes / 1024 / 1024:.2f} MB. '
-                    f'It is highly recommended to use input/output shares for large amounts of data '
-                    f'instead of submitting them along with experiment. Do you want to continue?')):
-                exit(2)
-            if spinner_to_hide:
-                spinner_to_hide.show()
+        if show_folder_size_warning:
+            confirm_script_folder_size(folder_location, max_folder_size_in_bytes=max_folder_size_in_bytes,
+                                       spinner_to_hide=spinner_to_hide)
         try:
-            copy_tree(folder_location, folder_path)
+            if content_store:
+                content_store.link_tree_content(folder_location, folder_path)
+            else:
+                copy_tree(folder_location, folder_path)
         except Exception:
             log.exception("Create environment - copying training folder error.")
             raise SubmitExperimentError(message_prefix.format(reason=Texts.DIR_CANT_BE_COPIED_ERROR_TEXT))
@@ -215,6 +246,24 @@ def create_environment(experiment_name: str, file_location: str = None, folder_l
     return run_environment_path
 
 
+def confirm_script_folder_size(folder_location: str, max_folder_size_in_bytes=1024*1024, spinner_to_hide=None):
+    """
+    Asks user whether to continue, if size of the script folder exceeds max_folder_size_in_bytes.
+    """
+    folder_size = get_total_directory_size_in_bytes(folder_location)
+    if folder_size >= max_folder_size_in_bytes:
+        if spinner_to_hide:
+            spinner_to_hide.hide()
+        if (not click.get_current_context().obj.force) and not (click.confirm(
+                f'Experiment\'s script folder location size ({folder_size / 1024 / 1024:.2f} MB) '
+                f'exceeds {max_folder_size_in_bytes / 1024 / 1024:.2f} MB. '
+                f'It is highly recommended to use input/output shares for large amounts of data '
+                f'instead of submitting them along with experiment. Do you want to continue?')):
+            exit(2)
+        if spinner_to_hide:
+            spinner_to_hide.show()
+
+
 def remove_sempahore(experiment_name: str):
     run_environment_path = get_run_environment_path(experiment_name)
     semaphore_file = os.path.join(run_environment_path, EXP_SUB_SEMAPHORE_FILENAME)
@@ -296,27 +345,13 @@ def submit_experiment(template: str, name: str = None, run_kind: RunKinds = RunK
         try:
             cluster_registry_port = get_app_service_node_port(nauta_app_name=NAUTAAppNames.DOCKER_REGISTRY)
             # prepare environments for all experiment's runs
-            for experiment_run in runs_list:
-                if script_parameters and experiment_run.parameters:
-                    current_script_parameters = script_parameters + experiment_run.parameters
-                elif script_parameters:
-                    current_script_parameters = script_parameters
-                elif experiment_run.parameters:
-                    current_script_parameters = experiment_run.parameters
-                else:
-                    current_script_parameters = None
-                run_folder, script_location, pod_count = \
-                    prepare_experiment_environment(experiment_name=experiment_name,
-                                                   run_name=experiment_run.name,
-                                                   local_script_location=script_location,
-                                                   script_folder_location=script_folder_location,  # noqa: E501
-                                                   script_parameters=current_script_parameters,
-                                                   pack_type=template, pack_params=pack_params,
-                                                   cluster_registry_port=cluster_registry_port,
-                                                   env_variables=env_variables,
-                                                   requirements_file=requirements_file,
-                                                   username=namespace,
-                                                   run_kind=run_kind)
+            prepared_environments = prepare_experiment_environments(
+                runs_list=runs_list, experiment_name=experiment_name, script_parameters=script_parameters,
+                local_script_location=script_location, script_folder_location=script_folder_location,
+                pack_type=template, pack_params=pack_params, cluster_registry_port=cluster_registry_port,
+                env_variables=env_variables, requirements_file=requirements_file, username=namespace,
+                run_kind=run_kind)
+            for experiment_run, (run_folder, script_location, pod_count) in zip(runs_list, prepared_environments):
                 # Set correct pod count
                 if not pod_count or pod_count < 1:
                     raise SubmitExperimentError('Unable to determine pod count: make sure that values.yaml '
@@ -369,12 +404,16 @@ def submit_experiment(template: str, name: str = None, run_kind: RunKinds = RunK
                                                   template_version=template_version)
         experiment.create(namespace=namespace, labels=labels)
 
-        with spinner('Uploading experiment...'):
+        with spinner(Texts.UPLOADING_EXPERIMENT_MSG) as upload_spinner:
+            def show_upload_progress(progress: str):
+                upload_spinner.text = f'{Texts.UPLOADING_EXPERIMENT_MSG} {progress}'
+
             try:
                 upload_experiment_to_git_repo_manager(experiments_workdir=get_run_environment_path(''),
                                                       experiment_name=experiment_name,
                                                       run_name=runs_list[0].name,
-                                                      username=namespace)
+                                                      username=namespace,
+                                                      progress_callback=show_upload_progress)
             except Exception:
                 log.exception('Failed to upload experiment.')
                 try:
@@ -385,14 +424,20 @@ def submit_experiment(template: str, name: str = None, run_kind: RunKinds = RunK
                                   f'to {experiments_model.ExperimentStatus.FAILED}')
                 raise SubmitExperimentError('Failed to upload experiment.')
 
-        with spinner('Building experiment image...'):
+        with spinner(Texts.BUILDING_IMAGE_MSG) as build_spinner:
+            def show_build_progress(steps: List[ArgoWorkflowStep]):
+                # the most recently started step is shown
+                last_step = max(steps, key=lambda step: step.started_at or '')
+                build_spinner.text = Texts.BUILDING_IMAGE_STEP_MSG.format(step_name=last_step.name,
+                                                                          step_phase=last_step.phase)
+
             try:
                 image_build_workflow: ExperimentImageBuildWorkflow = ExperimentImageBuildWorkflow.from_yaml(
                     yaml_template_path=f'{Config().config_path}/workflows/{EXP_IMAGE_BUILD_WORKFLOW_SPEC}',
                     username=namespace,
                     experiment_name=experiment_name)
                 image_build_workflow.create(namespace=namespace)
-                image_build_workflow.wait_for_completion()
+                image_build_workflow.wait_for_completion(progress_callback=show_build_progress)
             except Exception:
                 error_msg = 'Failed to build experiment image.'
                 log.exception(error_msg)
@@ -405,28 +450,8 @@ def submit_experiment(template: str, name: str = None, run_kind: RunKinds = RunK
                                   f'to {experiments_model.ExperimentStatus.FAILED}')
                 raise SubmitExperimentError(error_msg)
         # submit runs
-        run_errors: Dict[str, str] = {}
-        for run, run_folder in zip(runs_list, experiment_run_folders):
-            try:
-                run.state = RunStatus.QUEUED
-                with spinner(text=Texts.CREATING_RESOURCES_MSG.format(run_name=run.name)):
-                    # Add Run object with runKind label and pack params as annotations
-                    run.create(namespace=namespace, labels={'runKind': run_kind.value},
-                               annotations={pack_param_name: pack_param_value
-                                            for pack_param_name, pack_param_value in pack_params})
-                    submitted_runs.append(run)
-                    submit_draft_pack(run_name=run.name,
-                                      run_folder=run_folder,
-                                      namespace=namespace)
-            except Exception as exe:
-                delete_environment(run_folder)
-                try:
-                    run.state = RunStatus.FAILED
-                    run_errors[run.name] = str(exe)
-                    run.update()
-                except Exception as rexe:
-                    # update of non-existing run may fail
-                    log.debug(Texts.ERROR_DURING_PATCHING_RUN.format(str(rexe)))
+        run_errors = submit_runs(runs_list=runs_list, run_folders=experiment_run_folders, namespace=namespace,
+                                 run_kind=run_kind, pack_params=pack_params)
         # Delete experiment if no Runs were submitted
         if not submitted_runs:
             click.echo(Texts.SUBMISSION_FAIL_ERROR_MSG)
@@ -496,6 +521,93 @@ def prepare_list_of_runs(parameter_range: List[Tuple[str, str]], experiment_name
     return run_list
 
 
+def prepare_experiment_environments(runs_list: List[Run], experiment_name: str, script_parameters: Tuple[str, ...],
+                                    pack_type: str, cluster_registry_port: int, username: str,
+                                    local_script_location: str = None, script_folder_location: str = None,
+                                    pack_params: List[Tuple[str, str]] = None, env_variables: List[str] = None,
+                                    requirements_file: str = None,
+                                    run_kind: RunKinds = RunKinds.TRAINING) -> List[PrepareExperimentResult]:
+    """
+    Prepares draft's environments for all runs of an experiment. If there is more than one run, environments are
+    prepared in parallel by NCTL_SUBMIT_WORKERS workers - questions to the user are asked before that. If
+    preparation of any environment fails, all already prepared environments are removed. If
+    NCTL_DEDUPLICATE_ENVIRONMENTS is set, environments share files hardlinked from a content-addressed store.
+    :return: list of results of prepare_experiment_environment, in the order of runs_list
+    """
+    def get_run_script_parameters(experiment_run: Run) -> Optional[Tuple[str, ...]]:
+        if script_parameters and experiment_run.parameters:
+            return script_parameters + experiment_run.parameters
+        elif script_parameters:
+            return script_parameters
+        elif experiment_run.parameters:
+            return experiment_run.parameters
+        return None
+
+    content_store = get_content_store(experiment_name) \
+        if len(runs_list) > 1 and is_environments_deduplication_enabled() else None
+
+    def prepare(experiment_run: Run, interactive: bool) -> PrepareExperimentResult:
+        return prepare_experiment_environment(experiment_name=experiment_name, run_name=experiment_run.name,
+                                              local_script_location=local_script_location,
+                                              script_folder_location=script_folder_location,
+                                              script_parameters=get_run_script_parameters(experiment_run),
+                                              pack_type=pack_type, pack_params=pack_params,
+                                              cluster_registry_port=cluster_registry_port,
+                                              env_variables=env_variables, requirements_file=requirements_file,
+                                              username=username, run_kind=run_kind, interactive=interactive,
+                                              content_store=content_store)
+
+    try:
+        return _prepare_experiment_environments(runs_list, prepare, script_folder_location=script_folder_location,
+                                                run_kind=run_kind)
+    finally:
+        # environments keep their links to stored files, so the store itself is no longer needed
+        if content_store:
+            content_store.clear()
+
+
+def _prepare_experiment_environments(runs_list: List[Run], prepare: Callable[[Run, bool], PrepareExperimentResult],
+                                     script_folder_location: str = None,
+                                     run_kind: RunKinds = RunKinds.TRAINING) -> List[PrepareExperimentResult]:
+    workers_count = min(get_submit_workers_count(), len(runs_list))
+    if workers_count <= 1:
+        results = []
+        try:
+            for experiment_run in runs_list:
+                results.append(prepare(experiment_run, True))
+        except Exception:
+            for result in results:
+                delete_environment(result.folder_name)
+            raise
+        return results
+
+    for experiment_run in runs_list:
+        check_run_environment(get_run_environment_path(experiment_run.name))
+    if script_folder_location and run_kind == RunKinds.TRAINING:
+        confirm_script_folder_size(script_folder_location)
+
+    runs_count = len(runs_list)
+    with spinner(text=Texts.CREATING_ENVIRONMENTS_MSG.format(prepared=0, count=runs_count)) as create_env_spinner:
+        with ThreadPoolExecutor(max_workers=workers_count) as executor:
+            futures = [executor.submit(prepare, experiment_run, False) for experiment_run in runs_list]
+            try:
+                for prepared, future in enumerate(as_completed(futures), start=1):
+                    future.result()
+                    create_env_spinner.text = \
+                        Texts.CREATING_ENVIRONMENTS_MSG.format(prepared=prepared, count=runs_count)
+            except Exception:
+                for future in futures:
+                    future.cancel()
+                wait(futures)
+                # environment of a failed run is removed by prepare_experiment_environment
+                for future in futures:
+                    if not future.cancelled() and not future.exception():
+                        delete_environment(future.result().folder_name)
+                raise
+
+    return [future.result() for future in futures]
+
+
 def prepare_experiment_environment(experiment_name: str, run_name: str,
                                    script_parameters: Tuple[str, ...],
                                    pack_type: str, cluster_registry_port: int,
@@ -505,7 +617,9 @@ def prepare_experiment_environment(experiment_name: str, run_name: str,
                                    pack_params: List[Tuple[str, str]] = None,
                                    env_variables: List[str] = None,
                                    requirements_file: str = None,
-                                   run_kind: RunKinds = RunKinds.TRAINING) -> PrepareExperimentResult:
+                                   run_kind: RunKinds = RunKinds.TRAINING,
+                                   interactive: bool = True,
+                                   content_store: ContentStore = None) -> PrepareExperimentResult:
     """
     Prepares draft's environment for a certain run based on provided parameters
     :param experiment_name: name of an experiment
@@ -518,6 +632,10 @@ def prepare_experiment_environment(experiment_name: str, run_name: str,
     :param pack_params: additional pack params
     :param env_variables: environmental variables to be passed to training
     :param requirements_file: path to a file with experiment requirements
+    :param interactive: if False, the user is not asked any questions and no spinner is displayed - so
+     environments of many runs can be prepared in parallel
+    :param content_store: if given, script folder and pack files are hardlinked from this store instead of
+     being copied
     :return: name of folder with an environment created for this run, a name of script used for training purposes
             and count of Pods
     In case of any problems - an exception with a description of a problem is thrown
@@ -526,20 +644,34 @@ def prepare_experiment_environment(experiment_name: str, run_name: str,
     run_folder = get_run_environment_path(run_name)
     try:
         # check environment directory
-        check_run_environment(run_folder)
-        with spinner(text=Texts.CREATING_ENVIRONMENT_MSG.format(run_name=run_name)) as create_env_spinner:
+        if interactive:
+            check_run_environment(run_folder)
+
+        def create_run_environment(create_env_spinner=None) -> Tuple[str, int]:
             # create an environment
             create_environment(run_name, local_script_location, script_folder_location,
-                               show_folder_size_warning=bool(run_kind == RunKinds.TRAINING),
-                               spinner_to_hide=create_env_spinner)
+                               show_folder_size_warning=interactive and run_kind == RunKinds.TRAINING,
+                               spinner_to_hide=create_env_spinner, content_store=content_store)
             # generate draft's data
-            output, exit_code = cmd.create(working_directory=run_folder, pack_type=pack_type)
+            output, exit_code = cmd.create(working_directory=run_folder, pack_type=pack_type,
+                                           content_store=content_store)
             # copy requirements file if it was provided, create empty requirements file otherwise
             dest_requirements_file = os.path.join(run_folder, 'requirements.txt')
             if requirements_file:
+                # file taken from a pack may be linked from the content store - it's replaced, not overwritten
+                if os.path.lexists(dest_requirements_file):
+                    os.remove(dest_requirements_file)
                 shutil.copyfile(requirements_file, dest_requirements_file)
             else:
                 Path(dest_requirements_file).touch()
+            return output, exit_code
+
+        if interactive:
+            with spinner(text=Texts.CREATING_ENVIRONMENT_MSG.format(run_name=run_name)) as create_env_spinner:
+                output, exit_code = create_run_environment(create_env_spinner)
+        else:
+            # spinners can't be displayed when environments of many runs are prepared in parallel
+            output, exit_code = create_run_environment()
 
         if exit_code:
             raise SubmitExperimentError(Texts.EXP_TEMPLATES_NOT_GENERATED_ERROR_MSG.format(reason=output))
@@ -584,6 +716,63 @@ def get_log_filename(log_output: str):
     return None
 
 
+def submit_runs(runs_list: List[Run], run_folders: List[str], namespace: str, run_kind: RunKinds,
+                pack_params: List[Tuple[str, str]]) -> Dict[str, str]:
+    """
+    Creates Run objects and installs draft packs of all runs of an experiment. If there is more than one run,
+    they are submitted in parallel by NCTL_SUBMIT_WORKERS workers.
+    :return: dictionary of errors of runs which failed to be submitted, indexed by names of runs
+    """
+    run_errors: Dict[str, str] = {}
+
+    def submit_run(run: Run, run_folder: str) -> bool:
+        try:
+            run.state = RunStatus.QUEUED
+            # Add Run object with runKind label and pack params as annotations
+            run.create(namespace=namespace, labels={'runKind': run_kind.value},
+                       annotations={pack_param_name: pack_param_value
+                                    for pack_param_name, pack_param_value in pack_params})
+            submitted_runs.append(run)
+            submit_draft_pack(run_name=run.name,
+                              run_folder=run_folder,
+                              namespace=namespace)
+            return True
+        except Exception as exe:
+            delete_environment(run_folder)
+            try:
+                run.state = RunStatus.FAILED
+                run_errors[run.name] = str(exe)
+                run.update()
+            except Exception as rexe:
+                # update of non-existing run may fail
+                log.debug(Texts.ERROR_DURING_PATCHING_RUN.format(str(rexe)))
+            return False
+
+    workers_count = min(get_submit_workers_count(), len(runs_list))
+    if workers_count <= 1:
+        for run, run_folder in zip(runs_list, run_folders):
+            with spinner(text=Texts.CREATING_RESOURCES_MSG.format(run_name=run.name)):
+                submit_run(run, run_folder)
+        return run_errors
+
+    runs_count = len(runs_list)
+    with spinner(text=Texts.CREATING_RESOURCES_OF_RUNS_MSG.format(submitted=0, failed=0, count=runs_count)) \
+            as create_resources_spinner:
+        with ThreadPoolExecutor(max_workers=workers_count) as executor:
+            futures = [executor.submit(submit_run, run, run_folder)
+                       for run, run_folder in zip(runs_list, run_folders)]
+            submitted_count = failed_count = 0
+            for future in as_completed(futures):
+                if future.result():
+                    submitted_count += 1
+                else:
+                    failed_count += 1
+                create_resources_spinner.text = Texts.CREATING_RESOURCES_OF_RUNS_MSG.format(
+                    submitted=submitted_count, failed=failed_count, count=runs_count)
+
+    return run_errors
+
+
 def submit_draft_pack(run_folder: str, run_name: str, namespace: str = None):
     """
     Submits one run using draft's environment located in a folder given as a parameter.
@@ -23,7 +23,9 @@ from unittest.mock import patch, mock_open
 from commands.experiment.common import submit_experiment, values_range, \
     analyze_ps_parameters_list, analyze_pr_parameters_list, prepare_list_of_values, prepare_list_of_runs, \
     check_enclosing_brackets, delete_environment, create_environment, get_run_environment_path, check_run_environment, \
-    RunKinds, validate_pack_params_names, get_log_filename, validate_pack, prepare_experiment_environment
+    RunKinds, validate_pack_params_names, get_log_filename, validate_pack, prepare_experiment_environment, \
+    get_submit_workers_count, DEFAULT_SUBMIT_WORKERS, NCTL_SUBMIT_WORKERS_ENV_NAME, \
+    NCTL_DEDUPLICATE_ENVIRONMENTS_ENV_NAME
 
 from util.exceptions import SubmitExperimentError
 import util.config
@@ -324,6 +326,69 @@ def test_submit_two_experiment_success(prepare_mocks: SubmitExperimentMocks, cap
     assert "param2=3" in out
 
 
+def test_submit_two_experiment_env_preparation_fail(prepare_mocks: SubmitExperimentMocks):
+    prepare_mocks.mocker.patch("click.confirm", return_value=True)
+    prepare_mocks.create_env.side_effect = [(EXPERIMENT_FOLDER), (EXPERIMENT_FOLDER)]
+    prepare_mocks.cmd_create.side_effect = [("", 0), ("error message", 1)]
+    prepare_mocks.update_conf.side_effect = [0, 0]
+    prepare_mocks.check_run_env.side_effect = [None, None]
+
+    with pytest.raises(SubmitExperimentError):
+        submit_experiment(script_location=SCRIPT_LOCATION, script_folder_location=None, pack_params=[],
+                          template=None, name=None, parameter_range=PR_PARAMETER, parameter_set=[],
+                          script_parameters=[], run_kind=RunKinds.TRAINING)
+
+    assert prepare_mocks.check_run_env.call_count == 2
+    # environments of both the failed and the successfully prepared run are removed
+    assert prepare_mocks.del_env.call_count == prepare_mocks.create_env.call_count
+    assert prepare_mocks.add_exp.call_count == 0
+    assert prepare_mocks.submit_one.call_count == 0
+
+
+def test_submit_two_experiment_one_run_fails(prepare_mocks: SubmitExperimentMocks):
+    prepare_mocks.mocker.patch("click.confirm", return_value=True)
+    prepare_mocks.create_env.side_effect = [(EXPERIMENT_FOLDER), (EXPERIMENT_FOLDER)]
+    prepare_mocks.cmd_create.side_effect = [("", 0), ("", 0)]
+    prepare_mocks.update_conf.side_effect = [0, 0]
+    prepare_mocks.check_run_env.side_effect = [None, None]
+    prepare_mocks.submit_one.side_effect = [None, SubmitExperimentError("helm error")]
+
+    runs, run_errors, _ = submit_experiment(script_location=SCRIPT_LOCATION, script_folder_location=None,
+                                            pack_params=[], template=None, name=None, parameter_range=PR_PARAMETER,
+                                            parameter_set=[], script_parameters=[], run_kind=RunKinds.TRAINING)
+
+    assert prepare_mocks.add_run.call_count == 2
+    assert prepare_mocks.submit_one.call_count == 2
+    assert list(run_errors.values()) == ["helm error"]
+    assert [run.state for run in runs if run.name in run_errors] == [RunStatus.FAILED]
+    assert [run.state for run in runs if run.name not in run_errors] == [RunStatus.QUEUED]
+    assert prepare_mocks.update_experiment.call_count == 1
+
+
+def test_submit_two_experiment_deduplicated_environments(prepare_mocks: SubmitExperimentMocks):
+    prepare_mocks.mocker.patch.dict(os.environ, {NCTL_DEDUPLICATE_ENVIRONMENTS_ENV_NAME: '1'})
+    prepare_mocks.mocker.patch("click.confirm", return_value=True)
+    content_store = prepare_mocks.mocker.patch('commands.experiment.common.get_content_store').return_value
+    prepare_mocks.create_env.side_effect = [(EXPERIMENT_FOLDER), (EXPERIMENT_FOLDER)]
+    prepare_mocks.cmd_create.side_effect = [("", 0), ("", 0)]
+    prepare_mocks.update_conf.side_effect = [0, 0]
+    prepare_mocks.check_run_env.side_effect = [None, None]
+
+    submit_experiment(script_location=SCRIPT_LOCATION, script_folder_location=None, pack_params=[],
+                      template=None, name=None, parameter_range=PR_PARAMETER, parameter_set=[],
+                      script_parameters=[], run_kind=RunKinds.TRAINING)
+
+    assert all(call[1]['content_store'] == content_store for call in prepare_mocks.cmd_create.call_args_list)
+    assert content_store.clear.call_count == 1
+
+
+@pytest.mark.parametrize('workers,expected_count', [(None, DEFAULT_SUBMIT_WORKERS), ('3', 3), ('0', 1),
+                                                    ('many', DEFAULT_SUBMIT_WORKERS)])
+def test_get_submit_workers_count(mocker, workers, expected_count):
+    mocker.patch.dict(os.environ, {NCTL_SUBMIT_WORKERS_ENV_NAME: workers} if workers else {}, clear=True)
+    assert get_submit_workers_count() == expected_count
+
+
 def test_submit_with_name_success(prepare_mocks: SubmitExperimentMocks):
     submit_experiment(script_location=SCRIPT_LOCATION, script_folder_location=None, pack_params=[],
                       template=None, name=EXPERIMENT_NAME, parameter_range=[],
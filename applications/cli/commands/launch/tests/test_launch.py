@@ -66,7 +66,7 @@ def test_launch_webui_with_browser_success(mocked_k8s_config, mocked_browser_che
 # noinspection PyUnusedLocal,PyShadowingNames
 def test_launch_webui_with_kube_config_loading_success(mocked_browser_check, mocker):
     spf_mock = mocker.patch("util.launcher.K8sProxy")
-    kube_config_mock = mocker.patch('util.k8s.k8s_info.config.load_kube_config')
+    kube_config_mock = mocker.patch('util.k8s.api_client.config.load_kube_config')
     kube_client_mock = mocker.patch('kubernetes.client.configuration.Configuration')
     wfc_mock = mocker.patch("util.launcher.wait_for_connection")
     browser_mock = mocker.patch("util.launcher.webbrowser.open_new")
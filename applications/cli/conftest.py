@@ -0,0 +1,31 @@
+#
+# Copyright (c) 2019 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+
+import pytest
+
+from platform_resources.platform_resource import PlatformResourceApiClient
+from util.k8s.api_client import K8sApiClient
+
+
+@pytest.fixture(autouse=True)
+def reset_k8s_api_client():
+    # kubeconfig and API clients are shared within a process, so they must not leak between tests
+    K8sApiClient.reset()
+    PlatformResourceApiClient.k8s_custom_object_api = None
+    yield
+    K8sApiClient.reset()
+    PlatformResourceApiClient.k8s_custom_object_api = None
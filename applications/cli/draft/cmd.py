@@ -15,12 +15,12 @@
 #
 
 import os
-from typing import Tuple
+from typing import Tuple, Optional
 
 from cli_text_consts import DraftCmdTexts as Texts
 from util import helm
 from util.config import Config
-from util.filesystem import copytree_content
+from util.filesystem import copytree_content, ContentStore
 from util.logger import initialize_logger
 
 logger = initialize_logger(__name__)
@@ -30,7 +30,7 @@ class NoPackError(Exception):
     pass
 
 
-def create(working_directory: str, pack_type: str) -> Tuple[str, int]:
+def create(working_directory: str, pack_type: str, content_store: Optional[ContentStore] = None) -> Tuple[str, int]:
     try:
         config_dirpath = Config().get_config_path()
 
@@ -44,8 +44,13 @@ def create(working_directory: str, pack_type: str) -> Tuple[str, int]:
         helm_chart_destination_dirpath = f"{working_directory}/charts/{pack_type}"
         os.makedirs(helm_chart_destination_dirpath)
 
-        copytree_content(f"{requested_pack_path}", f"{working_directory}", ignored_objects=['charts'])
-        copytree_content(f"{requested_pack_path}/charts", helm_chart_destination_dirpath)
+        if content_store:
+            content_store.link_tree_content(f"{requested_pack_path}", f"{working_directory}",
+                                            ignored_objects=['charts'])
+            content_store.link_tree_content(f"{requested_pack_path}/charts", helm_chart_destination_dirpath)
+        else:
+            copytree_content(f"{requested_pack_path}", f"{working_directory}", ignored_objects=['charts'])
+            copytree_content(f"{requested_pack_path}/charts", helm_chart_destination_dirpath)
     except NoPackError as ex:
         # TODO: these exceptions should be reraised instead caught here
         logger.exception(ex)
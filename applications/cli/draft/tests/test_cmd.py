@@ -45,6 +45,18 @@ def test_create(cmd_mock):
     assert draft.cmd.copytree_content.call_count == 2
 
 
+# noinspection PyUnresolvedReferences,PyUnusedLocal
+def test_create_with_content_store(mocker, cmd_mock):
+    content_store = mocker.MagicMock()
+
+    output, exit_code = create('/home/fake_dir', 'fake_pack', content_store=content_store)
+
+    assert output == ""
+    assert exit_code == 0
+    assert content_store.link_tree_content.call_count == 2
+    assert draft.cmd.copytree_content.call_count == 0
+
+
 # noinspection PyUnusedLocal,PyUnresolvedReferences
 def test_create_no_pack(mocker, cmd_mock):
     mocker.patch('os.path.isdir', return_value=False)
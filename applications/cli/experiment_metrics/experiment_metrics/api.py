@@ -18,8 +18,10 @@ try:
     from http import HTTPStatus  # python3.5+ import
 except ImportError:
     import httplib as HTTPStatus  # python2.7 import
+import atexit
 import logging
 import os
+import threading
 
 from kubernetes import config, client
 from kubernetes.client.rest import ApiException
@@ -31,6 +33,11 @@ RUN_VERSION = 'v1'
 
 MAX_RETRIES_COUNT = 3
 
+NAMESPACE_FILE_PATH = '/var/run/secrets/kubernetes.io/serviceaccount/namespace'
+
+# interval (in seconds) between flushes of metrics published with publish_buffered()
+DEFAULT_FLUSH_INTERVAL = float(os.getenv('METRICS_FLUSH_INTERVAL', 5))
+
 ch = logging.StreamHandler()
 ch.setLevel(logging.INFO)
 logger = logging.getLogger('metrics')
@@ -44,6 +51,17 @@ if run_k8s_name:
     api = client.CustomObjectsApi(client.ApiClient())
 
 
+_namespace = None
+
+
+def _get_namespace():
+    global _namespace
+    if not _namespace:
+        with open(NAMESPACE_FILE_PATH, 'r') as ns_file:
+            _namespace = ns_file.read()
+    return _namespace
+
+
 def publish(metrics, raise_exception=False):
     """
     Update metrics in specific Run object
@@ -55,8 +73,7 @@ def publish(metrics, raise_exception=False):
         logger.info('[no-persist mode] Metrics: {}'.format(metrics))
         return
 
-    with open('/var/run/secrets/kubernetes.io/serviceaccount/namespace', 'r') as ns_file:
-        namespace = ns_file.read()
+    namespace = _get_namespace()
 
     body = {
         "spec": {
@@ -74,3 +91,93 @@ def publish(metrics, raise_exception=False):
                 logger.exception("Exception during saving metrics. All {} retries failed!".format(MAX_RETRIES_COUNT), e)
                 if raise_exception:
                     raise e
+
+
+class BufferedPublisher(object):
+    """
+    Merges published metrics in memory and saves them in a Run object from a background thread - every
+    flush_interval seconds, on flush() and on exit of a program. Only the last value of every metric
+    from a given interval is saved, so publish() doesn't block a training loop.
+    """
+
+    def __init__(self, flush_interval=DEFAULT_FLUSH_INTERVAL):
+        self.flush_interval = flush_interval
+
+        self._pending_metrics = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._closed = threading.Event()
+
+        self._thread = threading.Thread(target=self._flush_periodically, name='metrics-publisher')
+        self._thread.daemon = True
+        self._thread.start()
+
+        atexit.register(self.close)
+
+    def publish(self, metrics):
+        """
+        Merge metrics into metrics waiting for the next flush
+        :param metrics Dict[str,str] of a data to apply
+        """
+        with self._lock:
+            self._pending_metrics.update(metrics)
+
+    def flush(self):
+        """
+        Save all pending metrics in a Run object
+        """
+        # flushes are serialized, so older values of metrics never overwrite newer ones
+        with self._flush_lock:
+            with self._lock:
+                metrics, self._pending_metrics = self._pending_metrics, {}
+
+            if not metrics:
+                return
+
+            try:
+                publish(metrics, raise_exception=True)
+            except Exception:
+                # metrics are kept for the next flush, unless they were published again in the meantime
+                with self._lock:
+                    metrics.update(self._pending_metrics)
+                    self._pending_metrics = metrics
+
+    def close(self):
+        """
+        Stop the background thread and save all pending metrics
+        """
+        if not self._closed.is_set():
+            self._closed.set()
+            self._thread.join()
+        self.flush()
+
+    def _flush_periodically(self):
+        while not self._closed.wait(self.flush_interval):
+            self.flush()
+
+
+_buffered_publisher = None
+_buffered_publisher_lock = threading.Lock()
+
+
+def publish_buffered(metrics):
+    """
+    Update metrics in specific Run object asynchronously - metrics are merged in memory and saved
+    in the background by a shared BufferedPublisher (see METRICS_FLUSH_INTERVAL env var)
+    :param metrics Dict[str,str] of a data to apply
+    """
+    global _buffered_publisher
+    if not _buffered_publisher:
+        with _buffered_publisher_lock:
+            if not _buffered_publisher:
+                _buffered_publisher = BufferedPublisher()
+
+    _buffered_publisher.publish(metrics)
+
+
+def flush():
+    """
+    Save metrics published with publish_buffered() which are still waiting in memory
+    """
+    if _buffered_publisher:
+        _buffered_publisher.flush()
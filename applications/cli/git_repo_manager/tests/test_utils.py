@@ -15,6 +15,8 @@
 #
 
 import base64
+import threading
+
 import pytest
 from unittest.mock import MagicMock
 
@@ -70,30 +72,51 @@ def git_client_mock(mocker):
     external_cli_mock = mocker.patch('git_repo_manager.utils.ExternalCliClient')
     git_command_mock = MagicMock()
     git_command_mock.branch.return_value = '', 0, ''
-    git_command_mock._make_command.return_value = lambda: ('', 0, '')  # Mock manually created commands
+    git_command_mock._make_command.return_value = lambda *args: ('', 0, '')  # Mock manually created commands
     external_cli_mock.return_value = git_command_mock
     return git_command_mock
 
 
-def test_upload_experiment_to_git_repo_manager(mocker, tmpdir, git_client_mock):
-    get_private_key_path_mock = mocker.patch('git_repo_manager.utils.get_fake_ssh_path',
-                                             return_value='/fake-config/ssh')
-    proxy_mock = mocker.patch('git_repo_manager.utils.TcpK8sProxy')
-    config_mock = mocker.patch('git_repo_manager.utils.Config')
-    fake_hash = 'a12b34c'
-    env_hash_mock = mocker.patch('git_repo_manager.utils.compute_hash_of_k8s_env_address', return_value=fake_hash)
-
-    experiment_name = 'fake-experiment'
-    experiments_workdir = tmpdir.mkdir(f'experiments')
-    experiments_workdir.mkdir(experiment_name)
-
-    upload_experiment_to_git_repo_manager(experiments_workdir=experiments_workdir, experiment_name=experiment_name,
-                                          run_name=experiment_name, username='fake-user')
-
-    assert env_hash_mock.call_count == 1
-    assert config_mock.call_count == 1
-    assert get_private_key_path_mock.call_count == 1
-    assert proxy_mock.call_count == 1
+@pytest.fixture()
+def git_push_mock(mocker):
+    push_process_mock = MagicMock()
+    push_process_mock.stdout = ['Counting objects: 100% (3/3), done.\n', 'Writing objects:  50% (1/2)\n',
+                                'Writing objects: 100% (2/2), 250 bytes | 250.00 KiB/s, done.\n']
+    push_process_mock.wait.return_value = 0
+    return mocker.patch('git_repo_manager.utils.execute_subprocess_command', return_value=push_process_mock)
+
+
+class UploadMocks:
+    def __init__(self, mocker, tmpdir, cloned: bool = True):
+        self.get_private_key_path_mock = mocker.patch('git_repo_manager.utils.get_fake_ssh_path',
+                                                      return_value='/fake-config/ssh')
+        self.proxy_mock = mocker.patch('git_repo_manager.utils.TcpK8sProxy')
+        self.config_mock = mocker.patch('git_repo_manager.utils.Config')
+        fake_hash = 'a12b34c'
+        self.env_hash_mock = mocker.patch('git_repo_manager.utils.compute_hash_of_k8s_env_address',
+                                          return_value=fake_hash)
+
+        self.experiment_name = 'fake-experiment'
+        self.experiments_workdir = tmpdir.mkdir(f'experiments')
+        if cloned:
+            self.experiments_workdir.mkdir(f'.nauta-git-fake-user-{fake_hash}')
+        self.experiments_workdir.mkdir(self.experiment_name)
+
+    def upload(self, progress_callback=None):
+        upload_experiment_to_git_repo_manager(experiments_workdir=self.experiments_workdir,
+                                              experiment_name=self.experiment_name, run_name=self.experiment_name,
+                                              username='fake-user', progress_callback=progress_callback)
+
+
+def test_upload_experiment_to_git_repo_manager(mocker, tmpdir, git_client_mock, git_push_mock):
+    upload_mocks = UploadMocks(mocker, tmpdir, cloned=False)
+    progress_callback = MagicMock()
+
+    upload_mocks.upload(progress_callback=progress_callback)
+
+    assert upload_mocks.config_mock.call_count == 1
+    assert upload_mocks.get_private_key_path_mock.call_count == 1
+    assert upload_mocks.proxy_mock.call_count == 1
 
     # Assert clone bare repo & pull flow
     assert git_client_mock.remote.call_count == 1
@@ -106,30 +129,19 @@ def test_upload_experiment_to_git_repo_manager(mocker, tmpdir, git_client_mock):
     assert git_client_mock.add.call_count == 1
     assert git_client_mock.commit.call_count == 1
     assert git_client_mock.tag.call_count == 1
-    assert git_client_mock.push.call_count == 2
 
+    # branch and tag are pushed at once
+    assert git_push_mock.call_count == 1
+    assert git_push_mock.call_args[0][0][-2:] == ['master', f'refs/tags/{upload_mocks.experiment_name}']
+    assert progress_callback.call_count == 3
 
-def test_upload_experiment_to_git_repo_manager_already_cloned(mocker, tmpdir, git_client_mock):
-    get_private_key_path_mock = mocker.patch('git_repo_manager.utils.get_fake_ssh_path',
-                                             return_value='/fake-config/ssh')
-    proxy_mock = mocker.patch('git_repo_manager.utils.TcpK8sProxy')
-    config_mock = mocker.patch('git_repo_manager.utils.Config')
-    fake_hash = 'a12b34c'
-    env_hash_mock = mocker.patch('git_repo_manager.utils.compute_hash_of_k8s_env_address', return_value=fake_hash)
 
-    experiment_name = 'fake-experiment'
-    experiments_workdir = tmpdir.mkdir(f'experiments')
-    experiments_workdir.mkdir(f'.nauta-git-fake-user-{fake_hash}')
-    experiments_workdir.mkdir(experiment_name)
+def test_upload_experiment_to_git_repo_manager_already_cloned(mocker, tmpdir, git_client_mock, git_push_mock):
+    upload_mocks = UploadMocks(mocker, tmpdir)
 
+    upload_mocks.upload()
 
-    upload_experiment_to_git_repo_manager(experiments_workdir=experiments_workdir, experiment_name=experiment_name,
-                                          run_name=experiment_name, username='fake-user')
-
-    assert env_hash_mock.call_count == 1
-    assert config_mock.call_count == 1
-    assert get_private_key_path_mock.call_count == 1
-    assert proxy_mock.call_count == 1
+    assert upload_mocks.proxy_mock.call_count == 1
 
     assert git_client_mock.remote.call_count == 1
 
@@ -141,35 +153,69 @@ def test_upload_experiment_to_git_repo_manager_already_cloned(mocker, tmpdir, gi
     assert git_client_mock.add.call_count == 1
     assert git_client_mock.commit.call_count == 1
     assert git_client_mock.tag.call_count == 1
-    assert git_client_mock.push.call_count == 2
+    assert git_push_mock.call_count == 1
 
 
-def test_upload_experiment_to_git_repo_manager_error(mocker, tmpdir, git_client_mock):
-    get_private_key_path_mock = mocker.patch('git_repo_manager.utils.get_fake_ssh_path',
-                                             return_value='/fake-config/ssh')
-    git_client_mock.push.side_effect = RuntimeError
-    proxy_mock = mocker.patch('git_repo_manager.utils.TcpK8sProxy')
-    config_mock = mocker.patch('git_repo_manager.utils.Config')
-    fake_hash = 'a12b34c'
-    env_hash_mock = mocker.patch('git_repo_manager.utils.compute_hash_of_k8s_env_address', return_value=fake_hash)
+@pytest.mark.parametrize('is_ancestor,pull_count', [(True, 0), (False, 1)])
+def test_upload_experiment_to_git_repo_manager_remote_changed(mocker, tmpdir, git_client_mock, git_push_mock,
+                                                              is_ancestor, pull_count):
+    def make_command(name):
+        if name == 'ls-remote':
+            return lambda *args: ('a1b2c3\trefs/heads/master\n', 0, '')
+
+        def merge_base(*args):
+            if not is_ancestor:
+                raise RuntimeError
+            return '', 0, ''
+        return merge_base
+
+    git_client_mock._make_command.side_effect = make_command
+    upload_mocks = UploadMocks(mocker, tmpdir)
+
+    upload_mocks.upload()
 
-    experiment_name = 'fake-experiment'
-    experiments_workdir = tmpdir.mkdir(f'experiments')
-    experiments_workdir.mkdir(f'.nauta-git-fake-user-{fake_hash}')
-    experiments_workdir.mkdir(experiment_name)
+    assert git_client_mock.pull.call_count == pull_count
+    assert git_push_mock.call_count == 1
+
+
+def test_upload_experiment_to_git_repo_manager_error(mocker, tmpdir, git_client_mock, git_push_mock):
+    git_push_mock.return_value.wait.return_value = 1
+    mocker.patch('retry.api.time.sleep')
+    upload_mocks = UploadMocks(mocker, tmpdir)
 
     with pytest.raises(RuntimeError):
-        upload_experiment_to_git_repo_manager(experiments_workdir=experiments_workdir, run_name=experiment_name,
-                                              experiment_name=experiment_name, username='fake-user')
+        upload_mocks.upload()
 
-    # function is retried 5 times
-    assert env_hash_mock.call_count == 5
-    assert config_mock.call_count == 5
-    assert get_private_key_path_mock.call_count == 5
-    assert proxy_mock.call_count == 5
+    # only push is retried, in the same tunnel
+    assert git_push_mock.call_count == 5
+    assert upload_mocks.proxy_mock.call_count == 1
+    assert git_client_mock.commit.call_count == 1
 
     # Check if rollback was called
-    assert git_client_mock.reset.call_count == 5
+    assert git_client_mock.reset.call_count == 1
+
+
+def test_upload_experiment_to_git_repo_manager_push_stalled(mocker, tmpdir, git_client_mock, git_push_mock):
+    stalled = threading.Event()
+
+    def stalled_output():
+        yield 'Counting objects: 100% (3/3), done.\n'
+        # git doesn't write anything more and doesn't exit
+        stalled.wait()
+
+    git_push_mock.return_value.stdout = stalled_output()
+    mocker.patch('git_repo_manager.utils.GIT_COMMAND_TIMEOUT', 0.1)
+    mocker.patch('git_repo_manager.utils.GIT_NETWORK_COMMAND_TRIES', 1)
+    upload_mocks = UploadMocks(mocker, tmpdir)
+
+    try:
+        with pytest.raises(RuntimeError):
+            upload_mocks.upload()
+    finally:
+        stalled.set()
+
+    assert git_push_mock.return_value.kill.call_count == 1
+    assert git_client_mock.reset.call_count == 1
 
 
 def test_create_gitignore_file_for_experiments(tmpdir):
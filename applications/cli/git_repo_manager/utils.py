@@ -17,19 +17,33 @@
 import base64
 import hashlib
 import os
+import queue
+import re
+import subprocess  # nosec - required to stream progress of git push
+import sys
+import threading
+import time
+from typing import Callable, Optional
 
-from retry import retry
+from retry.api import retry_call
 
 from util.app_names import NAUTAAppNames
 from util.config import Config
 from util.k8s.k8s_info import get_secret, get_kubectl_host
 from util.k8s.k8s_proxy_context_manager import TcpK8sProxy
 from util.logger import initialize_logger
-from util.system import ExternalCliClient
+from util.system import ExternalCliClient, execute_subprocess_command
 
 logger = initialize_logger(__name__)
 _encoding = 'utf-8'  # Encoding used for bytes <-> str conversions
 
+GIT_COMMAND_TIMEOUT = 60
+# number of tries of git commands which require network access
+GIT_NETWORK_COMMAND_TRIES = 5
+# number of last lines of git push output, which are logged
+GIT_PUSH_LOGGED_LINES = 20
+GIT_PROGRESS_LINE = re.compile(r'^(Counting|Compressing|Writing) objects:\s+\d+%')
+
 
 def compute_hash_of_k8s_env_address():
     nauta_hostname = get_kubectl_host()
@@ -69,94 +83,166 @@ def create_gitignore_file_for_experiments(git_workdir):
         gitignore_file.write('charts/*')
 
 
-@retry(tries=5, delay=1)
-def upload_experiment_to_git_repo_manager(username: str, experiment_name: str, experiments_workdir: str, run_name: str):
-    git_repo_dir = f'.nauta-git-{username}-{compute_hash_of_k8s_env_address()}'
+class GitRepoManagerSession:
+    """
+    Tunnel to git repo manager and git client configured to use it. The tunnel is opened once for the whole
+    session, so all git commands (including retried ones) share it. Usage example:
+      with GitRepoManagerSession(username='user', experiments_workdir='/path') as session:
+          session.git.fetch()
+    """
+    def __init__(self, username: str, experiments_workdir: str, git_work_dir: str = None):
+        self.username = username
+        self.experiments_workdir = experiments_workdir
+        self.git_repo_dir = f'.nauta-git-{username}-{compute_hash_of_k8s_env_address()}'
+        self.git_work_dir = git_work_dir
+        self.git = _create_git_client(git_dir=os.path.join(experiments_workdir, self.git_repo_dir),
+                                      cwd=experiments_workdir, git_work_dir=git_work_dir,
+                                      fake_ssh_path=get_fake_ssh_path(username=username,
+                                                                      config_dir=Config().config_path))
+        self._proxy: Optional[TcpK8sProxy] = None
+
+    def __enter__(self):
+        self._proxy = TcpK8sProxy(NAUTAAppNames.GIT_REPO_MANAGER_SSH)
+        self._proxy.__enter__()
+        try:
+            remote_url = f'ssh://git@localhost:{self._proxy.tunnel_port}/{self.username}/experiments.git'
+            if not os.path.isdir(os.path.join(self.experiments_workdir, self.git_repo_dir)):
+                if not os.path.isdir(self.experiments_workdir):
+                    os.makedirs(self.experiments_workdir, 0o755)
+                retry_call(self.git.clone, fargs=[remote_url, self.git_repo_dir], fkwargs={'bare': True},
+                           tries=GIT_NETWORK_COMMAND_TRIES, delay=1, logger=logger)
+            self.git.remote('set-url', 'origin', remote_url)
+            _initialize_git_client_config(self.git, username=self.username)
+        except Exception:
+            self._proxy.__exit__(*sys.exc_info())
+            raise
+        return self
+
+    def __exit__(self, *args):
+        self._proxy.__exit__(*args)
+
+    def get_remote_revision(self, ref: str) -> Optional[str]:
+        # ls-remote command must be created manually due to hyphen
+        output, _, _ = self.git._make_command(name='ls-remote')('origin', ref)
+        return output.split()[0] if output.strip() else None
+
+    def is_ancestor(self, revision: str, descendant: str = 'HEAD') -> bool:
+        try:
+            self.git._make_command(name='merge-base')('--is-ancestor', revision, descendant)
+            return True
+        except RuntimeError:
+            # revision is not an ancestor of descendant, or it is not known locally
+            return False
+
+    def push(self, *refs: str, progress_callback: Callable[[str], None] = None):
+        """
+        Pushes given refs with a single connection - git sends only objects which are missing in the remote
+        repository. If progress_callback is given, it is called with each line of git's progress output.
+        """
+        command = ['git', 'push', '--force', '--progress', '--set-upstream', 'origin', *refs]
+        process = execute_subprocess_command(command, env=self.git.env, cwd=self.git.cwd)
+        output = []
+        # output is read by a separate thread, so the whole push can be limited by a deadline - even if git stops
+        # writing anything, e.g. because the connection through the tunnel has stalled
+        lines: queue.Queue = queue.Queue()
+        threading.Thread(target=_read_lines, args=(process.stdout, lines), daemon=True).start()
+        deadline = time.monotonic() + GIT_COMMAND_TIMEOUT
+        try:
+            while True:
+                try:
+                    line = lines.get(timeout=max(deadline - time.monotonic(), 0))
+                except queue.Empty:
+                    raise subprocess.TimeoutExpired(command, GIT_COMMAND_TIMEOUT)
+                if line is None:
+                    break
+                line = line.strip()
+                if line:
+                    output.append(line)
+                    if progress_callback and GIT_PROGRESS_LINE.match(line):
+                        progress_callback(line)
+            exit_code = process.wait(timeout=max(deadline - time.monotonic(), 0))
+        except subprocess.TimeoutExpired:
+            process.kill()
+            logger.error('\n'.join(output))
+            raise RuntimeError(f'Command: {command} has not finished within {GIT_COMMAND_TIMEOUT} seconds')
+        logger.debug(f'COMMAND: {command} RESULT: {output[-GIT_PUSH_LOGGED_LINES:]}')
+        if exit_code != 0:
+            logger.error('\n'.join(output))
+            raise RuntimeError(f'Failed to execute command: {command}')
+
+
+def _read_lines(stream, lines: queue.Queue):
+    # progress lines are separated with carriage returns, which are translated to newlines
+    try:
+        for line in stream:
+            lines.put(line)
+    finally:
+        # end of output
+        lines.put(None)
+
+
+def upload_experiment_to_git_repo_manager(username: str, experiment_name: str, experiments_workdir: str, run_name: str,
+                                          progress_callback: Callable[[str], None] = None):
+    """
+    Commits content of run's environment and pushes it (along with experiment's tag) to git repo manager. Remote
+    changes are pulled only if the remote branch has changed since the last upload from this workspace, and only
+    objects which are missing in git repo manager are sent. Git commands which require network access are retried.
+    :param progress_callback: function called with progress messages of git push
+    """
     git_work_dir = os.path.join(experiments_workdir, run_name)
+    git_repo_dir = f'.nauta-git-{username}-{compute_hash_of_k8s_env_address()}'
 
     try:
         create_gitignore_file_for_experiments(git_work_dir)
-        fake_ssh_path = get_fake_ssh_path(username=username, config_dir=Config().config_path)
-        git_env = {'GIT_SSH': fake_ssh_path,
-                   'GIT_DIR': os.path.join(experiments_workdir, git_repo_dir),
-                   'GIT_WORK_TREE': git_work_dir,
-                   'GIT_TERMINAL_PROMPT': '0',
-                   'SSH_AUTH_SOCK': '',  # Unset SSH_AUTH_SOCK to prevent issues when multiple users are using same nctl
-                   }
-        env = {**os.environ, **git_env}  # Add git_env defined above to currently set environment variables
-        if 'LD_LIBRARY_PATH' in env:
-            # do not copy LD_LIBRARY_PATH to git exec env - it points to libraries packed by PyInstaller
-            # and they can be incompatible with system's git (e.g. libssl)
-            del env['LD_LIBRARY_PATH']
-        git = ExternalCliClient(executable='git', env=env, cwd=experiments_workdir, timeout=60)
-        # ls-remote command must be created manually due to hyphen
-        git.ls_remote = git._make_command(name='ls-remote')  #type: ignore
-        with TcpK8sProxy(NAUTAAppNames.GIT_REPO_MANAGER_SSH) as proxy:
-            if not os.path.isdir(f'{experiments_workdir}/{git_repo_dir}'):
-                git.clone(f'ssh://git@localhost:{proxy.tunnel_port}/{username}/experiments.git', git_repo_dir,
-                          bare=True)
-            git.remote('set-url', 'origin', f'ssh://git@localhost:{proxy.tunnel_port}/{username}/experiments.git')
-            _initialize_git_client_config(git, username=username)
+        with GitRepoManagerSession(username=username, experiments_workdir=experiments_workdir,
+                                   git_work_dir=git_work_dir) as session:
+            git = session.git
             git.add('.', '--all')
             git.commit(message=f'experiment: {experiment_name}', allow_empty=True)
-            remote_branches, _, _ = git.ls_remote()
             local_branches, _, _ = git.branch()
             if 'master' in local_branches:
                 git.checkout('master')
             else:
                 git.checkout('-b', 'master')
-            if 'master' in remote_branches:
-                try:
-                    git.pull('--rebase', '--strategy=recursive', '-Xtheirs')
-                except Exception:
-                    logger.exception('Rebase failed.')
-                    try:
-                        git.rebase('--abort')
-                    except Exception:
-                        logger.exception('Failed to abort the rebase.')
-            git.push('--set-upstream', 'origin', 'master', force=True)
+
+            retry_call(_rebase_on_remote_master, fargs=[session], tries=GIT_NETWORK_COMMAND_TRIES, delay=1,
+                       logger=logger)
+
             git.tag(experiment_name, force=True)
-            git.push('--tags', force=True)
+            retry_call(session.push, fargs=['master', f'refs/tags/{experiment_name}'],
+                       fkwargs={'progress_callback': progress_callback}, tries=GIT_NETWORK_COMMAND_TRIES, delay=1,
+                       logger=logger)
     except Exception:
         logger.exception(f'Failed to upload experiment {experiment_name} to git repo manager.')
         try:
-            git_env = {'GIT_DIR': os.path.join(experiments_workdir, git_repo_dir),
-                       'GIT_WORK_TREE': git_work_dir,
-                       'GIT_TERMINAL_PROMPT': '0',
-                       'SSH_AUTH_SOCK': '',
-                       }
-            env = {**os.environ, **git_env}  # Add git_env defined above to currently set environment variables
-            git = ExternalCliClient(executable='git', env=env, cwd=experiments_workdir, timeout=60)
+            git = _create_git_client(git_dir=os.path.join(experiments_workdir, git_repo_dir), cwd=experiments_workdir,
+                                     git_work_dir=git_work_dir)
             git.reset('master')
         except Exception:
             logger.exception(f'Failed to rollback {experiment_name} experiment upload to git repo manager.')
         raise
 
 
-def delete_exp_tag_from_git_repo_manager(username: str, experiment_name: str, experiments_workdir: str):
-    git_repo_dir = f'.nauta-git-{username}-{compute_hash_of_k8s_env_address()}'
+def _rebase_on_remote_master(session: GitRepoManagerSession):
+    remote_master = session.get_remote_revision('refs/heads/master')
+    # local branch already contains all remote changes - e.g. they were pushed by the previous upload
+    if not remote_master or session.is_ancestor(remote_master):
+        return
 
     try:
-        fake_ssh_path = get_fake_ssh_path(username=username, config_dir=Config().config_path)
-        git_env = {'GIT_SSH': fake_ssh_path,
-                   'GIT_DIR': os.path.join(experiments_workdir, git_repo_dir),
-                   'GIT_TERMINAL_PROMPT': '0',
-                   'SSH_AUTH_SOCK': '',  # Unset SSH_AUTH_SOCK to prevent issues when multiple users are using same nctl
-                   }
-        env = {**os.environ, **git_env}  # Add git_env defined above to currently set environment variables
-        if 'LD_LIBRARY_PATH' in env:
-            # do not copy LD_LIBRARY_PATH to git exec env - it points to libraries packed by PyInstaller
-            # and they can be incompatible with system's git (e.g. libssl)
-            del env['LD_LIBRARY_PATH']
-        git = ExternalCliClient(executable='git', env=env, cwd=experiments_workdir, timeout=60)
-        with TcpK8sProxy(NAUTAAppNames.GIT_REPO_MANAGER_SSH) as proxy:
-            if not os.path.isdir(f'{experiments_workdir}/{git_repo_dir}'):
-                if not os.path.isdir(experiments_workdir):
-                    os.makedirs(experiments_workdir, 0o755)
-                git.clone(f'ssh://git@localhost:{proxy.tunnel_port}/{username}/experiments.git', git_repo_dir,
-                          bare=True)
-            git.remote('set-url', 'origin', f'ssh://git@localhost:{proxy.tunnel_port}/{username}/experiments.git')
-            _initialize_git_client_config(git, username=username)
+        session.git.pull('--rebase', '--strategy=recursive', '-Xtheirs', 'origin', 'master')
+    except Exception:
+        logger.exception('Rebase failed.')
+        try:
+            session.git.rebase('--abort')
+        except Exception:
+            logger.exception('Failed to abort the rebase.')
+
+
+def delete_exp_tag_from_git_repo_manager(username: str, experiment_name: str, experiments_workdir: str):
+    try:
+        with GitRepoManagerSession(username=username, experiments_workdir=experiments_workdir) as session:
+            git = session.git
             git.fetch()
             output, _, _ = git.tag('-l', experiment_name)
             if output:
@@ -167,6 +253,24 @@ def delete_exp_tag_from_git_repo_manager(username: str, experiment_name: str, ex
         raise
 
 
+def _create_git_client(git_dir: str, cwd: str, git_work_dir: str = None,
+                       fake_ssh_path: str = None) -> ExternalCliClient:
+    git_env = {'GIT_DIR': git_dir,
+               'GIT_TERMINAL_PROMPT': '0',
+               'SSH_AUTH_SOCK': '',  # Unset SSH_AUTH_SOCK to prevent issues when multiple users are using same nctl
+               }
+    if git_work_dir:
+        git_env['GIT_WORK_TREE'] = git_work_dir
+    if fake_ssh_path:
+        git_env['GIT_SSH'] = fake_ssh_path
+    env = {**os.environ, **git_env}  # Add git_env defined above to currently set environment variables
+    if 'LD_LIBRARY_PATH' in env:
+        # do not copy LD_LIBRARY_PATH to git exec env - it points to libraries packed by PyInstaller
+        # and they can be incompatible with system's git (e.g. libssl)
+        del env['LD_LIBRARY_PATH']
+    return ExternalCliClient(executable='git', env=env, cwd=cwd, timeout=GIT_COMMAND_TIMEOUT)
+
+
 def _initialize_git_client_config(git: ExternalCliClient, username: str):
     git.config('--local', 'user.email', f'{username}@nauta.invalid')
     git.config('--local', 'user.name', f'{username}')
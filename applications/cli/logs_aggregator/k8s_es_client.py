@@ -14,16 +14,17 @@
 # limitations under the License.
 #
 
-from functools import partial
+import copy
+import datetime
 import time
-from typing import List, Callable, Generator, Dict
+from typing import List, Generator, Dict, Optional, Set
 
+import dateutil.parser
 import elasticsearch
 import elasticsearch.helpers
 import elasticsearch.client
 
-from logs_aggregator.log_filters import SeverityLevel, filter_log_by_severity, \
-    filter_log_by_pod_status, filter_log_by_pod_ids
+from logs_aggregator.log_filters import SeverityLevel, get_severity_query, get_pod_names_with_status
 from logs_aggregator.k8s_log_entry import LogEntry
 from platform_resources.workflow import ArgoWorkflow
 from util.logger import initialize_logger
@@ -32,6 +33,39 @@ from platform_resources.run import Run
 
 logger = initialize_logger(__name__)
 
+# fields of logs' documents needed to construct LogEntry objects - only they are requested from Elasticsearch
+LOG_ENTRY_SOURCE_FIELDS = ['@timestamp', 'log', 'kubernetes.pod_name', 'kubernetes.namespace_name']
+
+# number of logs requested in a single search when logs are streamed
+STREAM_PAGE_SIZE = 1000
+# maximal time interval (in seconds) between searches for new logs - the interval grows up to this value
+# when no new logs are coming
+STREAM_MAX_TIME_INTERVAL = 5.0
+
+# prefix of names of daily indices to which logs are written by fluentd, e.g. fluentd-20180417
+LOGS_INDEX_PREFIX = 'fluentd-'
+# if logs are streamed from a date older than this number of days, all daily indices are searched
+STREAM_MAX_DAILY_INDICES = 31
+
+
+def get_daily_logs_indices(since: str) -> Optional[str]:
+    """
+    Returns comma-separated names of daily indices of logs, which may contain logs produced since the given date,
+    or None if the date cannot be parsed.
+    """
+    try:
+        since_date = dateutil.parser.parse(since)
+    except (ValueError, OverflowError):
+        return None
+    # fluentd names daily indices after UTC dates of logs
+    if since_date.tzinfo:
+        since_date = since_date.astimezone(datetime.timezone.utc)
+    days = (datetime.datetime.utcnow().date() - since_date.date()).days
+    if days >= STREAM_MAX_DAILY_INDICES:
+        return f'{LOGS_INDEX_PREFIX}*'
+    return ','.join(f'{LOGS_INDEX_PREFIX}{since_date.date() + datetime.timedelta(days=day):%Y%m%d}'
+                    for day in range(max(days, 0) + 1))
+
 
 class K8sElasticSearchClient(elasticsearch.Elasticsearch):
 
@@ -49,52 +83,91 @@ class K8sElasticSearchClient(elasticsearch.Elasticsearch):
             headers["ES-Authorization"] = f"Basic ${admin_token}"
         super().__init__(hosts=hosts, use_ssl=use_ssl, verify_certs=verify_certs, headers=headers, **kwargs)
 
-    def get_log_generator(self, query_body: dict = None, index='_all', scroll='1m',
-                          filters: List[Callable[[LogEntry], bool]] = None) -> Generator[LogEntry, None, None]:
+    def get_log_generator(self, query_body: dict = None, index='_all',
+                          scroll='1m') -> Generator[LogEntry, None, None]:
         """
         A generator that yields LogEntry objects constructed from Kubernetes resource logs.
-        Logs to be returned are defined by passed query and filtered according to passed
-        filter functions, which have to accept LogEntry as argument and return a boolean value.
+        Logs to be returned are defined by passed query.
         :param query_body: ES search query
         :param index: ElasticSearch index from which logs will be retrieved, defaults to all indices
         :param scroll: ElasticSearch scroll lifetime
-        :param filters: List of filter functions with signatures f(LogEntry) -> Bool
         :return: Generator yielding LogEntry (date, log_content, pod_name, namespace) named tuples.
         """
         for log in elasticsearch.helpers.scan(self, query=query_body, index=index, scroll=scroll, size=1000,
                                               preserve_order=True, clear_scroll=False):
-            log_entry = LogEntry(date=log['_source']['@timestamp'],
-                                 content=log['_source']['log'],
-                                 pod_name=log['_source']['kubernetes']['pod_name'],
-                                 namespace=log['_source']['kubernetes']['namespace_name'])
-            if not filters or all(f(log_entry) for f in filters):
-                yield log_entry
-
-    def get_stream_log_generator(self, query_body: dict = None, index='_all', scroll='1m', time_interval=0.5,
-                                 filters: List[Callable[[LogEntry], bool]] = None) -> Generator[LogEntry, None, None]:
+            yield self._create_log_entry(log)
+
+    def get_stream_log_generator(self, query_body: dict = None, index='_all', time_interval=0.5,
+                                 max_time_interval=STREAM_MAX_TIME_INTERVAL,
+                                 page_size=STREAM_PAGE_SIZE) -> Generator[LogEntry, None, None]:
         """
         A generator that yields LogEntry objects constructed from Kubernetes resource logs.
-        Logs to be returned are defined by passed query and filtered according to passed
-        filter functions, which have to accept LogEntry as argument and return a boolean value.
+        Logs to be returned are defined by passed query.
         Generator will always try to obtain new log entries, whenever it will be iterated over.
+        Logs are paged with search_after, so no scroll context is kept in Elasticsearch. Logs sharing
+        a timestamp are ordered by their ids, and ids of logs with the last seen timestamp are remembered,
+        so such logs are neither repeated nor lost when they are indexed between searches.
+        Sorting by _id requires its fielddata to be loaded to memory of Elasticsearch for each searched index
+        (no field with doc values is unique for a log), so if all indices are to be searched, only daily indices
+        of logs which may contain logs newer than the last seen one (usually only today's index) are searched.
         :param query_body: ES search query
         :param index: ElasticSearch index from which logs will be retrieved, defaults to all indices
-        :param scroll: ElasticSearch scroll lifetime
         :param time_interval: Time interval between attempting to get a new batch of logs
-        :param filters: List of filter functions with signatures f(LogEntry) -> Bool
+        :param max_time_interval: Maximal time interval between attempts - the interval is doubled after every
+                                  attempt which didn't return new logs, up to this value
+        :param page_size: number of logs requested in a single search
         :return: Generator yielding LogEntry (date, log_content, pod_name, namespace) named tuples.
         """
+        # Note that we expect specific query structure here
+        query_body = copy.deepcopy(query_body) if query_body else {}
+        timestamp_range = query_body.setdefault('query', {}).setdefault('bool', {}).setdefault('filter', {}) \
+            .setdefault('range', {}).setdefault('@timestamp', {})
+        query_body['sort'] = [{'@timestamp': {'order': 'asc'}}, {'_id': {'order': 'asc'}}]
+        query_body['size'] = page_size
+
         last_timestamp = None
+        last_timestamp_ids: Set[str] = set()
+        current_time_interval = time_interval
         while True:
-            for log in self.get_log_generator(query_body=query_body, index=index, scroll=scroll, filters=filters):
-                last_timestamp = log.date
-                yield log
+            new_logs_received = False
+            query_body.pop('search_after', None)
+            search_index = index
+            if index == '_all' and timestamp_range.get('gte'):
+                search_index = get_daily_logs_indices(timestamp_range['gte']) or index
+            while True:
+                logs = self.search(index=search_index, body=query_body, ignore_unavailable=True)['hits']['hits']
+                for log in logs:
+                    timestamp = log['sort'][0]
+                    if timestamp == last_timestamp:
+                        if log['_id'] in last_timestamp_ids:
+                            continue
+                    else:
+                        # next search starts from the newest timestamp, as more logs with it may be indexed yet
+                        last_timestamp = timestamp
+                        last_timestamp_ids = set()
+                        timestamp_range['gte'] = log['_source']['@timestamp']
+                    last_timestamp_ids.add(log['_id'])
+                    new_logs_received = True
+
+                    yield self._create_log_entry(log)
+
+                if len(logs) < page_size:
+                    break
+                query_body['search_after'] = logs[-1]['sort']
+
+            # Search is exhausted - wait for new logs, less frequently if they are not coming
+            if new_logs_received:
+                current_time_interval = time_interval
             else:
-                # Scan is exhausted - try to fetch a new batch of logs
-                # Note that we expect specific query structure here
-                if last_timestamp:
-                    query_body['query']['bool']['filter']['range']['@timestamp']['gt'] = last_timestamp
-                time.sleep(time_interval)
+                current_time_interval = min(current_time_interval * 2, max(max_time_interval, time_interval))
+            time.sleep(current_time_interval)
+
+    @staticmethod
+    def _create_log_entry(log: dict) -> LogEntry:
+        return LogEntry(date=log['_source']['@timestamp'],
+                        content=log['_source']['log'],
+                        pod_name=log['_source']['kubernetes']['pod_name'],
+                        namespace=log['_source']['kubernetes']['namespace_name'])
 
     def get_experiment_logs_generator(self, run: Run, namespace: str, start_date: str, end_date: str = None,
                                       index='_all', pod_ids: List[str] = None, pod_status: PodStatus = None,
@@ -118,25 +191,28 @@ class K8sElasticSearchClient(elasticsearch.Elasticsearch):
         if end_date:
             timestamp_range_filter = {"range": {"@timestamp": {"gte": start_date, "lte": end_date}}}
 
-        filters: List[Callable] = []
+        query_clauses: List[dict] = [{'term': {'kubernetes.labels.runName.keyword': run.name}},
+                                     {'term': {'kubernetes.namespace_name.keyword': namespace}}]
         if min_severity:
-            filters.append(partial(filter_log_by_severity, min_severity=min_severity))
+            query_clauses.append(get_severity_query(min_severity))
+
+        pod_names = set(pod_ids) if pod_ids else None
         if pod_status:
-            filters.append(partial(filter_log_by_pod_status, pod_status=pod_status))
-        if pod_ids:
-            filters.append(partial(filter_log_by_pod_ids, pod_ids=set(pod_ids)))
+            pods_with_status = set(get_pod_names_with_status(run_name=run.name, namespace=namespace,
+                                                             pod_status=pod_status))
+            pod_names = pod_names & pods_with_status if pod_names is not None else pods_with_status
+        if pod_names is not None:
+            query_clauses.append({'terms': {'kubernetes.pod_name.keyword': sorted(pod_names)}})
 
         log_generator = self.get_stream_log_generator if follow else self.get_log_generator
 
         experiment_logs_generator = log_generator(query_body={  #type: ignore
-            "query": {"bool": {"must":
-                                   [{'term': {'kubernetes.labels.runName.keyword': run.name}},
-                                    {'term': {'kubernetes.namespace_name.keyword': namespace}}
-                                    ],
+            "query": {"bool": {"must": query_clauses,
                                "filter": timestamp_range_filter
                                }},
-            "sort": {"@timestamp": {"order": "asc"}}},
-            index=index, filters=filters)
+            "sort": {"@timestamp": {"order": "asc"}},
+            "_source": LOG_ENTRY_SOURCE_FIELDS},
+            index=index)
 
         return experiment_logs_generator
 
@@ -169,7 +245,8 @@ class K8sElasticSearchClient(elasticsearch.Elasticsearch):
                                     ],
                                "filter": timestamp_range_filter
                                }},
-            "sort": {"@timestamp": {"order": "asc"}}},
+            "sort": {"@timestamp": {"order": "asc"}},
+            "_source": LOG_ENTRY_SOURCE_FIELDS},
             index=index)
 
         return workflow_logs_generator
@@ -15,12 +15,10 @@
 #
 
 from enum import Enum
-from functools import lru_cache
-from typing import Set
+from typing import List
 
-from logs_aggregator.k8s_log_entry import LogEntry
 from util.logger import initialize_logger
-from util.k8s.k8s_info import PodStatus, get_pod_status
+from util.k8s.k8s_info import PodStatus, get_namespaced_pods
 
 log = initialize_logger(__name__)
 
@@ -36,22 +34,24 @@ class SeverityLevel(Enum):
     DEBUG = {'ERROR', 'CRITICAL', 'WARNING', 'INFO', 'DEBUG'}
 
 
-def filter_log_by_severity(log_entry: LogEntry,
-                           min_severity: SeverityLevel) -> bool:
-    return any(severity in log_entry.content.upper() for severity in min_severity.value)
-
-
-@lru_cache(maxsize=128)
-def cached_pod_status(pod_name: str, namespace: str) -> PodStatus:
+def get_severity_query(min_severity: SeverityLevel) -> dict:
     """
-    Wrapper for caching Pod status calls in LRU cache.
+    Returns Elasticsearch query matching logs containing any of severity levels of the same or higher importance
+    than the given one. Wildcards are used, as a severity level may be a part of a longer word (e.g. ValueError,
+    UserWarning or INFO:root:message in the default format of Python logging), and indexed words of logs are in
+    lower case. A wildcard with a leading * cannot use the terms index, so Elasticsearch checks every distinct
+    word of logs in each searched index - it is still cheaper than downloading all logs of a run to filter them
+    on the client side, but it makes filtering by severity the most expensive part of the query.
     """
-    return get_pod_status(pod_name=pod_name, namespace=namespace)
-
+    return {'bool': {'should': [{'wildcard': {'log': f'*{severity.lower()}*'}}
+                                for severity in sorted(min_severity.value)],
+                     'minimum_should_match': 1}}
 
-def filter_log_by_pod_status(log_entry: LogEntry, pod_status: PodStatus) -> bool:
-    return cached_pod_status(pod_name=log_entry.pod_name, namespace=log_entry.namespace) == pod_status
 
-
-def filter_log_by_pod_ids(log_entry: LogEntry, pod_ids: Set[str]) -> bool:
-    return log_entry.pod_name in pod_ids
+def get_pod_names_with_status(run_name: str, namespace: str, pod_status: PodStatus) -> List[str]:
+    """
+    Returns names of pods of the given run having the given status, obtained with a single call of Kubernetes API.
+    """
+    pods = get_namespaced_pods(namespace=namespace, label_selector=f'runName={run_name}')
+    return [pod.metadata.name for pod in pods
+            if pod.status.phase and PodStatus(pod.status.phase.upper()) == pod_status]
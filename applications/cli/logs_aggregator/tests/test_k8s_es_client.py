@@ -14,14 +14,19 @@
 # limitations under the License.
 #
 
+import copy
+import datetime
+from itertools import islice
 from unittest.mock import MagicMock
 
 import pytest
 
-from logs_aggregator.k8s_es_client import K8sElasticSearchClient
+from logs_aggregator.k8s_es_client import K8sElasticSearchClient, LOG_ENTRY_SOURCE_FIELDS, get_daily_logs_indices
+from logs_aggregator.log_filters import SeverityLevel
 from logs_aggregator.k8s_log_entry import LogEntry
 from platform_resources.run import Run
 from platform_resources.workflow import ArgoWorkflow
+from util.k8s.k8s_info import PodStatus
 
 TEST_SCAN_OUTPUT = [{'_index': 'fluentd-20180417',
                                     '_type': 'access_log',
@@ -111,22 +116,87 @@ def test_full_log_search(mock_k8s_info, mocker):
     assert list(client.get_log_generator()) == TEST_LOG_ENTRIES
 
 
-def test_full_log_search_filter(mock_k8s_info, mocker):
+def _search_response(*logs):
+    return {'hits': {'hits': [{'_id': log_id, 'sort': [timestamp, log_id],
+                               '_source': {'@timestamp': str(timestamp), 'log': log_id,
+                                           'kubernetes': {'pod_name': 'pod', 'namespace_name': 'default'}}}
+                              for log_id, timestamp in logs]}}
+
+
+def test_stream_log_search(mock_k8s_info, mocker):
     client = K8sElasticSearchClient(host='fake', port=8080, namespace='kube-system')
-    es_scan_mock = mocker.patch('logs_aggregator.k8s_es_client.elasticsearch.helpers.scan')
-    es_scan_mock.return_value = iter(TEST_SCAN_OUTPUT)
+    sleep_mock = mocker.patch('logs_aggregator.k8s_es_client.time.sleep')
+    search_bodies = []
+
+    def search(index, body, **kwargs):
+        search_bodies.append(copy.deepcopy(body))
+        return responses.pop(0)
+
+    responses = [
+        # first search returns a full page, so the next page is requested
+        _search_response(('a', 1), ('b', 2)),
+        _search_response(('c', 2)),
+        # no new logs
+        _search_response(('b', 2), ('c', 2)),
+        _search_response(),
+        # log 'd' with the same timestamp as already returned logs was indexed in the meantime
+        _search_response(('b', 2), ('c', 2)),
+        _search_response(('d', 2), ('e', 3)),
+        _search_response()
+    ]
+    mocker.patch.object(client, 'search', side_effect=search)
+
+    query_body = {"query": {"bool": {"must": [], "filter": {"range": {"@timestamp": {"gte": "0"}}}}}}
+    logs = list(islice(client.get_stream_log_generator(query_body=query_body, page_size=2), 5))
+
+    assert [log.content for log in logs] == ['a', 'b', 'c', 'd', 'e']
+    assert 'search_after' not in search_bodies[0]
+    assert search_bodies[1]['search_after'] == [2, 'b']
+    assert search_bodies[2]['query']['bool']['filter']['range']['@timestamp']['gte'] == '2'
+    assert 'search_after' not in search_bodies[2]
+    assert search_bodies[5]['search_after'] == [2, 'c']
+    assert search_bodies[0]['sort'] == [{'@timestamp': {'order': 'asc'}}, {'_id': {'order': 'asc'}}]
+    # passed query is not modified
+    assert query_body['query']['bool']['filter']['range']['@timestamp']['gte'] == '0'
+    # no new logs were returned by the second search, so the time interval was increased
+    assert [call[0][0] for call in sleep_mock.call_args_list] == [0.5, 1.0]
+
+
+def test_stream_log_search_max_time_interval(mock_k8s_info, mocker):
+    client = K8sElasticSearchClient(host='fake', port=8080, namespace='kube-system')
+    sleep_mock = mocker.patch('logs_aggregator.k8s_es_client.time.sleep')
+    search_mock = mocker.patch.object(client, 'search')
+    search_mock.side_effect = [_search_response()] * 5 + [_search_response(('a', 1))]
+
+    logs = list(islice(client.get_stream_log_generator(time_interval=1, max_time_interval=4), 1))
 
-    filter_all_results = list(client.get_log_generator(filters=[lambda x: False]))
-    assert filter_all_results == []
+    assert [log.content for log in logs] == ['a']
+    assert [call[0][0] for call in sleep_mock.call_args_list] == [2, 4, 4, 4, 4]
 
 
-def test_full_log_search_filter_idempotent(mock_k8s_info, mocker):
+def test_stream_log_search_daily_indices(mock_k8s_info, mocker):
     client = K8sElasticSearchClient(host='fake', port=8080, namespace='kube-system')
-    es_scan_mock = mocker.patch('logs_aggregator.k8s_es_client.elasticsearch.helpers.scan')
-    es_scan_mock.return_value = iter(TEST_SCAN_OUTPUT)
+    mocker.patch('logs_aggregator.k8s_es_client.time.sleep')
+    search_mock = mocker.patch.object(client, 'search')
+    search_mock.side_effect = [_search_response(('a', 1))]
+    yesterday = datetime.datetime.utcnow() - datetime.timedelta(days=1)
 
-    filter_all_results = list(client.get_log_generator(filters=[lambda x: True]))
-    assert filter_all_results == TEST_LOG_ENTRIES
+    query_body = {"query": {"bool": {"must": [], "filter": {"range": {"@timestamp": {
+        "gte": yesterday.isoformat() + '+00:00'}}}}}}
+    next(client.get_stream_log_generator(query_body=query_body))
+
+    assert search_mock.call_args[1]['index'] == get_daily_logs_indices(yesterday.isoformat() + '+00:00')
+    assert search_mock.call_args[1]['ignore_unavailable'] is True
+
+
+def test_get_daily_logs_indices():
+    today = datetime.datetime.utcnow()
+    yesterday = today - datetime.timedelta(days=1)
+
+    assert get_daily_logs_indices(today.isoformat()) == f'fluentd-{today:%Y%m%d}'
+    assert get_daily_logs_indices(yesterday.isoformat() + 'Z') == f'fluentd-{yesterday:%Y%m%d},fluentd-{today:%Y%m%d}'
+    assert get_daily_logs_indices((today - datetime.timedelta(days=100)).isoformat()) == 'fluentd-*'
+    assert get_daily_logs_indices('not a date') is None
 
 
 def test_get_experiment_logs(mock_k8s_info, mocker):
@@ -155,8 +225,9 @@ def test_get_experiment_logs(mock_k8s_info, mocker):
                                 ],
                            "filter": {"range": {"@timestamp": {"gte": run_start_date}}}
                            }},
-        "sort": {"@timestamp": {"order": "asc"}}},
-        filters=[], index='_all')
+        "sort": {"@timestamp": {"order": "asc"}},
+        "_source": LOG_ENTRY_SOURCE_FIELDS},
+        index='_all')
 
 
 def test_get_workflow_logs(mocker):
@@ -187,7 +258,8 @@ def test_get_workflow_logs(mocker):
                                     ],
                                "filter": {"range": {"@timestamp": {"gte": workflow_start_date}}}
                                }},
-            "sort": {"@timestamp": {"order": "asc"}}},
+            "sort": {"@timestamp": {"order": "asc"}},
+            "_source": LOG_ENTRY_SOURCE_FIELDS},
             index='_all')
 
 
@@ -220,8 +292,46 @@ def test_get_experiment_logs_time_range(mock_k8s_info, mocker):
                                 ],
                            "filter": {"range": {"@timestamp":{"gte": start_date, "lte": end_date}}}
                            }},
-        "sort": {"@timestamp": {"order": "asc"}}},
-        filters=[], index='_all')
+        "sort": {"@timestamp": {"order": "asc"}},
+        "_source": LOG_ENTRY_SOURCE_FIELDS},
+        index='_all')
+
+
+def test_get_experiment_logs_filters(mock_k8s_info, mocker):
+    client = K8sElasticSearchClient(host='fake', port=8080, namespace='kube-system')
+    mocked_log_search = mocker.patch.object(client, 'get_log_generator')
+    mocked_log_search.return_value = iter(TEST_LOG_ENTRIES)
+    pod_names_mock = mocker.patch('logs_aggregator.k8s_es_client.get_pod_names_with_status',
+                                  return_value=['pod-1', 'pod-2'])
+
+    experiment_name = 'fake-experiment'
+    namespace = 'fake-namespace'
+
+    run_mock = MagicMock(spec=Run)
+    run_mock.name = experiment_name
+
+    start_date = '2018-04-17T09:28:39+00:00'
+
+    client.get_experiment_logs_generator(run=run_mock, namespace=namespace, start_date=start_date,
+                                         pod_ids=['pod-2', 'pod-3'], pod_status=PodStatus.RUNNING,
+                                         min_severity=SeverityLevel.ERROR)
+
+    pod_names_mock.assert_called_once_with(run_name=experiment_name, namespace=namespace,
+                                           pod_status=PodStatus.RUNNING)
+    mocked_log_search.assert_called_with(query_body={
+        "query": {"bool": {"must":
+                               [{'term': {'kubernetes.labels.runName.keyword': experiment_name}},
+                                {'term': {'kubernetes.namespace_name.keyword': namespace}},
+                                {'bool': {'should': [{'wildcard': {'log': '*critical*'}},
+                                                     {'wildcard': {'log': '*error*'}}],
+                                          'minimum_should_match': 1}},
+                                {'terms': {'kubernetes.pod_name.keyword': ['pod-2']}}
+                                ],
+                           "filter": {"range": {"@timestamp": {"gte": start_date}}}
+                           }},
+        "sort": {"@timestamp": {"order": "asc"}},
+        "_source": LOG_ENTRY_SOURCE_FIELDS},
+        index='_all')
 
 
 def test_delete_logs_for_namespace(mock_k8s_info, mocker):
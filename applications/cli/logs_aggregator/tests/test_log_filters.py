@@ -14,104 +14,27 @@
 # limitations under the License.
 #
 
-import pytest
+from kubernetes.client import V1ObjectMeta, V1Pod, V1PodStatus
 
-
-from logs_aggregator.log_filters import filter_log_by_severity,filter_log_by_pod_status,\
-    SeverityLevel, filter_log_by_pod_ids
-from logs_aggregator.k8s_log_entry import LogEntry
+from logs_aggregator.log_filters import SeverityLevel, get_severity_query, get_pod_names_with_status
 from util.k8s.k8s_info import PodStatus
 
-no_severity_log_entry = LogEntry(date='2018-04-19T14:27:46+00:00', content='bla',
-                                 pod_name='elasticsearch-5985cbd9d8-5lf55',
-                                 namespace='default')
-debug_log_entry = LogEntry(date='2018-04-19T14:27:46+00:00', content='[DEBUG ] bla',
-                           pod_name='elasticsearch-5985cbd9d8-5lf55',
-                           namespace='default')
-info_log_entry = LogEntry(date='2018-04-19T14:27:46+00:00', content='[INFO ] bla',
-                          pod_name='elasticsearch-5985cbd9d8-5lf55',
-                          namespace='default')
-warning_log_entry = LogEntry(date='2018-04-19T14:27:46+00:00', content='[WARNING ] bla',
-                             pod_name='elasticsearch-5985cbd9d8-5lf55',
-                             namespace='default')
-error_log_entry = LogEntry(date='2018-04-19T14:27:46+00:00', content='[ERROR ] bla',
-                           pod_name='elasticsearch-5985cbd9d8-5lf55',
-                           namespace='default')
-critical_log_entry = LogEntry(date='2018-04-19T14:27:46+00:00', content='[CRITICAL ] bla',
-                              pod_name='elasticsearch-5985cbd9d8-5lf55',
-                              namespace='default')
-
-
-@pytest.mark.parametrize("log_entry", [debug_log_entry, info_log_entry, warning_log_entry,
-                                       error_log_entry, critical_log_entry])
-def test_filter_log_by_severity_debug(log_entry):
-    assert filter_log_by_severity(log_entry, SeverityLevel.DEBUG) == True
-
-
-@pytest.mark.parametrize("log_entry", [info_log_entry, warning_log_entry,
-                                       error_log_entry, critical_log_entry])
-def test_filter_log_by_severity_info(log_entry):
-    assert filter_log_by_severity(log_entry, SeverityLevel.INFO) == True
-
-
-@pytest.mark.parametrize("log_entry", [debug_log_entry])
-def test_filter_log_by_severity_info_negative(log_entry):
-    assert filter_log_by_severity(log_entry, SeverityLevel.INFO) == False
-
-
-@pytest.mark.parametrize("log_entry", [warning_log_entry,
-                                       error_log_entry, critical_log_entry])
-def test_filter_log_by_severity_warning(log_entry):
-    assert filter_log_by_severity(log_entry, SeverityLevel.WARNING) == True
-
-
-@pytest.mark.parametrize("log_entry", [debug_log_entry, info_log_entry])
-def test_filter_log_by_severity_warning_negative(log_entry):
-    assert filter_log_by_severity(log_entry, SeverityLevel.WARNING) == False
-
-
-@pytest.mark.parametrize("log_entry", [error_log_entry, critical_log_entry])
-def test_filter_log_by_severity_error(log_entry):
-    assert filter_log_by_severity(log_entry, SeverityLevel.ERROR) == True
-
-
-@pytest.mark.parametrize("log_entry", [debug_log_entry, info_log_entry, warning_log_entry])
-def test_filter_log_by_severity_error_negative(log_entry):
-    assert filter_log_by_severity(log_entry, SeverityLevel.ERROR) == False
-
-
-@pytest.mark.parametrize("log_entry", [critical_log_entry])
-def test_filter_log_by_severity_critical(log_entry):
-    assert filter_log_by_severity(log_entry, SeverityLevel.CRITICAL) == True
-
-
-@pytest.mark.parametrize("log_entry", [debug_log_entry, info_log_entry,
-                                       warning_log_entry, error_log_entry])
-def test_filter_log_by_severity_critical_negative(log_entry):
-    assert filter_log_by_severity(log_entry, SeverityLevel.CRITICAL) == False
-
-
-@pytest.mark.parametrize("status", list(PodStatus))
-def test_filter_log_by_pod_status(status, mocker):
-
-    log_entry = LogEntry(date='2018-04-19T14:27:46+00:00',
-                        pod_name='test-pod',
-                        namespace='default',
-                        content='bla')
-
-    mocked_get_pod_status = mocker.patch('logs_aggregator.log_filters.cached_pod_status')
-    mocked_get_pod_status.return_value = status
-
-    assert filter_log_by_pod_status(log_entry, status) == True
 
+def test_get_severity_query():
+    assert get_severity_query(SeverityLevel.WARNING) == {
+        'bool': {'should': [{'wildcard': {'log': '*critical*'}},
+                            {'wildcard': {'log': '*error*'}},
+                            {'wildcard': {'log': '*warning*'}}],
+                 'minimum_should_match': 1}}
 
-def test_filter_log_by_pod_ids():
-    pod_id =  'test-pod'
 
-    log_entry = LogEntry(date='2018-04-19T14:27:46+00:00',
-                        pod_name='test-pod',
-                        namespace='default',
-                        content='bla')
+def test_get_pod_names_with_status(mocker):
+    get_pods_mock = mocker.patch('logs_aggregator.log_filters.get_namespaced_pods')
+    get_pods_mock.return_value = [V1Pod(metadata=V1ObjectMeta(name='running-pod'),
+                                        status=V1PodStatus(phase='Running')),
+                                  V1Pod(metadata=V1ObjectMeta(name='failed-pod'),
+                                        status=V1PodStatus(phase='Failed'))]
 
-    assert filter_log_by_pod_ids(pod_ids={pod_id}, log_entry=log_entry) == True
-    assert filter_log_by_pod_ids(pod_ids={'another-pod-id'}, log_entry=log_entry) == False
+    assert get_pod_names_with_status(run_name='run', namespace='default',
+                                     pod_status=PodStatus.RUNNING) == ['running-pod']
+    get_pods_mock.assert_called_once_with(namespace='default', label_selector='runName=run')
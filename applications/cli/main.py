@@ -14,6 +14,8 @@
 # limitations under the License.
 #
 
+import atexit
+from contextlib import ExitStack
 import os
 import urllib3
 import signal
@@ -39,6 +41,8 @@ from commands.model import model
 from util.aliascmd import AliasGroup
 from util.logger import initialize_logger, setup_log_file, configure_logger_for_external_packages
 from util.config import Config
+from util.k8s.api_client import K8sApiClient
+from util.k8s.k8s_proxy_context_manager import shared_tunnels
 from util.cli_state import verify_cli_config_path
 
 logger = initialize_logger(__name__)
@@ -114,8 +118,15 @@ def configure_cli_logs():
 
 @click.group(context_settings=CONTEXT_SETTINGS, cls=AliasGroup, help=BANNER,
              subcommand_metavar="COMMAND [options] [args]...")
-def entry_point():
+@click.pass_context
+def entry_point(ctx: click.Context):
     configure_cli_logs()
+    atexit.register(K8sApiClient.call_counter.log_stats)
+
+    # port forwards opened during the command are reused by all its proxies and closed when the command ends
+    resources = ExitStack()
+    resources.enter_context(shared_tunnels())
+    ctx.call_on_close(resources.close)
 
 
 entry_point.add_command(experiment.experiment)
@@ -20,7 +20,7 @@ import sre_constants
 from collections import namedtuple
 from enum import Enum
 from functools import partial
-from typing import List, Dict
+from typing import List, Dict, Iterator
 
 from kubernetes import client
 from kubernetes.client import CustomObjectsApi
@@ -29,10 +29,9 @@ from marshmallow_enum import EnumField
 
 from cli_text_consts import PlatformResourcesExperimentsTexts as Texts
 from platform_resources.custom_object_meta_model import validate_kubernetes_name
-from platform_resources.platform_resource import PlatformResource, KubernetesObjectSchema, KubernetesObject, \
-    PlatformResourceApiClient
+from platform_resources.platform_resource import PlatformResource, KubernetesObjectSchema, KubernetesObject
 from platform_resources.resource_filters import filter_by_name_regex, filter_by_state
-from platform_resources.run import Run, filter_by_run_kinds
+from platform_resources.run import Run, filter_by_run_kinds, get_run_kinds_label_selector
 from util.exceptions import InvalidRegularExpressionError
 from util.logger import initialize_logger
 from util.system import format_timestamp_for_cli
@@ -76,6 +75,7 @@ class Experiment(PlatformResource):
     api_group_name = 'aipg.intel.com'
     crd_plural_name = 'experiments'
     crd_version = 'v1'
+    cacheable = True
 
     ExperimentCliModel = namedtuple('Experiment', ['name', 'parameters_spec', 'creation_timestamp', 'submitter',
                                                    'status', 'template_name', 'template_version'])
@@ -167,12 +167,22 @@ class Experiment(PlatformResource):
         :return: List of Experiment objects
         """
         logger.debug('Listing experiments.')
+        return [experiment for experiments in cls.list_pages(namespace=namespace,
+                                                             custom_objects_api=custom_objects_api, **kwargs)
+                for experiment in experiments]
+
+    @classmethod
+    def list_pages(cls, namespace: str = None, custom_objects_api: CustomObjectsApi = None,
+                   **kwargs) -> Iterator[List['Experiment']]:
+        """
+        Return generator of pages of experiments - takes the same parameters as list(). Experiments are filtered
+        by labels and kinds on server side, other filters are applied to each received page.
+        """
         state = kwargs.pop('state', None)
         run_kinds_filter = kwargs.pop('run_kinds_filter', None)
         name_filter = kwargs.pop('name_filter', None)
         label_selector = kwargs.pop('label_selector', None)
 
-        raw_experiments = cls.list_raw_experiments(namespace=namespace, label_selector=label_selector)
         try:
             name_regex = re.compile(name_filter) if name_filter else None
         except sre_constants.error as e:
@@ -184,11 +194,15 @@ class Experiment(PlatformResource):
                               partial(filter_by_state, state=state),
                               partial(filter_by_run_kinds, run_kinds=run_kinds_filter)]
 
-        experiments = [Experiment.from_k8s_response_dict(experiment_dict)
-                       for experiment_dict in raw_experiments['items']
-                       if all(f(experiment_dict) for f in experiment_filters)]
+        label_selector = ','.join(selector for selector in (label_selector,
+                                                            get_run_kinds_label_selector(run_kinds_filter))
+                                  if selector)
 
-        return experiments
+        for raw_experiments in cls.list_raw_pages(namespace=namespace, custom_objects_api=custom_objects_api,
+                                                  label_selector=label_selector):
+            yield [Experiment.from_k8s_response_dict(experiment_dict)
+                   for experiment_dict in raw_experiments
+                   if all(f(experiment_dict) for f in experiment_filters)]
 
     @classmethod
     def list_raw_experiments(cls, namespace: str = None, label_selector: str = "",
@@ -199,16 +213,8 @@ class Experiment(PlatformResource):
         :param str label_selector: A selector to restrict the list of returned objects by their labels.
          Defaults to everything.
         """
-        k8s_custom_object_api = custom_objects_api if custom_objects_api else PlatformResourceApiClient.get()
-        if namespace:
-            raw_experiments = k8s_custom_object_api.list_namespaced_custom_object(group=Experiment.api_group_name,
-                                                                                  namespace=namespace,
-                                                                                  plural=Experiment.crd_plural_name,
-                                                                                  version=Experiment.crd_version,
-                                                                                  label_selector=label_selector)
-        else:
-            raw_experiments = k8s_custom_object_api.list_cluster_custom_object(group=Experiment.api_group_name,
-                                                                               plural=Experiment.crd_plural_name,
-                                                                               version=Experiment.crd_version,
-                                                                               label_selector=label_selector)
-        return raw_experiments
+        return {'items': [raw_experiment
+                          for raw_experiments in cls.list_raw_pages(namespace=namespace,
+                                                                    custom_objects_api=custom_objects_api,
+                                                                    label_selector=label_selector)
+                          for raw_experiment in raw_experiments]}
@@ -15,19 +15,26 @@
 #
 
 import http
-from typing import Dict, List, Optional, NamedTuple, TypeVar
+import json
+from typing import Dict, Iterator, List, Optional, NamedTuple, Tuple, TypeVar
 
 import yaml
-from kubernetes import client, config
+from kubernetes import client
 
 from kubernetes.client import CustomObjectsApi
 from kubernetes.client.rest import ApiException
+from kubernetes.watch.watch import iter_resp_lines
 from marshmallow import Schema, fields, post_load
 from platform_resources.custom_object_meta_model import V1ObjectMetaSchema
+from platform_resources.resource_cache import ResourceCache, is_resource_cache_enabled
+from util.k8s.api_client import K8sApiClient
 from util.logger import initialize_logger
 
 logger = initialize_logger(__name__)
 
+# maximal number of resources returned by Kubernetes API in a single response when resources are listed
+LIST_PAGE_SIZE = 500
+
 
 class KubernetesObject(object):
     def __init__(self, spec, metadata: client.V1ObjectMeta, apiVersion: str='aipg.intel.com/v1',
@@ -62,8 +69,7 @@ class PlatformResourceApiClient:
             return cls.k8s_custom_object_api
         else:
             try:
-                config.load_kube_config()
-                k8s_custom_object_api = client.CustomObjectsApi(client.ApiClient())
+                k8s_custom_object_api = K8sApiClient.get_custom_objects_api()
                 cls.k8s_custom_object_api = k8s_custom_object_api
                 return cls.k8s_custom_object_api
             except Exception:
@@ -79,6 +85,8 @@ class PlatformResource:
     api_group_name: str
     crd_plural_name: str
     crd_version: str
+    # whether lists of the resource can be served from the local resource cache
+    cacheable: bool = False
 
     def __init__(self, body: dict = None, name: str = None, namespace: str = None,
                  creation_timestamp: str = None, k8s_custom_object_api: CustomObjectsApi = None):
@@ -115,23 +123,125 @@ class PlatformResource:
         return cls(body=resource_body, *args, **kwargs)  #type: ignore
 
     @classmethod
-    def list(cls, namespace: str = None, custom_objects_api: CustomObjectsApi = None, label_selector: str = None,
-             **kwargs) -> List[PlatformResourceTypeVar]:
+    def get_list_path(cls, namespace: str = None) -> Tuple[str, Dict[str, str]]:
+        """
+        Return path (and its parameters) of Kubernetes API endpoint used to list and watch resources.
+        """
+        path_params = {'group': cls.api_group_name, 'version': cls.crd_version, 'plural': cls.crd_plural_name}
+        if namespace:
+            path_params['namespace'] = namespace
+            return '/apis/{group}/{version}/namespaces/{namespace}/{plural}', path_params
+        return '/apis/{group}/{version}/{plural}', path_params
+
+    @classmethod
+    def list_raw_page(cls, namespace: str = None, custom_objects_api: CustomObjectsApi = None,
+                      label_selector: str = None, page_size: int = LIST_PAGE_SIZE, continue_token: str = None) -> dict:
+        """
+        Return a single page of raw resources, together with metadata of the list - its resourceVersion
+        and a token needed to get the next page.
+        """
+        k8s_custom_object_api = custom_objects_api if custom_objects_api else PlatformResourceApiClient.get()
+
+        # list_*_custom_object methods of kubernetes client don't support limit and continue parameters, so the
+        # request is sent directly through the API client
+        path, path_params = cls.get_list_path(namespace)
+        query_params: List[tuple] = [('limit', page_size)]
+        if label_selector:
+            query_params.append(('labelSelector', label_selector))
+        if continue_token:
+            query_params.append(('continue', continue_token))
+
+        return k8s_custom_object_api.api_client.call_api(path, 'GET', path_params, query_params,
+                                                         {'Accept': 'application/json'},
+                                                         response_type='object',
+                                                         auth_settings=['BearerToken'],
+                                                         _return_http_data_only=True)
+
+    @classmethod
+    def watch_raw(cls, namespace: str = None, custom_objects_api: CustomObjectsApi = None,
+                  label_selector: str = None, field_selector: str = None, resource_version: str = None,
+                  timeout_seconds: int = None, request_timeout=None) -> Iterator[dict]:
+        """
+        Return generator of raw watch events (dictionaries with type and object keys) of resources. If
+        resource_version is not given, watch starts with ADDED events of all currently existing resources.
+        :param timeout_seconds: watch is ended by Kubernetes API after this time
+        :param request_timeout: timeout (or a tuple of connection and read timeouts) of the HTTP request
+        """
+        k8s_custom_object_api = custom_objects_api if custom_objects_api else PlatformResourceApiClient.get()
+
+        path, path_params = cls.get_list_path(namespace)
+        query_params: List[tuple] = [('watch', 'true')]
+        if label_selector:
+            query_params.append(('labelSelector', label_selector))
+        if field_selector:
+            query_params.append(('fieldSelector', field_selector))
+        if resource_version:
+            query_params.append(('resourceVersion', resource_version))
+        if timeout_seconds:
+            query_params.append(('timeoutSeconds', timeout_seconds))
+
+        response = k8s_custom_object_api.api_client.call_api(path, 'GET', path_params, query_params,
+                                                             {'Accept': 'application/json'},
+                                                             response_type='object',
+                                                             auth_settings=['BearerToken'],
+                                                             _return_http_data_only=True,
+                                                             _preload_content=False,
+                                                             _request_timeout=request_timeout)
+        try:
+            for line in iter_resp_lines(response):
+                yield json.loads(line)
+        finally:
+            response.close()
+            response.release_conn()
+
+    @classmethod
+    def list_raw_pages(cls, namespace: str = None, custom_objects_api: CustomObjectsApi = None,
+                       label_selector: str = None, page_size: int = LIST_PAGE_SIZE) -> Iterator[List[dict]]:
+        """
+        Return generator of pages of raw resources. A next page is requested from Kubernetes API only after
+        the previous one was consumed, so first resources can be processed before the whole list is received.
+        If the local resource cache is enabled and the resource supports it, resources are taken from the cache
+        after its incremental synchronization.
+        :param namespace: If provided, only resources from this namespace will be returned
+        :param str label_selector: A selector to restrict the list of returned objects by their labels.
+         Defaults to everything.
+        :param page_size: maximal number of resources in a single page
+        """
         logger.debug(f'Getting list of {cls.__name__}s.')
         k8s_custom_object_api = custom_objects_api if custom_objects_api else PlatformResourceApiClient.get()
-        if namespace:
-            raw_resources = k8s_custom_object_api.list_namespaced_custom_object(group=cls.api_group_name,
-                                                                                namespace=namespace,
-                                                                                plural=cls.crd_plural_name,
-                                                                                version=cls.crd_version,
-                                                                                label_selector=label_selector)
-        else:
-            raw_resources = k8s_custom_object_api.list_cluster_custom_object(group=cls.api_group_name,
-                                                                             plural=cls.crd_plural_name,
-                                                                             version=cls.crd_version,
-                                                                             label_selector=label_selector)
 
-        return [cls.from_k8s_response_dict(raw_resource) for raw_resource in raw_resources['items']]
+        if cls.cacheable and is_resource_cache_enabled():
+            cached_resources = ResourceCache(resource_class=cls, namespace=namespace,
+                                             custom_objects_api=k8s_custom_object_api).list_raw(label_selector)
+            if cached_resources is not None:
+                for index in range(0, len(cached_resources), page_size):
+                    yield cached_resources[index:index + page_size]
+                return
+
+        continue_token = None
+        while True:
+            raw_resources = cls.list_raw_page(namespace=namespace, custom_objects_api=k8s_custom_object_api,
+                                              label_selector=label_selector, page_size=page_size,
+                                              continue_token=continue_token)
+            yield raw_resources['items']
+
+            continue_token = raw_resources.get('metadata', {}).get('continue')
+            if not continue_token:
+                return
+
+    @classmethod
+    def list_pages(cls, namespace: str = None, custom_objects_api: CustomObjectsApi = None,
+                   label_selector: str = None, **kwargs) -> Iterator[List[PlatformResourceTypeVar]]:
+        for raw_resources in cls.list_raw_pages(namespace=namespace, custom_objects_api=custom_objects_api,
+                                                label_selector=label_selector):
+            yield [cls.from_k8s_response_dict(raw_resource) for raw_resource in raw_resources]
+
+    @classmethod
+    def list(cls, namespace: str = None, custom_objects_api: CustomObjectsApi = None, label_selector: str = None,
+             **kwargs) -> List[PlatformResourceTypeVar]:
+        pages: Iterator[list] = cls.list_pages(namespace=namespace, custom_objects_api=custom_objects_api,
+                                               label_selector=label_selector, **kwargs)
+        return [resource for resources in pages for resource in resources]
 
     @classmethod
     def get(cls, name: str, namespace: str = None,
@@ -0,0 +1,305 @@
+#
+# Copyright (c) 2019 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""
+Local, on-disk cache of platform resources (e.g. Runs and Experiments). Instead of listing all resources on every
+nctl invocation, the cache is updated with changes which happened since the last invocation - they are received
+with a short watch started from the last known resourceVersion, until the current resourceVersion of the list is
+reached. If the version has already expired, or the watch ends before all changes are received, all resources are
+listed again.
+"""
+
+from http import HTTPStatus
+import hashlib
+import json
+import os
+import re
+import tempfile
+from typing import Dict, List, Optional, Set, Tuple
+
+from kubernetes.client import CustomObjectsApi
+from kubernetes.client.rest import ApiException
+from kubernetes.watch.watch import iter_resp_lines
+from urllib3.exceptions import HTTPError
+
+from util.config import Config, ConfigInitError
+from util.logger import initialize_logger
+
+logger = initialize_logger(__name__)
+
+# environmental variable enabling the cache - it is enabled if the variable is set to a non-empty value
+NCTL_RESOURCE_CACHE_ENV_NAME = 'NCTL_RESOURCE_CACHE'
+# name of a directory in nctl config directory, where cached resources are stored
+RESOURCE_CACHE_DIR_NAME = 'resource_cache'
+
+# watch of changes is ended by Kubernetes API after this time (in seconds) at the latest - watch bookmarks are sent
+# by Kubernetes API 2 seconds before the end of a watch, so the current resourceVersion is usually reached earlier
+WATCH_TIMEOUT_SECONDS = 3
+# timeout (in seconds) of waiting for the response of a watch request
+WATCH_REQUEST_TIMEOUT_SECONDS = 30
+# watch of changes is considered broken if nothing was received within this time (in seconds) after the response
+# of a watch request
+WATCH_IDLE_TIMEOUT_SECONDS = WATCH_TIMEOUT_SECONDS
+
+# number of resources requested in a single request, when all resources are listed again
+RELIST_PAGE_SIZE = 500
+
+LABEL_SELECTOR_SET_REQUIREMENT = re.compile(r'^(?P<key>[^\s!=(),]+)\s+(?P<operator>in|notin)\s+'
+                                            r'\((?P<values>[^()]*)\)$')
+LABEL_SELECTOR_EQUALITY_REQUIREMENT = re.compile(r'^(?P<key>[^\s!=(),]+)\s*(?P<operator>==|=|!=)\s*'
+                                                 r'(?P<value>[^\s!=(),]*)$')
+LABEL_SELECTOR_EXISTS_REQUIREMENT = re.compile(r'^(?P<operator>!?)\s*(?P<key>[^\s!=(),]+)$')
+
+# requirement of a label selector - key of a label, operator (in, notin, exists, !exists) and values
+LabelRequirement = Tuple[str, str, Set[str]]
+
+
+def is_resource_cache_enabled() -> bool:
+    return bool(os.environ.get(NCTL_RESOURCE_CACHE_ENV_NAME))
+
+
+def parse_label_selector(label_selector: str = None) -> Optional[List[LabelRequirement]]:
+    """
+    Return list of requirements of the label selector, or None if the selector is not supported.
+    """
+    requirements: List[LabelRequirement] = []
+    if not label_selector:
+        return requirements
+
+    # requirements are separated by commas, which may also separate values of set-based requirements
+    for requirement in re.split(r',(?![^()]*\))', label_selector):
+        requirement = requirement.strip()
+
+        match = LABEL_SELECTOR_SET_REQUIREMENT.match(requirement)
+        if match:
+            requirements.append((match.group('key'), match.group('operator'),
+                                 {value.strip() for value in match.group('values').split(',')}))
+            continue
+
+        match = LABEL_SELECTOR_EQUALITY_REQUIREMENT.match(requirement)
+        if match:
+            requirements.append((match.group('key'), 'notin' if match.group('operator') == '!=' else 'in',
+                                 {match.group('value')}))
+            continue
+
+        match = LABEL_SELECTOR_EXISTS_REQUIREMENT.match(requirement)
+        if match:
+            requirements.append((match.group('key'), '!exists' if match.group('operator') else 'exists', set()))
+            continue
+
+        logger.debug(f'Label selector {label_selector} is not supported by the resource cache.')
+        return None
+
+    return requirements
+
+
+def match_labels(labels: Dict[str, str], requirements: List[LabelRequirement]) -> bool:
+    for key, operator, values in requirements:
+        if operator == 'in' and labels.get(key) not in values:
+            return False
+        elif operator == 'notin' and labels.get(key) in values:
+            return False
+        elif operator == 'exists' and key not in labels:
+            return False
+        elif operator == '!exists' and key in labels:
+            return False
+    return True
+
+
+class ResourceCacheExpiredError(Exception):
+    pass
+
+
+class ResourceCache:
+    """
+    Cache of all resources of the given class from the given namespace (or from all namespaces), stored in
+    nctl config directory. It is kept separately for each Kubernetes API server.
+    """
+
+    def __init__(self, resource_class, namespace: str = None, custom_objects_api: CustomObjectsApi = None,
+                 cache_dir: str = None):
+        self.resource_class = resource_class
+        self.namespace = namespace
+        self.custom_objects_api = custom_objects_api
+        self.cache_dir = cache_dir
+
+        self.resource_version: Optional[str] = None
+        self.resources: Dict[Tuple[str, str], dict] = {}
+
+    @property
+    def cache_file_path(self) -> str:
+        host = self.custom_objects_api.api_client.configuration.host
+        cache_key = f'{host}|{self.resource_class.api_group_name}/{self.resource_class.crd_version}/' \
+                    f'{self.resource_class.crd_plural_name}|{self.namespace or ""}'
+        return os.path.join(self.cache_dir, f'{self.resource_class.crd_plural_name}-'
+                                            f'{hashlib.sha1(cache_key.encode("utf-8")).hexdigest()}.json')
+
+    def list_raw(self, label_selector: str = None) -> Optional[List[dict]]:
+        """
+        Synchronize the cache and return raw resources matching the label selector, ordered in the same way as
+        by Kubernetes API. If the cache cannot be used - e.g. because nctl config directory doesn't exist or
+        the label selector is not supported - None is returned.
+        """
+        label_requirements = parse_label_selector(label_selector)
+        if label_requirements is None:
+            return None
+
+        if not self.cache_dir:
+            try:
+                self.cache_dir = os.path.join(Config().config_path, RESOURCE_CACHE_DIR_NAME)
+            except ConfigInitError:
+                logger.debug('nctl config directory not found, resource cache will not be used.')
+                return None
+
+        self.sync()
+
+        return [resource for _, resource in sorted(self.resources.items())
+                if match_labels(resource.get('metadata', {}).get('labels') or {}, label_requirements)]
+
+    def sync(self):
+        self.load()
+        if self.resource_version:
+            try:
+                self.watch_changes()
+            except ResourceCacheExpiredError:
+                logger.debug(f'Cached {self.resource_class.__name__}s are too old, listing them again.')
+                self.relist()
+        else:
+            self.relist()
+        self.save()
+
+    def load(self):
+        try:
+            with open(self.cache_file_path, mode='r', encoding='utf-8') as cache_file:
+                cache = json.load(cache_file)
+            self.resource_version = cache['resource_version']
+            self.resources = {get_resource_key(resource): resource for resource in cache['resources']}
+        except FileNotFoundError:
+            self.resource_version = None
+            self.resources = {}
+        except Exception:
+            logger.exception(f'Failed to load resource cache from {self.cache_file_path}.')
+            self.resource_version = None
+            self.resources = {}
+
+    def save(self):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        # cache file is replaced atomically, so concurrent nctl invocations never read a partially written file
+        fd, temp_file_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, mode='w', encoding='utf-8') as temp_file:
+                json.dump({'resource_version': self.resource_version,
+                           'resources': list(self.resources.values())}, temp_file)
+            os.replace(temp_file_path, self.cache_file_path)
+        except Exception:
+            logger.exception(f'Failed to save resource cache to {self.cache_file_path}.')
+            if os.path.exists(temp_file_path):
+                os.remove(temp_file_path)
+
+    def relist(self):
+        resources = {}
+        resource_version = None
+        continue_token = None
+        while True:
+            raw_resources = self.resource_class.list_raw_page(namespace=self.namespace,
+                                                              custom_objects_api=self.custom_objects_api,
+                                                              page_size=RELIST_PAGE_SIZE,
+                                                              continue_token=continue_token)
+            # all pages of a list are a snapshot of the same resourceVersion
+            resource_version = resource_version or raw_resources.get('metadata', {}).get('resourceVersion')
+            for resource in raw_resources['items']:
+                resources[get_resource_key(resource)] = resource
+
+            continue_token = raw_resources.get('metadata', {}).get('continue')
+            if not continue_token:
+                break
+
+        self.resources = resources
+        self.resource_version = resource_version
+
+    def watch_changes(self):
+        # changes up to the current resourceVersion of the list have to be received before the cache is used
+        current_version = self.resource_class.list_raw_page(namespace=self.namespace,
+                                                            custom_objects_api=self.custom_objects_api,
+                                                            page_size=1).get('metadata', {}).get('resourceVersion')
+        if is_version_reached(self.resource_version, current_version):
+            return
+
+        path, path_params = self.resource_class.get_list_path(self.namespace)
+        query_params = [('watch', 'true'), ('resourceVersion', self.resource_version),
+                        ('allowWatchBookmarks', 'true'), ('timeoutSeconds', WATCH_TIMEOUT_SECONDS)]
+        try:
+            response = self.custom_objects_api.api_client.call_api(
+                path, 'GET', path_params, query_params, {'Accept': 'application/json'}, response_type='object',
+                auth_settings=['BearerToken'], _return_http_data_only=True, _preload_content=False,
+                _request_timeout=WATCH_REQUEST_TIMEOUT_SECONDS)
+        except ApiException as e:
+            if e.status == HTTPStatus.GONE:
+                raise ResourceCacheExpiredError() from e
+            raise
+        except HTTPError as e:
+            # Kubernetes API didn't respond in time or the connection failed (urllib3 retries requests, so errors
+            # are usually wrapped in MaxRetryError) - changes may have not been received
+            raise ResourceCacheExpiredError() from e
+
+        try:
+            # response was received, so from now on the idle timeout is applied to reading of next events
+            if response.connection and response.connection.sock:
+                response.connection.sock.settimeout(WATCH_IDLE_TIMEOUT_SECONDS)
+
+            for line in iter_resp_lines(response):
+                self.apply_event(json.loads(line))
+                if is_version_reached(self.resource_version, current_version):
+                    return
+        except HTTPError as e:
+            # connection was broken or nothing was received within the idle timeout - not all changes may have
+            # been received
+            raise ResourceCacheExpiredError() from e
+        finally:
+            response.close()
+            response.release_conn()
+
+        # watch was ended by Kubernetes API before the current resourceVersion was reached
+        raise ResourceCacheExpiredError()
+
+    def apply_event(self, event: dict):
+        resource = event['object']
+        if event['type'] == 'ERROR':
+            if resource.get('code') == HTTPStatus.GONE:
+                raise ResourceCacheExpiredError()
+            raise RuntimeError(f'Watch of {self.resource_class.__name__}s failed: {resource}')
+
+        if event['type'] == 'DELETED':
+            self.resources.pop(get_resource_key(resource), None)
+        elif event['type'] != 'BOOKMARK':
+            self.resources[get_resource_key(resource)] = resource
+        self.resource_version = resource['metadata']['resourceVersion']
+
+
+def get_resource_key(resource: dict) -> Tuple[str, str]:
+    # resources are returned by Kubernetes API in order of their namespaces and names
+    return resource['metadata'].get('namespace', ''), resource['metadata']['name']
+
+
+def is_version_reached(resource_version: Optional[str], target_version: Optional[str]) -> bool:
+    """
+    Return True if resource_version is not older than target_version. resourceVersions are compared as integers,
+    which they are in practice - if they aren't, it is assumed that target_version wasn't reached.
+    """
+    try:
+        return int(resource_version) >= int(target_version)
+    except (TypeError, ValueError):
+        return False
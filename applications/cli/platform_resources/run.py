@@ -22,15 +22,14 @@ import re
 import sre_constants
 import textwrap
 from functools import partial
-from typing import List, Tuple, Dict
+from typing import List, Tuple, Dict, Iterator, Optional
 
 from kubernetes.client import CustomObjectsApi
 from marshmallow import Schema, fields, post_load
 from marshmallow_enum import EnumField
 
 from cli_text_consts import PlatformResourcesExperimentsTexts as Texts
-from platform_resources.platform_resource import PlatformResource, KubernetesObjectSchema, KubernetesObject, client, \
-    PlatformResourceApiClient
+from platform_resources.platform_resource import PlatformResource, KubernetesObjectSchema, KubernetesObject, client
 from platform_resources.resource_filters import filter_by_name_regex, filter_by_experiment_name
 from util.exceptions import InvalidRegularExpressionError
 from util.logger import initialize_logger
@@ -61,6 +60,7 @@ class Run(PlatformResource):
     api_group_name = 'aipg.intel.com'
     crd_plural_name = 'runs'
     crd_version = 'v1'
+    cacheable = True
 
     RunCliModel = namedtuple('RunCliModel', ['name', 'parameters', 'metrics',
                                              'submission_date', 'start_date', 'duration', 'submitter', 'status',
@@ -124,22 +124,21 @@ class Run(PlatformResource):
         :return: List of Run objects
         In case of problems during getting a list of runs - throws an error
         """
+        return [run for runs in cls.list_pages(namespace=namespace, custom_objects_api=custom_objects_api, **kwargs)
+                for run in runs]
+
+    @classmethod
+    def list_pages(cls, namespace: str = None, custom_objects_api: CustomObjectsApi = None,
+                   **kwargs) -> Iterator[List['Run']]:
+        """
+        Return generator of pages of experiment runs - takes the same parameters as list(). Runs are filtered
+        by kinds on server side, other filters are applied to each received page.
+        """
         state_list = kwargs.pop('state_list', None)
         name_filter = kwargs.pop('name_filter', None)
         exp_name_filter = kwargs.pop('exp_name_filter', None)
         excl_state = kwargs.pop('excl_state', None)
         run_kinds_filter = kwargs.pop('run_kinds_filter', None)
-        
-        k8s_custom_object_api = custom_objects_api if custom_objects_api else PlatformResourceApiClient.get()
-        if namespace:
-            raw_runs = k8s_custom_object_api.list_namespaced_custom_object(group=Run.api_group_name,
-                                                                           namespace=namespace,
-                                                                           plural=Run.crd_plural_name,
-                                                                           version=Run.crd_version)
-        else:
-            raw_runs = k8s_custom_object_api.list_cluster_custom_object(group=Run.api_group_name,
-                                                                        plural=Run.crd_plural_name,
-                                                                        version=Run.crd_version)
 
         try:
             name_regex = re.compile(name_filter) if name_filter else None
@@ -154,10 +153,11 @@ class Run(PlatformResource):
                        partial(filter_by_experiment_name, exp_name=exp_name_filter),
                        partial(filter_by_run_kinds, run_kinds=run_kinds_filter)]
 
-        runs = [Run.from_k8s_response_dict(run_dict)
-                for run_dict in raw_runs['items']
-                if all(f(run_dict) for f in run_filters)]
-        return runs
+        for raw_runs in cls.list_raw_pages(namespace=namespace, custom_objects_api=custom_objects_api,
+                                           label_selector=get_run_kinds_label_selector(run_kinds_filter)):
+            yield [Run.from_k8s_response_dict(run_dict)
+                   for run_dict in raw_runs
+                   if all(f(run_dict) for f in run_filters)]
 
     @property
     def cli_representation(self):
@@ -256,3 +256,11 @@ def filter_run_by_excl_state(resource_object_dict: dict, state: Enum = None):
 def filter_by_run_kinds(resource_object_dict: dict, run_kinds: List[Enum] = None):
     return any([resource_object_dict.get('metadata', {}).get('labels', {}).get('runKind')
                 == run_kind.value for run_kind in run_kinds]) if run_kinds else True
+
+
+def get_run_kinds_label_selector(run_kinds: List[Enum] = None) -> Optional[str]:
+    """
+    Return label selector matching resources of any of given run kinds - it is used to filter resources
+    on server side, instead of filter_by_run_kinds.
+    """
+    return f'runKind in ({",".join(run_kind.value for run_kind in run_kinds)})' if run_kinds else None
@@ -101,7 +101,7 @@ def test_create_experiment(mock_platform_resources_api_client: CustomObjectsApi)
     assert result.metadata.namespace == NAMESPACE
 
 def test_list_experiments(mock_platform_resources_api_client: CustomObjectsApi):
-    mock_platform_resources_api_client.list_cluster_custom_object.return_value = LIST_EXPERIMENTS_RESPONSE_RAW
+    mock_platform_resources_api_client.api_client.call_api.return_value = LIST_EXPERIMENTS_RESPONSE_RAW
     experiments = Experiment.list()
     assert TEST_EXPERIMENTS == experiments
 
@@ -109,7 +109,7 @@ def test_list_experiments(mock_platform_resources_api_client: CustomObjectsApi):
 def test_list_experiments_from_namespace(mock_platform_resources_api_client: CustomObjectsApi):
     raw_experiments_single_namespace = dict(LIST_EXPERIMENTS_RESPONSE_RAW)
     raw_experiments_single_namespace['items'] = [raw_experiments_single_namespace['items'][0]]
-    mock_platform_resources_api_client.list_namespaced_custom_object.return_value = raw_experiments_single_namespace
+    mock_platform_resources_api_client.api_client.call_api.return_value = raw_experiments_single_namespace
 
     experiments = Experiment.list(namespace='namespace-1')
 
@@ -117,19 +117,19 @@ def test_list_experiments_from_namespace(mock_platform_resources_api_client: Cus
 
 
 def test_list_experiments_filter_status(mock_platform_resources_api_client: CustomObjectsApi):
-    mock_platform_resources_api_client.list_cluster_custom_object.return_value = LIST_EXPERIMENTS_RESPONSE_RAW
+    mock_platform_resources_api_client.api_client.call_api.return_value = LIST_EXPERIMENTS_RESPONSE_RAW
     experiments = Experiment.list(state=ExperimentStatus.CREATING)
     assert [TEST_EXPERIMENTS[0]] == experiments
 
 
 def test_list_experiments_name_filter(mock_platform_resources_api_client: CustomObjectsApi):
-    mock_platform_resources_api_client.list_cluster_custom_object.return_value = LIST_EXPERIMENTS_RESPONSE_RAW
+    mock_platform_resources_api_client.api_client.call_api.return_value = LIST_EXPERIMENTS_RESPONSE_RAW
     experiments = Experiment.list(name_filter='test-experiment-new')
     assert [TEST_EXPERIMENTS[1]] == experiments
 
 
 def test_list_experiments_invalid_name_filter(mock_platform_resources_api_client: CustomObjectsApi):
-    mock_platform_resources_api_client.list_cluster_custom_object.return_value = LIST_EXPERIMENTS_RESPONSE_RAW
+    mock_platform_resources_api_client.api_client.call_api.return_value = LIST_EXPERIMENTS_RESPONSE_RAW
     with pytest.raises(InvalidRegularExpressionError):
         Experiment.list(name_filter='*')
 
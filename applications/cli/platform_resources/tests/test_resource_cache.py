@@ -0,0 +1,198 @@
+#
+# Copyright (c) 2019 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import json
+from unittest.mock import MagicMock
+
+import pytest
+from kubernetes.client.rest import ApiException
+from urllib3.exceptions import MaxRetryError, ProtocolError, ReadTimeoutError
+
+from platform_resources.resource_cache import ResourceCache, parse_label_selector, match_labels, is_version_reached
+from platform_resources.run import Run
+
+
+def raw_run(name: str, resource_version: str, labels: dict = None) -> dict:
+    return {'apiVersion': 'aipg.intel.com/v1', 'kind': 'Run',
+            'metadata': {'name': name, 'namespace': 'namespace-1', 'resourceVersion': resource_version,
+                         'labels': labels or {}},
+            'spec': {'state': 'QUEUED', 'experiment-name': name}}
+
+
+def watch_response(*events: dict, timeout: bool = False, error: Exception = None):
+    def read_chunked(decode_content=False):
+        for event in events:
+            yield (json.dumps(event) + '\n').encode('utf-8')
+        if timeout:
+            raise ReadTimeoutError(None, None, 'Read timed out.')
+        if error:
+            raise error
+
+    response = MagicMock()
+    response.read_chunked = read_chunked
+    return response
+
+
+@pytest.fixture()
+def mock_k8s_api_client():
+    api = MagicMock()
+    api.api_client.configuration.host = 'https://127.0.0.1:8443'
+    return api
+
+
+def test_list_raw_relists_without_cache(mock_k8s_api_client, tmpdir):
+    mock_k8s_api_client.api_client.call_api.side_effect = [
+        {'items': [raw_run('run-2', '10')], 'metadata': {'resourceVersion': '20', 'continue': 'token'}},
+        {'items': [raw_run('run-1', '11')], 'metadata': {'resourceVersion': '20'}}
+    ]
+
+    cache = ResourceCache(resource_class=Run, namespace='namespace-1', custom_objects_api=mock_k8s_api_client,
+                          cache_dir=str(tmpdir))
+    resources = cache.list_raw()
+
+    assert [resource['metadata']['name'] for resource in resources] == ['run-1', 'run-2']
+    assert cache.resource_version == '20'
+    with open(cache.cache_file_path) as cache_file:
+        assert json.load(cache_file)['resource_version'] == '20'
+
+
+def test_list_raw_applies_changes(mock_k8s_api_client, tmpdir):
+    mock_k8s_api_client.api_client.call_api.return_value = {
+        'items': [raw_run('run-1', '10'), raw_run('run-2', '11')], 'metadata': {'resourceVersion': '20'}
+    }
+    ResourceCache(resource_class=Run, namespace='namespace-1', custom_objects_api=mock_k8s_api_client,
+                  cache_dir=str(tmpdir)).list_raw()
+
+    mock_k8s_api_client.api_client.call_api.return_value = None
+    mock_k8s_api_client.api_client.call_api.side_effect = [
+        {'items': [raw_run('run-2', '22')], 'metadata': {'resourceVersion': '30', 'continue': 'token'}},
+        watch_response(
+            {'type': 'DELETED', 'object': raw_run('run-1', '21')},
+            {'type': 'MODIFIED', 'object': raw_run('run-2', '22', labels={'runKind': 'training'})},
+            {'type': 'ADDED', 'object': raw_run('run-3', '23')},
+            {'type': 'BOOKMARK', 'object': {'kind': 'Run', 'metadata': {'resourceVersion': '30'}}},
+            timeout=True
+        )
+    ]
+    cache = ResourceCache(resource_class=Run, namespace='namespace-1', custom_objects_api=mock_k8s_api_client,
+                          cache_dir=str(tmpdir))
+    resources = cache.list_raw(label_selector='runKind in (training,jupyter)')
+
+    assert [resource['metadata']['name'] for resource in resources] == ['run-2']
+    assert cache.resource_version == '30'
+    query_params = mock_k8s_api_client.api_client.call_api.call_args[0][3]
+    assert ('watch', 'true') in query_params
+    assert ('resourceVersion', '20') in query_params
+    assert ('allowWatchBookmarks', 'true') in query_params
+
+
+def test_list_raw_ends_watch_on_current_version(mock_k8s_api_client, tmpdir):
+    mock_k8s_api_client.api_client.call_api.return_value = {
+        'items': [raw_run('run-1', '10')], 'metadata': {'resourceVersion': '20'}
+    }
+    ResourceCache(resource_class=Run, namespace='namespace-1', custom_objects_api=mock_k8s_api_client,
+                  cache_dir=str(tmpdir)).list_raw()
+
+    mock_k8s_api_client.api_client.call_api.return_value = None
+    mock_k8s_api_client.api_client.call_api.side_effect = [
+        {'items': [raw_run('run-1', '10')], 'metadata': {'resourceVersion': '25'}},
+        # events after the current version of the list are not awaited
+        watch_response({'type': 'ADDED', 'object': raw_run('run-2', '25')}, timeout=True)
+    ]
+    cache = ResourceCache(resource_class=Run, namespace='namespace-1', custom_objects_api=mock_k8s_api_client,
+                          cache_dir=str(tmpdir))
+    resources = cache.list_raw()
+
+    assert [resource['metadata']['name'] for resource in resources] == ['run-1', 'run-2']
+    assert cache.resource_version == '25'
+
+
+def test_list_raw_without_changes(mock_k8s_api_client, tmpdir):
+    mock_k8s_api_client.api_client.call_api.return_value = {
+        'items': [raw_run('run-1', '10')], 'metadata': {'resourceVersion': '20'}
+    }
+    ResourceCache(resource_class=Run, namespace='namespace-1', custom_objects_api=mock_k8s_api_client,
+                  cache_dir=str(tmpdir)).list_raw()
+
+    cache = ResourceCache(resource_class=Run, namespace='namespace-1', custom_objects_api=mock_k8s_api_client,
+                          cache_dir=str(tmpdir))
+    resources = cache.list_raw()
+
+    assert [resource['metadata']['name'] for resource in resources] == ['run-1']
+    assert cache.resource_version == '20'
+    # only the current version of the list was requested - watch wasn't started
+    assert mock_k8s_api_client.api_client.call_api.call_count == 2
+    assert ('limit', 1) in mock_k8s_api_client.api_client.call_api.call_args[0][3]
+
+
+@pytest.mark.parametrize('expired_watch', [
+    ApiException(status=410),
+    watch_response({'type': 'ERROR', 'object': {'kind': 'Status', 'code': 410}}),
+    MaxRetryError(None, '/apis/aipg.intel.com/v1/namespaces/namespace-1/runs',
+                  ReadTimeoutError(None, None, 'Read timed out.')),
+    watch_response({'type': 'ADDED', 'object': raw_run('run-3', '23')},
+                   error=ProtocolError('Connection broken: IncompleteRead')),
+    watch_response({'type': 'ADDED', 'object': raw_run('run-3', '23')}, timeout=True),
+    watch_response({'type': 'ADDED', 'object': raw_run('run-3', '23')})
+])
+def test_list_raw_relists_expired_cache(mock_k8s_api_client, tmpdir, expired_watch):
+    mock_k8s_api_client.api_client.call_api.return_value = {
+        'items': [raw_run('run-1', '10')], 'metadata': {'resourceVersion': '20'}
+    }
+    ResourceCache(resource_class=Run, namespace='namespace-1', custom_objects_api=mock_k8s_api_client,
+                  cache_dir=str(tmpdir)).list_raw()
+
+    mock_k8s_api_client.api_client.call_api.return_value = None
+    mock_k8s_api_client.api_client.call_api.side_effect = [
+        {'items': [raw_run('run-2', '30')], 'metadata': {'resourceVersion': '40'}},
+        expired_watch,
+        {'items': [raw_run('run-2', '30')], 'metadata': {'resourceVersion': '40'}}
+    ]
+    cache = ResourceCache(resource_class=Run, namespace='namespace-1', custom_objects_api=mock_k8s_api_client,
+                          cache_dir=str(tmpdir))
+    resources = cache.list_raw()
+
+    assert [resource['metadata']['name'] for resource in resources] == ['run-2']
+    assert cache.resource_version == '40'
+
+
+@pytest.mark.parametrize('resource_version, target_version, reached', [
+    ('20', '20', True), ('21', '20', True), ('9', '10', False), ('abc', '10', False), ('10', None, False)
+])
+def test_is_version_reached(resource_version, target_version, reached):
+    assert is_version_reached(resource_version, target_version) == reached
+
+
+def test_list_raw_unsupported_label_selector(mock_k8s_api_client, tmpdir):
+    cache = ResourceCache(resource_class=Run, namespace='namespace-1', custom_objects_api=mock_k8s_api_client,
+                          cache_dir=str(tmpdir))
+
+    assert cache.list_raw(label_selector='runKind in (training') is None
+    assert mock_k8s_api_client.api_client.call_api.call_count == 0
+
+
+@pytest.mark.parametrize('label_selector,labels,matches', [
+    ('', {}, True),
+    ('runKind=training', {'runKind': 'training'}, True),
+    ('runKind==training', {'runKind': 'jupyter'}, False),
+    ('runKind!=training', {'runKind': 'jupyter'}, True),
+    ('runKind in (training, jupyter),app', {'runKind': 'jupyter', 'app': 'x'}, True),
+    ('runKind notin (training,jupyter)', {'runKind': 'jupyter'}, False),
+    ('!runKind', {}, True),
+    ('runKind=training,!app', {'runKind': 'training', 'app': 'x'}, False)
+])
+def test_match_labels(label_selector, labels, matches):
+    assert match_labels(labels, parse_label_selector(label_selector)) == matches
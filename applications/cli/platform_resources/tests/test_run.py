@@ -20,7 +20,7 @@ from kubernetes.client import CustomObjectsApi
 from kubernetes.client.rest import ApiException
 
 from platform_resources.platform_resource import KubernetesObject
-from platform_resources.run import Run, RunStatus
+from platform_resources.run import Run, RunStatus, RunKinds
 from util.exceptions import InvalidRegularExpressionError
 
 TEST_RUNS = [Run(name="exp-mnist-single-node.py-18.05.17-16.05.45-1-tf-training",
@@ -71,7 +71,7 @@ def mock_k8s_api_client(mocker) -> CustomObjectsApi:
 
 
 def test_list_runs(mock_k8s_api_client):
-    mock_k8s_api_client.list_cluster_custom_object.return_value = LIST_RUNS_RESPONSE_RAW
+    mock_k8s_api_client.api_client.call_api.return_value = LIST_RUNS_RESPONSE_RAW
     runs = Run.list()
     assert runs == TEST_RUNS
 
@@ -79,7 +79,7 @@ def test_list_runs(mock_k8s_api_client):
 def test_list_runs_from_namespace(mock_k8s_api_client: CustomObjectsApi):
     raw_runs_single_namespace = dict(LIST_RUNS_RESPONSE_RAW)
     raw_runs_single_namespace['items'] = [raw_runs_single_namespace['items'][0]]
-    mock_k8s_api_client.list_namespaced_custom_object.return_value = raw_runs_single_namespace
+    mock_k8s_api_client.api_client.call_api.return_value = raw_runs_single_namespace
 
     runs = Run.list(namespace='namespace-1')
 
@@ -87,22 +87,62 @@ def test_list_runs_from_namespace(mock_k8s_api_client: CustomObjectsApi):
 
 
 def test_list_runs_filter_status(mock_k8s_api_client: CustomObjectsApi):
-    mock_k8s_api_client.list_cluster_custom_object.return_value = LIST_RUNS_RESPONSE_RAW
+    mock_k8s_api_client.api_client.call_api.return_value = LIST_RUNS_RESPONSE_RAW
     runs = Run.list(state_list=[RunStatus.QUEUED])
     assert [TEST_RUNS[0]] == runs
 
 
 def test_list_runs_name_filter(mock_k8s_api_client: CustomObjectsApi):
-    mock_k8s_api_client.list_cluster_custom_object.return_value = LIST_RUNS_RESPONSE_RAW
+    mock_k8s_api_client.api_client.call_api.return_value = LIST_RUNS_RESPONSE_RAW
     runs = Run.list(name_filter=TEST_RUNS[1].name)
     assert [TEST_RUNS[1]] == runs
 
 
 def test_list_runs_invalid_name_filter(mock_k8s_api_client: CustomObjectsApi):
-    mock_k8s_api_client.list_cluster_custom_object.return_value = LIST_RUNS_RESPONSE_RAW
+    mock_k8s_api_client.api_client.call_api.return_value = LIST_RUNS_RESPONSE_RAW
     with pytest.raises(InvalidRegularExpressionError):
         Run.list(name_filter='*')
 
+
+def test_list_runs_pages(mock_k8s_api_client: CustomObjectsApi):
+    first_page = {'items': [LIST_RUNS_RESPONSE_RAW['items'][0]], 'metadata': {'continue': 'next-page-token'}}
+    second_page = {'items': [LIST_RUNS_RESPONSE_RAW['items'][1]], 'metadata': {'continue': ''}}
+    mock_k8s_api_client.api_client.call_api.side_effect = [first_page, second_page]
+
+    pages = Run.list_pages(namespace='namespace-1')
+
+    assert next(pages) == [TEST_RUNS[0]]
+    assert mock_k8s_api_client.api_client.call_api.call_count == 1
+    assert next(pages) == [TEST_RUNS[1]]
+    assert list(pages) == []
+
+    first_call, second_call = mock_k8s_api_client.api_client.call_api.call_args_list
+    assert first_call[0][0] == '/apis/{group}/{version}/namespaces/{namespace}/{plural}'
+    assert ('continue', 'next-page-token') not in first_call[0][3]
+    assert ('continue', 'next-page-token') in second_call[0][3]
+
+
+def test_list_runs_run_kinds_label_selector(mock_k8s_api_client: CustomObjectsApi):
+    mock_k8s_api_client.api_client.call_api.return_value = {'items': []}
+
+    Run.list(run_kinds_filter=[RunKinds.TRAINING, RunKinds.JUPYTER])
+
+    query_params = mock_k8s_api_client.api_client.call_api.call_args[0][3]
+    assert ('labelSelector', 'runKind in (training,jupyter)') in query_params
+
+
+def test_list_runs_from_resource_cache(mock_k8s_api_client: CustomObjectsApi, mocker):
+    mocker.patch.dict('os.environ', {'NCTL_RESOURCE_CACHE': '1'})
+    list_raw_mock = mocker.patch('platform_resources.platform_resource.ResourceCache.list_raw',
+                                 return_value=LIST_RUNS_RESPONSE_RAW['items'])
+
+    runs = Run.list(state_list=[RunStatus.QUEUED])
+
+    assert [TEST_RUNS[0]] == runs
+    assert list_raw_mock.call_count == 1
+    assert mock_k8s_api_client.api_client.call_api.call_count == 0
+
+
 def test_get_run_from_namespace(mock_k8s_api_client: CustomObjectsApi):
     mock_k8s_api_client.get_namespaced_custom_object.return_value = GET_RUN_RESPONSE_RAW
     run = Run.get(name=RUN_NAME, namespace=NAMESPACE)
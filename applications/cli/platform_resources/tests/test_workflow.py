@@ -14,6 +14,8 @@
 # limitations under the License.
 #
 
+import json
+
 import pytest
 from unittest.mock import MagicMock, mock_open, patch
 from typing import List
@@ -163,6 +165,7 @@ def test_set_parameters_error():
 
 
 def test_wait_for_completion(mocker):
+    mocker.patch('platform_resources.workflow.ArgoWorkflow.watch_raw', side_effect=RuntimeError)
     workflow_status_mock = MagicMock()
     workflow_status_mock.phase = 'Succeeded'
     get_workflow_mock = mocker.patch('platform_resources.workflow.ArgoWorkflow.get', return_value=workflow_status_mock)
@@ -174,6 +177,7 @@ def test_wait_for_completion(mocker):
 
 
 def test_wait_for_completion_failure(mocker):
+    mocker.patch('platform_resources.workflow.ArgoWorkflow.watch_raw', side_effect=RuntimeError)
     workflow_status_mock = MagicMock()
     workflow_status_mock.phase = 'Failed'
     get_workflow_mock = mocker.patch('platform_resources.workflow.ArgoWorkflow.get', return_value=workflow_status_mock)
@@ -185,6 +189,90 @@ def test_wait_for_completion_failure(mocker):
     assert get_workflow_mock.call_count == 1
 
 
+def workflow_event(phase: str = None, event_type: str = 'MODIFIED', resource_version: str = '1',
+                   nodes: dict = None) -> dict:
+    return {'type': event_type,
+            'object': {'metadata': {'name': 'workflow', 'resourceVersion': resource_version},
+                       'status': {'phase': phase, 'nodes': nodes or {}, 'message': 'message'}}}
+
+
+def test_wait_for_completion_watch(mocker):
+    build_node = {'type': 'Pod', 'displayName': 'build', 'startedAt': '2019-01-01T00:00:00Z'}
+    watch_mock = mocker.patch('platform_resources.workflow.ArgoWorkflow.watch_raw', return_value=iter([
+        workflow_event(event_type='ADDED', phase='Running', nodes={'build': {**build_node, 'phase': 'Running'}}),
+        workflow_event(phase='Running', resource_version='2', nodes={'build': {**build_node, 'phase': 'Running'}}),
+        workflow_event(phase='Succeeded', resource_version='3', nodes={'build': {**build_node, 'phase': 'Succeeded'}})
+    ]))
+    get_workflow_mock = mocker.patch('platform_resources.workflow.ArgoWorkflow.get')
+    progress_callback = MagicMock()
+
+    test_workflow = ArgoWorkflow(name='workflow', namespace='namespace')
+    test_workflow.wait_for_completion(progress_callback=progress_callback)
+
+    assert watch_mock.call_count == 1
+    assert watch_mock.call_args[1]['field_selector'] == 'metadata.name=workflow'
+    assert get_workflow_mock.call_count == 0
+    # callback is called only when steps change
+    assert [steps[0].phase for (steps,), _ in progress_callback.call_args_list] == ['Running', 'Succeeded']
+
+
+def test_wait_for_completion_watch_restarted(mocker):
+    watch_mock = mocker.patch('platform_resources.workflow.ArgoWorkflow.watch_raw', side_effect=[
+        iter([workflow_event(phase='Running', resource_version='5')]),
+        iter([workflow_event(phase='Succeeded', resource_version='6')])
+    ])
+
+    test_workflow = ArgoWorkflow(name='workflow', namespace='namespace')
+    test_workflow.wait_for_completion()
+
+    assert watch_mock.call_count == 2
+    assert watch_mock.call_args[1]['resource_version'] == '5'
+
+
+def test_wait_for_completion_watch_failure(mocker):
+    mocker.patch('platform_resources.workflow.ArgoWorkflow.watch_raw',
+                 return_value=iter([workflow_event(phase='Error')]))
+    get_workflow_mock = mocker.patch('platform_resources.workflow.ArgoWorkflow.get')
+
+    test_workflow = ArgoWorkflow(name='workflow', namespace='namespace')
+    with pytest.raises(RuntimeError):
+        test_workflow.wait_for_completion()
+
+    assert get_workflow_mock.call_count == 0
+
+
+def test_watch_raw():
+    events = [workflow_event(phase='Running'), workflow_event(phase='Succeeded', resource_version='2')]
+    response = MagicMock()
+    response.read_chunked.return_value = [json.dumps(event).encode('utf-8') + b'\n' for event in events]
+    custom_objects_api = MagicMock()
+    custom_objects_api.api_client.call_api.return_value = response
+
+    assert list(ArgoWorkflow.watch_raw(namespace='namespace', custom_objects_api=custom_objects_api,
+                                       field_selector='metadata.name=workflow', resource_version='1',
+                                       timeout_seconds=60)) == events
+
+    query_params = custom_objects_api.api_client.call_api.call_args[0][3]
+    assert query_params == [('watch', 'true'), ('fieldSelector', 'metadata.name=workflow'),
+                            ('resourceVersion', '1'), ('timeoutSeconds', 60)]
+    assert response.release_conn.call_count == 1
+
+
+def test_wait_for_completion_timeout(mocker):
+    mocker.patch('platform_resources.workflow.ArgoWorkflow.watch_raw', side_effect=RuntimeError)
+    mocker.patch('platform_resources.workflow.time.sleep')
+    mocker.patch('platform_resources.workflow.time.monotonic', side_effect=[0, 0, 0, 3, 6, 9])
+    workflow_status_mock = MagicMock()
+    workflow_status_mock.phase = 'Running'
+    get_workflow_mock = mocker.patch('platform_resources.workflow.ArgoWorkflow.get', return_value=workflow_status_mock)
+
+    test_workflow = ArgoWorkflow()
+    with pytest.raises(RuntimeError):
+        test_workflow.wait_for_completion(timeout=9, poll_interval=3)
+
+    assert get_workflow_mock.call_count == 4
+
+
 def check_parameters(parameters: List[dict]):
     cra = None
     smd = None
@@ -16,13 +16,16 @@
 
 from collections import namedtuple
 from functools import partial
+import http
+import math
 import re
 import sre_constants
 import time
-from typing import List
+from typing import Callable, List
 
 from kubernetes.client import CustomObjectsApi
 from typing import Optional
+from urllib3.exceptions import ReadTimeoutError
 
 from cli_text_consts import PlatformResourcesExperimentsTexts as Texts
 from platform_resources.platform_resource import PlatformResource, PlatformResourceApiClient
@@ -37,6 +40,12 @@ logger = initialize_logger(__name__)
 
 QUEUED_PHASE = 'Queued'
 
+WORKFLOW_SUCCESS_PHASES = {'Succeeded'}
+WORKFLOW_FAILURE_PHASES = {'Failed', 'Error'}
+
+# time (in seconds) of establishing a watch connection, and of waiting for its end after the watch timeout
+WATCH_CONNECTION_TIMEOUT = 10
+
 class ArgoWorkflowStep:
 
     ArgoWorkflowStepCliModel = namedtuple('ArgoWorkflowStepModel', ['name', 'started_at', 'finished_at', 'phase'])
@@ -55,6 +64,27 @@ class ArgoWorkflowStep:
                                                          phase=self.phase)
 
 
+class WorkflowFailedError(RuntimeError):
+    pass
+
+
+class _StepsReporter:
+    """
+    Passes steps of a workflow to the callback, only if they have changed since the last report.
+    """
+    def __init__(self, callback: Callable[[List[ArgoWorkflowStep]], None] = None):
+        self.callback = callback
+        self._last_steps: Optional[list] = None
+
+    def report(self, steps: Optional[List[ArgoWorkflowStep]]):
+        if not self.callback or not steps:
+            return
+        steps_representation = [step.cli_representation for step in steps]
+        if steps_representation != self._last_steps:
+            self._last_steps = steps_representation
+            self.callback(steps)
+
+
 class ArgoWorkflow(PlatformResource):
     api_group_name = 'argoproj.io'
     crd_plural_name = 'workflows'
@@ -180,29 +210,88 @@ class ArgoWorkflow(PlatformResource):
     def generate_name(self, value: str):
         self.body['metadata']['generateName'] = str(value)
 
-    def wait_for_completion(self, timeout=600, poll_interval=3):
+    def wait_for_completion(self, timeout=600, poll_interval=3,
+                            progress_callback: Callable[[List[ArgoWorkflowStep]], None] = None):
         """
         Wait until workflow will enter Succeeded phase. If workflow will enter Failed phase or will not enter
-        Succeeded phase in expected time, a RuntimeError will be raised.
+        Succeeded phase in expected time, a RuntimeError will be raised. Changes of the workflow are watched, so
+        its completion is noticed immediately - if watch is not available, workflow status is polled.
         :param timeout: Number of seconds to wait for workflow completion
         :param poll_interval: Interval between workflow status polling in seconds
+        :param progress_callback: function called with steps of the workflow, whenever they change
         :return: None if workflow completes, exception is raised otherwise
         """
-        success_phases = {'Succeeded'}
-        failure_phases = {'Failed', 'Error'}
-        for attempt in range(timeout//poll_interval):
+        deadline = time.monotonic() + timeout
+        steps_reporter = _StepsReporter(progress_callback)
+        try:
+            completed: Optional[bool] = self._watch_for_completion(deadline=deadline, steps_reporter=steps_reporter)
+        except WorkflowFailedError:
+            raise
+        except Exception:
+            logger.exception(f'Failed to watch workflow {self.name}, its status will be polled.')
+            completed = None
+
+        if completed is None:
+            completed = self._poll_for_completion(deadline=deadline, poll_interval=poll_interval,
+                                                  steps_reporter=steps_reporter)
+        if not completed:
+            raise RuntimeError(f'Workflow {self.name} has not entered one of statuses {WORKFLOW_SUCCESS_PHASES}'
+                               f' in {timeout} seconds.')
+
+    def _watch_for_completion(self, deadline: float, steps_reporter: '_StepsReporter') -> bool:
+        """
+        Watch the workflow until it completes (True is returned) or the deadline passes (False is returned).
+        """
+        resource_version = None
+        while True:
+            remaining_time = math.ceil(deadline - time.monotonic())
+            if remaining_time <= 0:
+                return False
+
+            try:
+                # watch started without resourceVersion begins with the current state of the workflow
+                for event in self.watch_raw(namespace=self.namespace, field_selector=f'metadata.name={self.name}',
+                                            resource_version=resource_version, timeout_seconds=remaining_time,
+                                            request_timeout=(WATCH_CONNECTION_TIMEOUT,
+                                                             remaining_time + WATCH_CONNECTION_TIMEOUT)):
+                    raw_workflow = event['object']
+                    if event['type'] == 'ERROR':
+                        if raw_workflow.get('code') == http.HTTPStatus.GONE:
+                            resource_version = None
+                            break
+                        raise RuntimeError(f'Watch of workflow {self.name} failed: {raw_workflow}')
+                    if event['type'] == 'DELETED':
+                        raise WorkflowFailedError(f'Workflow {self.name} was deleted.')
+
+                    resource_version = raw_workflow['metadata']['resourceVersion']
+                    status = raw_workflow.get('status') or {}
+                    steps_reporter.report(self.generate_step_group_list(raw_workflow))
+                    if self._check_completion(status.get('phase'), status):
+                        return True
+            except ReadTimeoutError:
+                # connection was broken - watch is restarted
+                logger.debug(f'Watch of workflow {self.name} timed out.')
+
+    def _poll_for_completion(self, deadline: float, poll_interval: int, steps_reporter: '_StepsReporter') -> bool:
+        attempt = 0
+        while True:
             current_workflow = self.get(name=self.name, namespace=self.namespace)
-            current_phase = current_workflow.phase
-            if current_phase in success_phases:
-                return
-            elif current_phase in failure_phases:
-                raise RuntimeError(f'Workflow {self.name} entered failure status {current_phase}.'
-                                   f'Reason: {current_workflow.status["message"]}')
-            else:
-                logger.info(f'Waiting for workflow {self.name} to complete. Attempt #{attempt}')
-                time.sleep(poll_interval)
-        raise RuntimeError(f'Workflow {self.name} has not entered one of statuses {success_phases}'
-                           f' in {timeout} seconds.')
+            steps_reporter.report(current_workflow.steps)
+            if self._check_completion(current_workflow.phase, current_workflow.status):
+                return True
+            if time.monotonic() + poll_interval > deadline:
+                return False
+            logger.info(f'Waiting for workflow {self.name} to complete. Attempt #{attempt}')
+            attempt += 1
+            time.sleep(poll_interval)
+
+    def _check_completion(self, phase: Optional[str], status: Optional[dict]) -> bool:
+        if phase in WORKFLOW_SUCCESS_PHASES:
+            return True
+        elif phase in WORKFLOW_FAILURE_PHASES:
+            raise WorkflowFailedError(f'Workflow {self.name} entered failure status {phase}.'
+                                      f'Reason: {(status or {}).get("message")}')
+        return False
 
     @classmethod
     def list(cls, namespace: str = None, custom_objects_api: CustomObjectsApi = None, **kwargs):
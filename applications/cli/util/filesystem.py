@@ -14,9 +14,12 @@
 # limitations under the License.
 #
 
+import hashlib
 import os
 import shutil
-from typing import List
+import tempfile
+import threading
+from typing import Dict, List, Tuple
 
 
 def copytree_content(src: str, dst: str, ignored_objects: List[str] = None, symlinks=False, ignore=None):
@@ -46,3 +49,96 @@ def get_total_directory_size_in_bytes(directory: str) -> int:
             full_filename = os.path.join(path, file)
             size += os.path.getsize(full_filename)
     return size
+
+
+class ContentStore:
+    """
+    Content-addressed store of files. Each distinct file (content and permissions) is stored only once, and
+    is hardlinked into destination directories - so e.g. many environments of runs of the same experiment
+    share one copy of a script folder and a pack. If hardlinks are not supported by the filesystem, stored
+    files are copied. Files linked from the store must not be modified in place - they should be replaced
+    (e.g. written to a temporary file and moved), otherwise the change would be visible in all destinations.
+    """
+    CHUNK_SIZE = 1024 * 1024
+
+    def __init__(self, store_dir: str):
+        self.store_dir = store_dir
+        self.links_supported = True
+
+        # stored files, indexed by path, size and modification time of source files - so a source file is
+        # hashed only once, even if it is added to many destinations
+        self._stored_files: Dict[Tuple[str, int, int], str] = {}
+        self._lock = threading.Lock()
+
+    def add_file(self, src: str) -> str:
+        """
+        Adds a file to the store (if it's not stored yet) and returns a path of the stored file.
+        """
+        src_stat = os.stat(src)
+        src_key = (os.path.abspath(src), src_stat.st_size, src_stat.st_mtime_ns)
+        with self._lock:
+            stored_file = self._stored_files.get(src_key)
+        if stored_file:
+            return stored_file
+
+        file_hash = hashlib.sha256()
+        with open(src, 'rb') as src_file:
+            for chunk in iter(lambda: src_file.read(self.CHUNK_SIZE), b''):
+                file_hash.update(chunk)
+        # linked files share permissions, so files with different permissions are stored separately
+        digest = f'{file_hash.hexdigest()}-{src_stat.st_mode & 0o777:o}'
+
+        stored_file = os.path.join(self.store_dir, digest[:2], digest)
+        if not os.path.exists(stored_file):
+            os.makedirs(os.path.dirname(stored_file), exist_ok=True)
+            # the same file may be added concurrently - stored file is replaced atomically
+            fd, temp_file = tempfile.mkstemp(dir=os.path.dirname(stored_file))
+            os.close(fd)
+            try:
+                shutil.copy2(src, temp_file)
+                os.replace(temp_file, stored_file)
+            except Exception:
+                os.remove(temp_file)
+                raise
+
+        with self._lock:
+            self._stored_files[src_key] = stored_file
+        return stored_file
+
+    def link_file(self, src: str, dst: str):
+        """
+        Similarly to shutil.copy2 copies 'src' file to 'dst' (file or directory), but the copy is a hardlink
+        to the file in the store.
+        """
+        if os.path.isdir(dst):
+            dst = os.path.join(dst, os.path.basename(src))
+        stored_file = self.add_file(src)
+
+        if os.path.lexists(dst):
+            os.remove(dst)
+        if self.links_supported:
+            try:
+                os.link(stored_file, dst)
+                return
+            except OSError:
+                self.links_supported = False
+        shutil.copy2(stored_file, dst)
+
+    def link_tree_content(self, src: str, dst: str, ignored_objects: List[str] = None):
+        """
+        Similarly to copytree_content copies content of 'src' directory to 'dst' directory (existing files are
+        overwritten), but files are hardlinked to files in the store.
+        """
+        os.makedirs(dst, exist_ok=True)
+        for item in os.listdir(src):
+            if not ignored_objects or item not in ignored_objects:
+                s = os.path.join(src, item)
+                d = os.path.join(dst, item)
+                if os.path.isdir(s):
+                    self.link_tree_content(s, d)
+                else:
+                    self.link_file(s, d)
+
+    def clear(self):
+        # files linked from the store stay in destination directories
+        shutil.rmtree(self.store_dir, ignore_errors=True)
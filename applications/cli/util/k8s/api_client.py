@@ -0,0 +1,148 @@
+#
+# Copyright (c) 2019 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import threading
+import time
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from kubernetes import client, config
+
+from util.logger import initialize_logger
+
+logger = initialize_logger(__name__)
+
+
+class ApiCallStats(NamedTuple):
+    method: str
+    path: str
+    calls: int
+    total_time: float
+    max_time: float
+
+
+class ApiCallCounter:
+    """
+    Thread-safe counter of calls of Kubernetes API and their latency, grouped by HTTP method and endpoint path
+    (e.g. /api/v1/namespaces/{namespace}/pods).
+    """
+
+    def __init__(self):
+        self._stats: Dict[Tuple[str, str], List] = {}
+        self._lock = threading.Lock()
+
+    def record(self, method: str, path: str, duration: float):
+        with self._lock:
+            stats = self._stats.setdefault((method, path), [0, 0.0, 0.0])
+            stats[0] += 1
+            stats[1] += duration
+            stats[2] = max(stats[2], duration)
+
+    def get_stats(self) -> List[ApiCallStats]:
+        with self._lock:
+            return sorted((ApiCallStats(method=method, path=path, calls=calls, total_time=total_time,
+                                        max_time=max_time)
+                           for (method, path), (calls, total_time, max_time) in self._stats.items()),
+                          key=lambda stats: stats.total_time, reverse=True)
+
+    def reset(self):
+        with self._lock:
+            self._stats = {}
+
+    def log_stats(self):
+        stats = self.get_stats()
+        if not stats:
+            return
+        logger.debug(f'Kubernetes API calls: {sum(call_stats.calls for call_stats in stats)}, total time: '
+                     f'{sum(call_stats.total_time for call_stats in stats):.3f}s')
+        for call_stats in stats:
+            logger.debug(f'{call_stats.method} {call_stats.path}: {call_stats.calls} calls, '
+                         f'total {call_stats.total_time:.3f}s, max {call_stats.max_time:.3f}s')
+
+
+class InstrumentedApiClient(client.ApiClient):
+    """
+    ApiClient which records all its calls in the given counter.
+    """
+
+    def __init__(self, counter: ApiCallCounter, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.counter = counter
+
+    def call_api(self, resource_path, method, *args, **kwargs):
+        start = time.monotonic()
+        try:
+            return super().call_api(resource_path, method, *args, **kwargs)
+        finally:
+            self.counter.record(method, resource_path, time.monotonic() - start)
+
+
+class K8sApiClient:
+    """
+    Process-wide factory of Kubernetes API objects. Kubeconfig is parsed only once per nctl invocation, and all
+    API objects share one ApiClient - and its pool of keep-alive connections. Calls of Kubernetes API made by
+    the shared client are counted in call_counter.
+    """
+    call_counter = ApiCallCounter()
+
+    _config_loaded = False
+    _current_context: Optional[dict] = None
+    _api_client: Optional[client.ApiClient] = None
+    _lock = threading.RLock()
+
+    @classmethod
+    def load_config(cls):
+        with cls._lock:
+            if not cls._config_loaded:
+                config.load_kube_config()
+                cls._config_loaded = True
+
+    @classmethod
+    def get_current_context(cls) -> dict:
+        with cls._lock:
+            if cls._current_context is None:
+                _, cls._current_context = config.list_kube_config_contexts()
+            return cls._current_context
+
+    @classmethod
+    def get_api_client(cls) -> client.ApiClient:
+        with cls._lock:
+            if not cls._api_client:
+                cls.load_config()
+                cls._api_client = InstrumentedApiClient(cls.call_counter)
+            return cls._api_client
+
+    @classmethod
+    def get_core_v1_api(cls) -> client.CoreV1Api:
+        return client.CoreV1Api(cls.get_api_client())
+
+    @classmethod
+    def get_custom_objects_api(cls) -> client.CustomObjectsApi:
+        return client.CustomObjectsApi(cls.get_api_client())
+
+    @classmethod
+    def get_rbac_authorization_v1_api(cls) -> client.RbacAuthorizationV1Api:
+        return client.RbacAuthorizationV1Api(cls.get_api_client())
+
+    @classmethod
+    def reset(cls):
+        """
+        Forgets loaded kubeconfig and the shared ApiClient - they will be loaded and created again when needed.
+        """
+        with cls._lock:
+            cls._config_loaded = False
+            cls._current_context = None
+            cls._api_client = None
+            cls.call_counter.reset()
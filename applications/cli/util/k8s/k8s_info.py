@@ -21,9 +21,10 @@ from typing import List, Dict, Optional
 from urllib.parse import urlparse
 
 from kubernetes.client.rest import ApiException
-from kubernetes import config, client
+from kubernetes import client
 from kubernetes.client import configuration, V1DeleteOptions, V1Secret, V1ServiceAccount
 
+from util.k8s.api_client import K8sApiClient
 from util.logger import initialize_logger
 from util.exceptions import KubernetesError
 from util.app_names import NAUTAAppNames
@@ -33,6 +34,11 @@ logger = initialize_logger('util.kubectl')
 
 PREFIX_VALUES = {"E": 10 ** 18, "P": 10 ** 15, "T": 10 ** 12, "G": 10 ** 9, "M": 10 ** 6, "K": 10 ** 3, "m": 10 ** (-3)}
 PREFIX_I_VALUES = {"Ei": 2 ** 60, "Pi": 2 ** 50, "Ti": 2 ** 40, "Gi": 2 ** 30, "Mi": 2 ** 20, "Ki": 2 ** 10}
+# number of nanoCPUs in a single unit of CPU resources given with a prefix, e.g. 100u
+CPU_NANO_PREFIX_VALUES = {"n": 1, "u": 10 ** 3}
+
+METRICS_API_GROUP = "metrics.k8s.io"
+METRICS_API_VERSION = "v1beta1"
 
 
 class PodStatus(Enum):
@@ -54,7 +60,7 @@ class NamespaceStatus(Enum):
 
 
 def get_kubectl_host(replace_https=True, with_port=True) -> str:
-    config.load_kube_config()
+    K8sApiClient.load_config()
     kubectl_host = configuration.Configuration().host
     parsed_kubectl_host = urlparse(kubectl_host)
     scheme = parsed_kubectl_host.scheme
@@ -79,19 +85,17 @@ def get_kubectl_host(replace_https=True, with_port=True) -> str:
 
 
 def get_api_key() -> str:
-    config.load_kube_config()
+    K8sApiClient.load_config()
     return configuration.Configuration().api_key.get('authorization')
 
 
 def get_kubectl_current_context_namespace() -> Optional[str]:
-    config.load_kube_config()
-    context_list, current_context = config.list_kube_config_contexts()
-    return current_context['context'].get('namespace')
+    K8sApiClient.load_config()
+    return K8sApiClient.get_current_context()['context'].get('namespace')
 
 
 def get_k8s_api() -> client.CoreV1Api:
-    config.load_kube_config()
-    return client.CoreV1Api(client.ApiClient())
+    return K8sApiClient.get_core_v1_api()
 
 
 def get_service_account(service_account_name: str, namespace: str) -> V1ServiceAccount:
@@ -195,6 +199,32 @@ def get_pods(label_selector: str = None) -> List[client.V1Pod]:
     return pods
 
 
+def get_pods_metrics(namespace: str = None) -> Optional[List[dict]]:
+    """
+    Returns current usage of resources by pods - PodMetrics objects of metrics.k8s.io API - from the given
+    namespace or from all namespaces, obtained with a single call. None is returned if metrics API is not
+    available, e.g. because metrics-server is not deployed in the cluster.
+    """
+    logger.debug(f'Getting pods metrics from namespace: {namespace}')
+    api = K8sApiClient.get_custom_objects_api()
+
+    try:
+        if namespace:
+            pods_metrics = api.list_namespaced_custom_object(group=METRICS_API_GROUP, version=METRICS_API_VERSION,
+                                                             namespace=namespace, plural='pods')
+        else:
+            pods_metrics = api.list_cluster_custom_object(group=METRICS_API_GROUP, version=METRICS_API_VERSION,
+                                                          plural='pods')
+    except ApiException as e:
+        # metrics API isn't registered (404) or it is registered but metrics-server isn't running (503)
+        if e.status in (HTTPStatus.NOT_FOUND, HTTPStatus.SERVICE_UNAVAILABLE):
+            logger.debug(f'Metrics API is not available: {e}')
+            return None
+        raise
+
+    return pods_metrics.get('items', [])
+
+
 def get_namespaced_pods(namespace: str, label_selector: str = None) -> List[client.V1Pod]:
     logger.debug(f'Getting namespaced pods with label selector: {label_selector}')
     api = get_k8s_api()
@@ -344,7 +374,7 @@ def get_current_user() -> str:
     :return: name of a user
     In case of any problems - it raises an exception
     """
-    return config.list_kube_config_contexts()[1]["context"]["user"]
+    return K8sApiClient.get_current_context()["context"]["user"]
 
 
 def get_current_namespace() -> str:
@@ -353,7 +383,7 @@ def get_current_namespace() -> str:
     :return: namespace
     In case of any problems - it raises an exception
     """
-    return config.list_kube_config_contexts()[1]["context"]["namespace"]
+    return K8sApiClient.get_current_context()["context"]["namespace"]
 
 
 def get_users_samba_password(username: str) -> str:
@@ -390,8 +420,7 @@ def get_users_samba_password(username: str) -> str:
 
 
 def get_cluster_roles(request_timeout: int = None) -> client.V1ClusterRoleList:
-    config.load_kube_config()
-    api = client.RbacAuthorizationV1Api(client.ApiClient())
+    api = K8sApiClient.get_rbac_authorization_v1_api()
     return api.list_cluster_role(_request_timeout=request_timeout)
 
 
@@ -418,17 +447,22 @@ def is_current_user_administrator(request_timeout: int = None) -> bool:
 def sum_cpu_resources_unformatted(cpu_resources: List[str]):
     """ Sum cpu resources given in k8s format and return the sum in the same format. """
     cpu_sum = 0
+    nano_cpu_sum = 0
     for cpu_resource in cpu_resources:
         if not cpu_resource:
             continue
         # If CPU resources are gives as for example 100m, we simply strip last character and sum leftover numbers.
         elif cpu_resource[-1] == "m":
             cpu_sum += int(cpu_resource[:-1])
+        # Usage reported by metrics API is given in nanoCPUs (e.g. 1234567n) - it is summed separately and
+        # converted to miliCPUs at the end, so rounding errors don't add up.
+        elif cpu_resource[-1] in CPU_NANO_PREFIX_VALUES:
+            nano_cpu_sum += int(cpu_resource[:-1]) * CPU_NANO_PREFIX_VALUES[cpu_resource[-1]]
         # Else we assume that cpu resources are given as float value of normal CPUs instead of miliCPUs.
         else:
             cpu_sum += int(float(cpu_resource) * 1000)
 
-    return cpu_sum
+    return cpu_sum + nano_cpu_sum // 10 ** 6
 
 
 def format_cpu_resources(sum: int):
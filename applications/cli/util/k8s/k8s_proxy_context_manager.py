@@ -14,8 +14,11 @@
 # limitations under the License.
 #
 
+from contextlib import contextmanager
 import socket
+import subprocess
 import threading
+from typing import Dict, Optional, Tuple
 
 import requests
 from requests.exceptions import ConnectionError
@@ -32,11 +35,79 @@ from cli_text_consts import UtilK8sProxyTexts as Texts
 
 logger = initialize_logger(__name__)
 
+# delays (in seconds) between checks of tunnel readiness grow from the initial to the maximal value
+READINESS_CHECK_INITIAL_DELAY = 0.05
+READINESS_CHECK_MAX_DELAY = 1.0
+# line written by kubectl port-forward when it starts to listen on a local port
+PORT_FORWARDING_STARTED_LINE = 'Forwarding from'
+
 
 class TunnelSetupError(RuntimeError):
     pass
 
 
+TunnelKey = Tuple[NAUTAAppNames, Optional[str], Optional[str], Optional[int]]
+
+
+class TunnelManager:
+    """
+    Keeps tunnels opened by K8sProxy objects, so next K8sProxy objects for the same application reuse them
+    instead of starting new port forwarding processes. Tunnels are closed when the manager is closed.
+    """
+    def __init__(self):
+        self._tunnels: Dict[TunnelKey, 'K8sProxy'] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: TunnelKey) -> Optional['K8sProxy']:
+        with self._lock:
+            proxy = self._tunnels.get(key)
+            if proxy and proxy.process.poll() is not None:
+                logger.debug(f'Tunnel to {key} has been closed, a new one will be opened.')
+                del self._tunnels[key]
+                return None
+            return proxy
+
+    def add(self, key: TunnelKey, proxy: 'K8sProxy'):
+        with self._lock:
+            self._tunnels[key] = proxy
+
+    def close(self):
+        with self._lock:
+            tunnels = list(self._tunnels.values())
+            self._tunnels = {}
+        for proxy in tunnels:
+            try:
+                proxy._close_tunnel()
+            except psutil.NoSuchProcess:
+                logger.debug(Texts.TUNNEL_ALREADY_CLOSED)
+            except Exception:
+                logger.exception(Texts.PROXY_EXIT_ERROR_MSG)
+
+
+_tunnel_manager: Optional[TunnelManager] = None
+
+
+@contextmanager
+def shared_tunnels():
+    """
+    Within this context, tunnels opened by K8sProxy objects are kept open and reused by next K8sProxy objects
+    for the same application - e.g. when the same operation is done for many experiments. Tunnels are closed
+    when the context ends. The context is entered by nctl entry point for the whole command.
+    """
+    global _tunnel_manager
+    if _tunnel_manager:
+        # nested context - tunnels are closed by the outermost one
+        yield _tunnel_manager
+        return
+
+    _tunnel_manager = TunnelManager()
+    try:
+        yield _tunnel_manager
+    finally:
+        _tunnel_manager.close()
+        _tunnel_manager = None
+
+
 class K8sProxy:
     def __init__(self, nauta_app_name: NAUTAAppNames, port: int = None,
                  app_name: str = None, number_of_retries: int = 0, namespace: str = None,
@@ -48,9 +119,24 @@ class K8sProxy:
         self.namespace = namespace
         self.number_of_retries_wait_for_readiness = number_of_retries_wait_for_readiness
         self.tunnel_monitor_thread = None
+        self.shared = False
+
+    @property
+    def tunnel_key(self) -> TunnelKey:
+        return self.nauta_app_name, self.app_name, self.namespace, self.external_port
 
     def __enter__(self):
         logger.debug("k8s_proxy - entering")
+        tunnel_manager = _tunnel_manager
+        if tunnel_manager:
+            shared_proxy = tunnel_manager.get(self.tunnel_key)
+            if shared_proxy:
+                logger.debug(f'k8s_proxy - reusing tunnel on port {shared_proxy.tunnel_port}')
+                self.process, self.tunnel_port, self.container_port \
+                    = shared_proxy.process, shared_proxy.tunnel_port, shared_proxy.container_port
+                self.shared = True
+                return self
+
         try:
             self.process, self.tunnel_port, self.container_port \
                 = kubectl.start_port_forwarding(k8s_app_name=self.nauta_app_name,
@@ -58,11 +144,14 @@ class K8sProxy:
                                                 app_name=self.app_name,
                                                 number_of_retries=self.number_of_retries,
                                                 namespace=self.namespace)
-            self.tunnel_monitor_thread = threading.Thread(target=self._log_tunnel_output, args=(self.process,))
+            forwarding_started = threading.Event()
+            self.tunnel_monitor_thread = threading.Thread(target=self._log_tunnel_output,
+                                                          args=(self.process, forwarding_started))
             self.tunnel_monitor_thread.start()
             try:
                 self._wait_for_connection_readiness('127.0.0.1', self.tunnel_port,
-                                                    tries=self.number_of_retries_wait_for_readiness)
+                                                    tries=self.number_of_retries_wait_for_readiness,
+                                                    forwarding_started=forwarding_started)
             except Exception as ex:
                 self._close_tunnel()
                 raise ex
@@ -73,10 +162,17 @@ class K8sProxy:
             logger.exception(error_message)
             raise K8sProxyOpenError(error_message) from exe
 
+        if tunnel_manager:
+            tunnel_manager.add(self.tunnel_key, self)
+            self.shared = True
+
         return self
 
     def __exit__(self, *args):
         logger.debug("k8s_proxy - exiting")
+        if self.shared:
+            # tunnel is closed by the tunnel manager
+            return
         try:
             self._close_tunnel()
         except psutil.NoSuchProcess:
@@ -87,15 +183,30 @@ class K8sProxy:
             raise K8sProxyCloseError(error_message) from exe
 
     @staticmethod
-    def _wait_for_connection_readiness(address: str, port: int, tries: int = 30):
+    def _check_connection(address: str, port: int):
+        requests.get(f'http://{address}:{port}')
+
+    @classmethod
+    def _wait_for_connection_readiness(cls, address: str, port: int, tries: int = 30,
+                                       forwarding_started: threading.Event = None):
+        """
+        Checks connection through the tunnel until it succeeds. Delays between checks grow from
+        READINESS_CHECK_INITIAL_DELAY to READINESS_CHECK_MAX_DELAY seconds - a check is done immediately
+        when forwarding_started event is set.
+        """
+        delay = READINESS_CHECK_INITIAL_DELAY
         for retry in range(tries):
             try:
-                requests.get(f'http://{address}:{port}')
+                cls._check_connection(address, port)
                 return
-            except (ConnectionError, NewConnectionError) as e:
+            except (ConnectionError, NewConnectionError, ConnectionRefusedError) as e:
                 error_msg = f'can not connect to {address}:{port}. Error: {e}'
                 logger.exception(error_msg) if retry == tries-1 else logger.debug(error_msg)  # type: ignore
-                time.sleep(1)
+                if forwarding_started and not forwarding_started.is_set():
+                    forwarding_started.wait(delay)
+                else:
+                    time.sleep(delay)
+                delay = min(delay * 2, READINESS_CHECK_MAX_DELAY)
         raise TunnelSetupError(Texts.TUNNEL_NOT_READY_ERROR_MSG.format(address=address, port=port))
 
     def _close_tunnel(self):
@@ -111,9 +222,12 @@ class K8sProxy:
             self.tunnel_monitor_thread.join(timeout=10)
 
     @staticmethod
-    def _log_tunnel_output(tunnel_process):
+    def _log_tunnel_output(tunnel_process: subprocess.Popen, forwarding_started: threading.Event = None):
+        stdout_line: str
         for stdout_line in iter(tunnel_process.stdout.readline, ''):
             logger.debug('Tunnel({pid}) STDOUT: {line}'.format(line=stdout_line, pid=tunnel_process.pid))
+            if forwarding_started and stdout_line.startswith(PORT_FORWARDING_STARTED_LINE):
+                forwarding_started.set()
 
 
 class TcpK8sProxy(K8sProxy):
@@ -123,21 +237,9 @@ class TcpK8sProxy(K8sProxy):
                          number_of_retries=number_of_retries, namespace=namespace)
 
     @staticmethod
-    def _wait_for_connection_readiness(address: str, port: int, tries: int = 60):
-        sock = None
-        for retry in range(tries):
-            try:
-                sock = socket.create_connection(address=(address, port), timeout=20)
-                break
-            except (ConnectionError, ConnectionRefusedError) as e:
-                error_msg = f'can not connect to {address}:{port}. Error: {e}'
-                logger.exception(error_msg) if retry == tries - 1 else logger.debug(error_msg)  # type: ignore
-                time.sleep(1)
-            finally:
-                if sock:
-                    sock.close()
-        else:
-            raise TunnelSetupError(Texts.TUNNEL_NOT_READY_ERROR_MSG.format(address=address, port=port))
+    def _check_connection(address: str, port: int):
+        sock = socket.create_connection(address=(address, port), timeout=20)
+        sock.close()
 
 
 def check_port_forwarding():
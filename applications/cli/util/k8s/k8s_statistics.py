@@ -16,10 +16,10 @@
 
 from operator import itemgetter
 
-from typing import List, Tuple
+from typing import Dict, List, Optional, Tuple
 from util.k8s.kubectl import get_top_for_pod
-from util.k8s.k8s_info import get_pods, sum_cpu_resources_unformatted, sum_mem_resources_unformatted, \
-    format_mem_resources, format_cpu_resources, PodStatus
+from util.k8s.k8s_info import get_pods, get_pods_metrics, sum_cpu_resources_unformatted, \
+    sum_mem_resources_unformatted, format_mem_resources, format_cpu_resources, PodStatus
 from util.logger import initialize_logger
 
 logger = initialize_logger(__name__)
@@ -42,35 +42,75 @@ class ResourceUsage():
         return self.user_name+":"+self.get_formatted_cpu_usage()+":"+self.get_formatted_mem_usage()
 
 
-def get_highest_usage() -> Tuple[List[ResourceUsage], List[ResourceUsage]]:
+# namespaces of technical pods, which are omitted when usage of resources by users is gathered
+TECHNICAL_NAMESPACES = ["nauta", "kube-system"]
 
-    available_pods = get_pods(label_selector=None)
-    CPU_KEY = "cpu"
-    MEM_KEY = "mem"
-    NAME_KEY = "name"
+# usage of resources by user: name of user's namespace -> list of usages of cpu and list of usages of memory,
+# expressed in k8s format
+UsersUsageData = Dict[str, Tuple[List[str], List[str]]]
 
-    users_data: dict = {}
-    summarized_usage = []
 
-    for item in available_pods:
+def get_usage_from_metrics_api() -> Optional[UsersUsageData]:
+    """
+    Returns usage of resources by containers of users' pods obtained with a single call of metrics API, or None
+    if metrics API is not available.
+    """
+    pods_metrics = get_pods_metrics()
+    if pods_metrics is None:
+        return None
+
+    users_data: UsersUsageData = {}
+    for pod_metrics in pods_metrics:
+        namespace = pod_metrics['metadata']['namespace']
+        if namespace in TECHNICAL_NAMESPACES:
+            continue
+        cpu_usage, mem_usage = users_data.setdefault(namespace, ([], []))
+        for container in pod_metrics.get('containers') or []:
+            usage = container.get('usage') or {}
+            cpu_usage.append(usage.get('cpu'))
+            mem_usage.append(usage.get('memory'))
+
+    return users_data
+
+
+def get_usage_from_kubectl_top() -> UsersUsageData:
+    """
+    Returns usage of resources by users' running pods obtained with kubectl top, executed separately for each pod.
+    """
+    users_data: UsersUsageData = {}
+
+    for item in get_pods(label_selector=None):
         name = item.metadata.name
         namespace = item.metadata.namespace
         # omit technical namespaces
-        if namespace not in ["nauta", "kube-system"] and item.status.phase.upper() == PodStatus.RUNNING.value:
+        if namespace not in TECHNICAL_NAMESPACES and item.status.phase.upper() == PodStatus.RUNNING.value:
             try:
                 cpu, mem = get_top_for_pod(name=name, namespace=namespace)
-                if namespace in users_data:
-                    users_data.get(namespace, {}).get(CPU_KEY).append(cpu)
-                    users_data.get(namespace, {}).get(MEM_KEY).append(mem)
-                else:
-                    users_data[namespace] = {CPU_KEY: [cpu], MEM_KEY: [mem]}
-            except Exception as exe:
+                cpu_usage, mem_usage = users_data.setdefault(namespace, ([], []))
+                cpu_usage.append(cpu)
+                mem_usage.append(mem)
+            except Exception:
                 logger.exception("Error during gathering pod resources usage.")
 
-    for user_name, usage in users_data.items():
+    return users_data
+
+
+def get_highest_usage() -> Tuple[List[ResourceUsage], List[ResourceUsage]]:
+    CPU_KEY = "cpu"
+    MEM_KEY = "mem"
+    NAME_KEY = "name"
+
+    users_data = get_usage_from_metrics_api()
+    if users_data is None:
+        logger.debug("Metrics API is not available, usage of resources will be gathered with kubectl top.")
+        users_data = get_usage_from_kubectl_top()
+
+    summarized_usage = []
+
+    for user_name, (cpu_usage, mem_usage) in users_data.items():
         summarized_usage.append({NAME_KEY: user_name,
-                                 CPU_KEY: sum_cpu_resources_unformatted(usage.get(CPU_KEY)),
-                                 MEM_KEY: sum_mem_resources_unformatted(usage.get(MEM_KEY))})
+                                 CPU_KEY: sum_cpu_resources_unformatted(cpu_usage),
+                                 MEM_KEY: sum_mem_resources_unformatted(mem_usage)})
 
     top_cpu_users = sorted(summarized_usage, key=itemgetter(CPU_KEY), reverse=True)
     top_mem_users = sorted(summarized_usage, key=itemgetter(MEM_KEY), reverse=True)
@@ -0,0 +1,104 @@
+#
+# Copyright (c) 2019 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+
+from kubernetes import client
+
+from util.k8s.api_client import ApiCallCounter, InstrumentedApiClient, K8sApiClient
+
+
+def test_load_config_once(mocker):
+    load_config_mock = mocker.patch('util.k8s.api_client.config.load_kube_config')
+
+    K8sApiClient.load_config()
+    K8sApiClient.load_config()
+
+    assert load_config_mock.call_count == 1
+
+
+def test_get_current_context_once(mocker):
+    list_contexts_mock = mocker.patch('util.k8s.api_client.config.list_kube_config_contexts',
+                                      return_value=([], {'context': {'user': 'test-user'}}))
+
+    assert K8sApiClient.get_current_context() == {'context': {'user': 'test-user'}}
+    assert K8sApiClient.get_current_context() == {'context': {'user': 'test-user'}}
+
+    assert list_contexts_mock.call_count == 1
+
+
+def test_api_client_shared(mocker):
+    load_config_mock = mocker.patch('util.k8s.api_client.config.load_kube_config')
+
+    core_api = K8sApiClient.get_core_v1_api()
+    custom_objects_api = K8sApiClient.get_custom_objects_api()
+
+    assert core_api.api_client is custom_objects_api.api_client
+    assert isinstance(core_api.api_client, InstrumentedApiClient)
+    assert load_config_mock.call_count == 1
+
+
+def test_reset(mocker):
+    load_config_mock = mocker.patch('util.k8s.api_client.config.load_kube_config')
+
+    api_client = K8sApiClient.get_api_client()
+    K8sApiClient.reset()
+
+    assert K8sApiClient.get_api_client() is not api_client
+    assert load_config_mock.call_count == 2
+
+
+def test_instrumented_api_client_records_calls(mocker):
+    mocker.patch.object(client.ApiClient, 'call_api', return_value='response')
+    counter = ApiCallCounter()
+    api_client = InstrumentedApiClient(counter)
+
+    assert api_client.call_api('/api/v1/namespaces/{namespace}/pods', 'GET') == 'response'
+    api_client.call_api('/api/v1/namespaces/{namespace}/pods', 'GET')
+    api_client.call_api('/api/v1/namespaces/{namespace}', 'DELETE')
+
+    stats = {(call_stats.method, call_stats.path): call_stats for call_stats in counter.get_stats()}
+    assert stats[('GET', '/api/v1/namespaces/{namespace}/pods')].calls == 2
+    assert stats[('DELETE', '/api/v1/namespaces/{namespace}')].calls == 1
+
+
+def test_instrumented_api_client_records_failed_calls(mocker):
+    mocker.patch.object(client.ApiClient, 'call_api', side_effect=RuntimeError)
+    counter = ApiCallCounter()
+    api_client = InstrumentedApiClient(counter)
+
+    try:
+        api_client.call_api('/api/v1/namespaces', 'GET')
+    except RuntimeError:
+        pass
+
+    assert counter.get_stats()[0].calls == 1
+
+
+def test_api_call_counter_log_stats(mocker):
+    logger_mock = mocker.patch('util.k8s.api_client.logger')
+    counter = ApiCallCounter()
+
+    counter.log_stats()
+    assert logger_mock.debug.call_count == 0
+
+    counter.record('GET', '/api/v1/namespaces', 0.5)
+    counter.record('GET', '/api/v1/namespaces', 1.5)
+    counter.log_stats()
+
+    assert logger_mock.debug.call_count == 2
+    stats = counter.get_stats()[0]
+    assert stats.total_time == 2.0
+    assert stats.max_time == 1.5
@@ -27,7 +27,7 @@ from util.k8s.k8s_info import get_kubectl_host, get_app_services, \
                               find_namespace, delete_namespace, get_config_map_data, get_users_token, \
                               get_cluster_roles, is_current_user_administrator, check_pods_status, \
                               PodStatus, get_app_service_node_port, get_pods, NamespaceStatus, get_pod_events, \
-                              get_namespaced_pods, add_bytes_to_unit
+                              get_namespaced_pods, add_bytes_to_unit, get_pods_metrics, sum_cpu_resources_unformatted
 from util.config import NAUTAConfigMap
 from util.app_names import NAUTAAppNames
 from util.exceptions import KubernetesError
@@ -276,6 +276,45 @@ def test_get_namespaced_pods_error(mocker, mocked_k8s_CoreV1Api, mocked_kubeconf
         get_namespaced_pods(label_selector='', namespace=test_namespace)
 
 
+@pytest.fixture()
+def mocked_k8s_CustomObjectsApi(mocker):
+    mocked_CustomObjectsApi_class = mocker.patch('kubernetes.client.CustomObjectsApi')
+    mocker.patch('kubernetes.client.ApiClient')
+    return mocked_CustomObjectsApi_class.return_value
+
+
+def test_get_pods_metrics(mocked_k8s_CustomObjectsApi, mocked_kubeconfig):
+    mocked_k8s_CustomObjectsApi.list_cluster_custom_object.return_value = {'items': [{'metadata': {}}]}
+
+    assert get_pods_metrics() == [{'metadata': {}}]
+    assert mocked_k8s_CustomObjectsApi.list_cluster_custom_object.call_count == 1
+
+
+def test_get_pods_metrics_namespaced(mocked_k8s_CustomObjectsApi, mocked_kubeconfig):
+    mocked_k8s_CustomObjectsApi.list_namespaced_custom_object.return_value = {'items': []}
+
+    assert get_pods_metrics(namespace=test_namespace) == []
+    assert mocked_k8s_CustomObjectsApi.list_namespaced_custom_object.call_count == 1
+
+
+@pytest.mark.parametrize('status', [404, 503])
+def test_get_pods_metrics_not_available(mocked_k8s_CustomObjectsApi, mocked_kubeconfig, status):
+    mocked_k8s_CustomObjectsApi.list_cluster_custom_object.side_effect = ApiException(status=status)
+
+    assert get_pods_metrics() is None
+
+
+def test_get_pods_metrics_error(mocked_k8s_CustomObjectsApi, mocked_kubeconfig):
+    mocked_k8s_CustomObjectsApi.list_cluster_custom_object.side_effect = ApiException(status=500)
+
+    with pytest.raises(ApiException):
+        get_pods_metrics()
+
+
+def test_sum_cpu_resources_unformatted():
+    assert sum_cpu_resources_unformatted(['100m', '0.5', '', '1500000n', '500000n', '1000u']) == 603
+
+
 def test_get_cluster_roles(mocked_k8s_config, mocked_k8s_RbacAuthorizationV1Api):
     roles = get_cluster_roles()
     print(roles)
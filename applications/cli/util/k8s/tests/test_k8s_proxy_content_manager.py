@@ -21,7 +21,7 @@ import pytest
 import requests
 from requests.exceptions import ConnectionError
 
-from util.k8s.k8s_proxy_context_manager import K8sProxy, TunnelSetupError
+from util.k8s.k8s_proxy_context_manager import K8sProxy, TunnelSetupError, shared_tunnels
 from util.app_names import NAUTAAppNames
 from util.exceptions import K8sProxyCloseError, K8sProxyOpenError
 from util.k8s.k8s_proxy_context_manager import kubectl
@@ -44,6 +44,53 @@ def test_set_up_proxy(mocker):
     assert K8sProxy._wait_for_connection_readiness.call_count == 1
 
 
+def test_set_up_proxy_shared_tunnels(mocker):
+    process_mock = mocker.MagicMock()
+    process_mock.poll.return_value = None
+    spf_mock = mocker.patch("util.k8s.k8s_proxy_context_manager.kubectl.start_port_forwarding",
+                            return_value=(process_mock, 1000, 1001))
+    mocker.patch("util.k8s.k8s_proxy_context_manager.threading.Thread")
+    mocker.patch("util.k8s.k8s_proxy_context_manager.K8sProxy._wait_for_connection_readiness")
+    close_tunnel_mock = mocker.patch("util.k8s.k8s_proxy_context_manager.K8sProxy._close_tunnel")
+
+    with shared_tunnels():
+        for _ in range(3):
+            with K8sProxy(NAUTAAppNames.GIT_REPO_MANAGER) as proxy:
+                assert proxy.tunnel_port == 1000
+        with K8sProxy(NAUTAAppNames.ELASTICSEARCH):
+            pass
+
+        assert close_tunnel_mock.call_count == 0
+
+    # one tunnel per application is opened, and all of them are closed at the end
+    assert spf_mock.call_count == 2
+    assert close_tunnel_mock.call_count == 2
+
+    with K8sProxy(NAUTAAppNames.GIT_REPO_MANAGER):
+        pass
+
+    assert spf_mock.call_count == 3
+    assert close_tunnel_mock.call_count == 3
+
+
+def test_set_up_proxy_shared_tunnel_closed(mocker):
+    process_mock = mocker.MagicMock()
+    # tunnel process has exited
+    process_mock.poll.return_value = 1
+    spf_mock = mocker.patch("util.k8s.k8s_proxy_context_manager.kubectl.start_port_forwarding",
+                            return_value=(process_mock, 1000, 1001))
+    mocker.patch("util.k8s.k8s_proxy_context_manager.threading.Thread")
+    mocker.patch("util.k8s.k8s_proxy_context_manager.K8sProxy._wait_for_connection_readiness")
+    mocker.patch("util.k8s.k8s_proxy_context_manager.K8sProxy._close_tunnel")
+
+    with shared_tunnels():
+        for _ in range(2):
+            with K8sProxy(NAUTAAppNames.GIT_REPO_MANAGER):
+                pass
+
+    assert spf_mock.call_count == 2
+
+
 def test_set_up_proxy_open_failure(mocker):
     spf_mock = mocker.patch("util.k8s.k8s_proxy_context_manager.kubectl.start_port_forwarding",
                             side_effect=RuntimeError())
@@ -146,3 +193,18 @@ def test_wait_for_connection_readiness_many_tries_failure(mocker):
 
     # noinspection PyUnresolvedReferences
     assert requests.get.call_count == 15
+
+
+def test_wait_for_connection_readiness_forwarding_started(mocker):
+    mocker.patch('requests.get', side_effect=[ConnectionError, None])
+    sleep_mock = mocker.patch('time.sleep')
+    forwarding_started = mocker.MagicMock()
+    forwarding_started.is_set.return_value = False
+
+    # noinspection PyProtectedMember
+    K8sProxy._wait_for_connection_readiness('localhost', 1234, forwarding_started=forwarding_started)
+
+    # noinspection PyUnresolvedReferences
+    assert requests.get.call_count == 2
+    assert forwarding_started.wait.call_count == 1
+    assert sleep_mock.call_count == 0
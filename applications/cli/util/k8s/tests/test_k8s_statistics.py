@@ -37,7 +37,23 @@ PODS = [V1Pod(metadata=V1ObjectMeta(name="cpu_first_pod", namespace=CPU_USER_NAM
 TOP_RESULTS = [("3m", "200Ki"), ("2m", "400Ki"), ("3m", "200Ki"), ("2m", "400Ki")]
 
 
+PODS_METRICS = [
+    {'metadata': {'name': 'cpu_first_pod', 'namespace': CPU_USER_NAME},
+     'containers': [{'name': 'first', 'usage': {'cpu': '2500000n', 'memory': '100Ki'}},
+                    {'name': 'second', 'usage': {'cpu': '500000n', 'memory': '100Ki'}}]},
+    {'metadata': {'name': 'mem_first_pod', 'namespace': MEM_USER_NAME},
+     'containers': [{'name': 'first', 'usage': {'cpu': '2m', 'memory': '400Ki'}}]},
+    {'metadata': {'name': 'cpu_second_pod', 'namespace': CPU_USER_NAME},
+     'containers': [{'name': 'first', 'usage': {'cpu': '3000u', 'memory': '200Ki'}}]},
+    {'metadata': {'name': 'mem_second_pod', 'namespace': MEM_USER_NAME},
+     'containers': [{'name': 'first', 'usage': {'cpu': '2000000n', 'memory': '400Ki'}}]},
+    {'metadata': {'name': 'tech_pod', 'namespace': 'kube-system'},
+     'containers': [{'name': 'first', 'usage': {'cpu': '100', 'memory': '100Gi'}}]}
+]
+
+
 def test_get_highest_usage_success(mocker):
+    mocker.patch("util.k8s.k8s_statistics.get_pods_metrics", return_value=None)
     get_pods_mock = mocker.patch("util.k8s.k8s_statistics.get_pods")
     get_pods_mock.return_value = PODS
     top_mock = mocker.patch("util.k8s.k8s_statistics.get_top_for_pod")
@@ -53,3 +69,22 @@ def test_get_highest_usage_success(mocker):
     assert top_cpu_users[0].mem_usage == 409600
     assert top_mem_users[0].cpu_usage == 4
     assert top_mem_users[0].mem_usage == 819200
+
+
+def test_get_highest_usage_metrics_api(mocker):
+    mocker.patch("util.k8s.k8s_statistics.get_pods_metrics", return_value=PODS_METRICS)
+    get_pods_mock = mocker.patch("util.k8s.k8s_statistics.get_pods")
+    top_mock = mocker.patch("util.k8s.k8s_statistics.get_top_for_pod")
+
+    top_cpu_users, top_mem_users = get_highest_usage()
+
+    assert get_pods_mock.call_count == 0
+    assert top_mock.call_count == 0
+    assert len(top_cpu_users) == 2
+    assert len(top_mem_users) == 2
+    assert top_cpu_users[0].user_name == CPU_USER_NAME
+    assert top_mem_users[0].user_name == MEM_USER_NAME
+    assert top_cpu_users[0].cpu_usage == 6
+    assert top_cpu_users[0].mem_usage == 409600
+    assert top_mem_users[0].cpu_usage == 4
+    assert top_mem_users[0].mem_usage == 819200
@@ -16,7 +16,7 @@
 
 import os
 
-from util.filesystem import copytree_content, get_total_directory_size_in_bytes
+from util.filesystem import copytree_content, get_total_directory_size_in_bytes, ContentStore
 
 
 def test_copytree_content(mocker):
@@ -59,3 +59,40 @@ def test_get_total_directory_size_in_bytes(tmpdir):
             f.write(os.urandom(file['size']))
 
     assert get_total_directory_size_in_bytes(test_dir) == sum(file['size'] for file in files)
+
+
+def test_content_store_link_tree_content(tmpdir):
+    src_dir = tmpdir.mkdir('src')
+    src_dir.join('file-1.txt').write('content')
+    src_dir.mkdir('subdir').join('file-2.txt').write('content')
+    src_dir.join('ignored.txt').write('ignored')
+
+    content_store = ContentStore(str(tmpdir.join('store')))
+    for run_dir in ('run-1', 'run-2'):
+        content_store.link_tree_content(str(src_dir), str(tmpdir.join(run_dir)), ignored_objects=['ignored.txt'])
+
+    linked_files = [tmpdir.join(run_dir, *path) for run_dir in ('run-1', 'run-2')
+                    for path in (('file-1.txt',), ('subdir', 'file-2.txt'))]
+    assert all(linked_file.read() == 'content' for linked_file in linked_files)
+    # files with the same content are stored once
+    assert len({os.stat(str(linked_file)).st_ino for linked_file in linked_files}) == 1
+    assert not tmpdir.join('run-1', 'ignored.txt').exists()
+
+    content_store.clear()
+
+    assert not tmpdir.join('store').exists()
+    assert all(linked_file.read() == 'content' for linked_file in linked_files)
+
+
+def test_content_store_link_file_links_not_supported(tmpdir, mocker):
+    mocker.patch('os.link', side_effect=OSError)
+    src_file = tmpdir.join('file.txt')
+    src_file.write('content')
+    dst_file = tmpdir.join('dst.txt')
+    dst_file.write('old content')
+
+    content_store = ContentStore(str(tmpdir.join('store')))
+    content_store.link_file(str(src_file), str(dst_file))
+
+    assert dst_file.read() == 'content'
+    assert not content_store.links_supported
@@ -16,13 +16,37 @@
 
 import asyncio
 import datetime
+import logging
+from typing import Dict, List, Optional, Tuple
 
 import kopf
 import pykube
 
+from nauta_resources.informers import PodInformer, RunCache
 from nauta_resources.run import Run, RunStatus
+from nauta_resources.work_queue import WorkQueue
 
-tasks = {}  # dict{namespace: dict{name: asyncio.Task}}
+RunKey = Tuple[str, str]  # (namespace, name)
+
+# Runs which are not in a final state yet, with loggers passed by kopf - messages logged with them are also
+# posted as events of the Run
+monitored_runs: Dict[RunKey, logging.Logger] = {}
+
+# number of Runs reconciled at once
+RECONCILE_WORKERS = 8
+
+# state of a run is recalculated after a change of its pods, but at least once per this interval (in seconds)
+RESYNC_INTERVAL = 60
+
+# interval (in seconds) of logging metrics of the reconcile queue
+METRICS_LOG_INTERVAL = 60
+
+logger = logging.getLogger(__name__)
+
+run_cache = RunCache()
+pod_informer: Optional[PodInformer] = None
+run_queue: Optional[WorkQueue] = None
+workers: List[asyncio.Task] = []
 
 try:
     cfg = pykube.KubeConfig.from_service_account()
@@ -33,6 +57,47 @@ api = pykube.HTTPClient(cfg)
 kopf.EventsConfig.events_loglevel = kopf.config.LOGLEVEL_WARNING
 
 
+def ensure_started():
+    # queue, workers and informer are created lazily, as they must be bound to the event loop of the operator
+    global pod_informer, run_queue
+    if run_queue:
+        return
+
+    run_queue = WorkQueue(name='runs')
+    for _ in range(RECONCILE_WORKERS):
+        workers.append(asyncio.create_task(reconcile_worker()))
+    workers.append(asyncio.create_task(log_queue_metrics()))
+
+    pod_informer = PodInformer(on_change=notify_run_changed)
+    pod_informer.start()
+
+
+def monitor(namespace, name, logger):
+    ensure_started()
+    monitored_runs[(namespace, name)] = logger
+    run_queue.add((namespace, name))
+
+
+def forget_run(namespace, name):
+    monitored_runs.pop((namespace, name), None)
+    if run_queue:
+        run_queue.remove((namespace, name))
+
+
+async def notify_run_changed(namespace, name):
+    # pods of Runs which are not monitored (e.g. already finished) are ignored
+    if (namespace, name) in monitored_runs:
+        run_queue.add((namespace, name))
+
+
+@kopf.on.event('aipg.intel.com', 'v1', 'runs')
+async def handle_run_event(type, body, namespace, name, **kwargs):
+    if type == 'DELETED':
+        run_cache.delete(namespace, name)
+    else:
+        run_cache.update(body)
+
+
 @kopf.on.resume('aipg.intel.com', 'v1', 'runs')
 async def handle_run_on_resume(namespace, name, logger, spec, **kwargs):
     try:
@@ -42,70 +107,95 @@ async def handle_run_on_resume(namespace, name, logger, spec, **kwargs):
 
     if run_state in {RunStatus.COMPLETE, RunStatus.FAILED, RunStatus.CANCELLED}:
         logger.info(f'Run {name} already in final state: {run_state.value}.')
-        if namespace in tasks and name in tasks[namespace]:
-            del tasks[namespace][name]
+        forget_run(namespace, name)
         return
-    elif not tasks.get(namespace, {}).get(name):
-        logger.info(f'Resuming monitoring task for run {name}.')
-        task = asyncio.create_task(monitor_run(namespace, name, logger))
-        tasks.setdefault(namespace, {})
-        tasks[namespace][name] = task
+    elif (namespace, name) not in monitored_runs:
+        logger.info(f'Resuming monitoring of run {name}.')
+        monitor(namespace, name, logger)
 
 
 @kopf.on.create('aipg.intel.com', 'v1', 'runs')
 async def run_created(namespace, name, logger, **kwargs):
     logger.warning(f'Run {name} created.')
-    task = asyncio.create_task(monitor_run(namespace, name, logger))
-    tasks.setdefault(namespace, {})
-    tasks[namespace][name] = task
+    monitor(namespace, name, logger)
 
 
 @kopf.on.delete('aipg.intel.com', 'v1', 'runs')
 async def run_deleted(namespace, name, logger, **kwargs):
     logger.warning(f'Run {name} deleted.')
-    if namespace in tasks and name in tasks[namespace]:
-        task = tasks[namespace][name]
-        task.cancel()  # it will also remove from `tasks`
+    forget_run(namespace, name)
 
 
-async def monitor_run(namespace, name, logger):
-    interval = 1
-    retry_counter = 0
-    retry_limit = 5
+async def reconcile_worker():
     while True:
+        key = await run_queue.get()
+        namespace, name = key
+        run_logger = monitored_runs.get(key, logger)
         try:
-            await asyncio.sleep(interval)
-            logger.debug(f'Monitoring Run {name}')
-            run: Run = await Run.get(name=name, namespace=namespace)
-
-            if run.state in {RunStatus.COMPLETE, RunStatus.FAILED, RunStatus.CANCELLED}:
-                logger.info(f'Run {name} reached final state: {run.state.value}.')
-                if namespace in tasks and name in tasks[namespace]:
-                    del tasks[namespace][name]
-                return
-
-            state_to_set = await run.calculate_current_state()
-            if run.state is not state_to_set:
-                logger.warning(f'Run {name} state changed from {run.state.value} to {state_to_set.value}')
-                utc_timestamp = datetime.datetime.utcnow().replace(microsecond=0).isoformat()
-                if run.state is RunStatus.QUEUED:
-                    logger.info(f'Setting Run {name} start time.')
-                    run.start_timestamp = f'{utc_timestamp}Z'
-                if run.state in {RunStatus.QUEUED, RunStatus.RUNNING} and \
-                        state_to_set not in {RunStatus.QUEUED, RunStatus.RUNNING}:
-                    logger.info(f'Setting Run {name} end time.')
-                    run.end_timestamp = f'{utc_timestamp}Z'
-                run.state = state_to_set
-                await run.update()
-
+            if key not in monitored_runs:
+                continue
+            keep_monitoring = await reconcile_run(namespace, name, run_logger)
+            run_queue.forget(key)
+            if keep_monitoring:
+                run_queue.add_after(key, RESYNC_INTERVAL)
+            else:
+                forget_run(namespace, name)
         except asyncio.CancelledError:
-            logger.info(f'Monitoring of Run {name} is cancelled')
-            if namespace in tasks and name in tasks[namespace]:
-                del tasks[namespace][name]
-            return
+            raise
         except Exception:
-            logger.exception(f'Unexpected error encountered when monitoring Run {name}.')
-            retry_counter += 1
-            logger.exception(f'Monitoring attempt: #{retry_counter}, retry limit: #{retry_limit}.')
-            if retry_counter >= retry_limit:
-                raise
+            run_logger.exception(f'Unexpected error encountered when monitoring Run {name}.')
+            run_queue.add_rate_limited(key)
+            run_logger.error(f'Monitoring attempt: #{run_queue.get_retries(key)}, '
+                             f'retrying in the background with backoff.')
+        finally:
+            run_queue.done(key)
+
+
+async def reconcile_run(namespace, name, logger) -> bool:
+    """
+    Updates state of the Run basing on state of its pods.
+    :return: False if the Run doesn't have to be monitored anymore
+    """
+    logger.debug(f'Monitoring Run {name}')
+    run: Run = run_cache.get(namespace=namespace, name=name) or await Run.get(name=name, namespace=namespace)
+
+    if not run:
+        logger.info(f'Run {name} no longer exists.')
+        return False
+
+    if run.state in {RunStatus.COMPLETE, RunStatus.FAILED, RunStatus.CANCELLED}:
+        logger.info(f'Run {name} reached final state: {run.state.value}.')
+        return False
+
+    # until the informer has listed all pods, they are fetched from Kubernetes API
+    pod_phases = pod_informer.get_pod_phases(namespace, name) if pod_informer.synced.is_set() else None
+    state_to_set = await run.calculate_current_state(pod_phases=pod_phases)
+    if run.state is not state_to_set:
+        logger.warning(f'Run {name} state changed from {run.state.value} to {state_to_set.value}')
+        utc_timestamp = datetime.datetime.utcnow().replace(microsecond=0).isoformat()
+        if run.state is RunStatus.QUEUED:
+            logger.info(f'Setting Run {name} start time.')
+            run.start_timestamp = f'{utc_timestamp}Z'
+        if run.state in {RunStatus.QUEUED, RunStatus.RUNNING} and \
+                state_to_set not in {RunStatus.QUEUED, RunStatus.RUNNING}:
+            logger.info(f'Setting Run {name} end time.')
+            run.end_timestamp = f'{utc_timestamp}Z'
+        run.state = state_to_set
+        updated_run = await run.update()
+        # cache is refreshed at once - the next check must not use the state from before the update
+        if updated_run:
+            run_cache.update(updated_run)
+
+    return state_to_set not in {RunStatus.COMPLETE, RunStatus.FAILED, RunStatus.CANCELLED}
+
+
+async def log_queue_metrics():
+    while True:
+        await asyncio.sleep(METRICS_LOG_INTERVAL)
+        metrics = run_queue.get_metrics()
+        logger.info(f'Reconcile queue {run_queue.name}: monitored runs: {len(monitored_runs)}, '
+                    f'depth: {metrics["depth"]}, in progress: {metrics["processing"]}, '
+                    f'delayed: {metrics["delayed"]}, retries: {metrics["retries"]}, '
+                    f'reconciled: {metrics["processed"]}, '
+                    f'reconcile latency avg/max: {metrics["processing_time_avg"]:.3f}s/'
+                    f'{metrics["processing_time_max"]:.3f}s')
@@ -0,0 +1,186 @@
+#
+# Copyright (c) 2019 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import asyncio
+import copy
+import http
+import logging
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from kubernetes_asyncio import watch
+
+from nauta_resources.platform_resource import K8SApiClient
+from nauta_resources.run import Run
+
+logger = logging.getLogger(__name__)
+
+RUN_NAME_LABEL = 'runName'
+
+RunKey = Tuple[str, str]  # (namespace, name)
+
+
+class RunCache:
+    """
+    Local copy of Run objects, indexed by namespace and name. It is filled from events of the Run watch
+    maintained by kopf, so reading a Run doesn't require a call to Kubernetes API. A cached Run is replaced
+    only with a newer version of it - an event delivered after the Run was updated (and cached) by the operator
+    may carry an older version.
+    """
+
+    def __init__(self):
+        self._runs: Dict[RunKey, dict] = {}
+
+    def update(self, body: dict):
+        metadata = body.get('metadata', {})
+        key = (metadata.get('namespace'), metadata.get('name'))
+        cached_body = self._runs.get(key)
+        if cached_body and is_older_version(metadata.get('resourceVersion'),
+                                            cached_body.get('metadata', {}).get('resourceVersion')):
+            logger.debug(f'Ignoring outdated version {metadata.get("resourceVersion")} of Run {key[1]}.')
+            return
+        self._runs[key] = copy.deepcopy(dict(body))
+
+    def delete(self, namespace: str, name: str):
+        self._runs.pop((namespace, name), None)
+
+    def get(self, namespace: str, name: str) -> Optional[Run]:
+        body = self._runs.get((namespace, name))
+        # copy is returned, as Run.from_k8s_response_dict() and Run setters modify the body
+        return Run.from_k8s_response_dict(copy.deepcopy(body)) if body else None
+
+
+def is_older_version(resource_version: Optional[str], other_resource_version: Optional[str]) -> bool:
+    """
+    Returns True if resource_version is older than other_resource_version. Resource versions are assigned by
+    Kubernetes API in increasing order, but they are not guaranteed to be integers - versions which can't be
+    compared are not considered older.
+    """
+    try:
+        return int(resource_version) < int(other_resource_version)  # type: ignore
+    except (TypeError, ValueError):
+        return False
+
+
+class PodInformer:
+    """
+    Cluster-wide cache of phases of Runs' pods (pods labelled with runName), indexed by namespace and Run
+    name. It is filled with a single list call and kept up to date with a single watch, instead of listing
+    pods of every Run separately. After every change of a pod, on_change callback is called with namespace
+    and name of its Run.
+    """
+    WATCH_TIMEOUT_SECONDS = 300
+    RETRY_DELAY_SECONDS = 5
+
+    def __init__(self, on_change: Callable[[str, str], Awaitable] = None):
+        self.on_change = on_change
+        # set when the cache contains all pods existing in the cluster
+        self.synced = asyncio.Event()
+
+        self._pod_phases: Dict[RunKey, Dict[str, str]] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if not self._task:
+            self._task = asyncio.create_task(self.run())
+
+    def stop(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+    def get_pod_phases(self, namespace: str, run_name: str) -> List[str]:
+        return list(self._pod_phases.get((namespace, run_name), {}).values())
+
+    async def run(self):
+        while True:
+            try:
+                resource_version = await self._list()
+                self.synced.set()
+                await self._watch(resource_version)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception(f'Watching Run pods failed, retrying in {self.RETRY_DELAY_SECONDS} seconds.')
+                self.synced.clear()
+                await asyncio.sleep(self.RETRY_DELAY_SECONDS)
+
+    async def _list(self) -> str:
+        api = await K8SApiClient.get()
+        pods = await api.list_pod_for_all_namespaces(label_selector=RUN_NAME_LABEL)
+
+        previous_keys = set(self._pod_phases)
+        self._pod_phases = {}
+        for pod in pods.items:
+            self._set_phase(namespace=pod.metadata.namespace, run_name=pod.metadata.labels[RUN_NAME_LABEL],
+                            pod_name=pod.metadata.name, phase=pod.status.phase)
+
+        # pods could have changed while the cache was not synced - all affected Runs are checked
+        for namespace, run_name in previous_keys | set(self._pod_phases):
+            await self._notify(namespace, run_name)
+
+        return pods.metadata.resource_version
+
+    async def _watch(self, resource_version: str):
+        api = await K8SApiClient.get()
+
+        pods_watch = watch.Watch()
+
+        # watch ends after timeout (or when the stream is closed by the server) and is restarted from the last
+        # seen resourceVersion - if it is too old, the whole list is fetched again
+        while True:
+            async with pods_watch.stream(api.list_pod_for_all_namespaces, label_selector=RUN_NAME_LABEL,
+                                         resource_version=resource_version,
+                                         timeout_seconds=self.WATCH_TIMEOUT_SECONDS) as stream:
+                async for event in stream:
+                    pod = event['raw_object']
+
+                    if event['type'] == 'ERROR':
+                        if pod.get('code') == http.HTTPStatus.GONE:
+                            logger.info('Watch of Run pods expired, listing pods again.')
+                            return
+                        raise RuntimeError(f'Watch of Run pods failed: {pod}')
+
+                    metadata = pod['metadata']
+                    resource_version = metadata['resourceVersion']
+                    namespace = metadata['namespace']
+                    run_name = metadata.get('labels', {}).get(RUN_NAME_LABEL)
+                    if not run_name:
+                        continue
+
+                    if event['type'] == 'DELETED':
+                        self._delete_phase(namespace=namespace, run_name=run_name, pod_name=metadata['name'])
+                    else:
+                        self._set_phase(namespace=namespace, run_name=run_name, pod_name=metadata['name'],
+                                        phase=pod.get('status', {}).get('phase'))
+
+                    await self._notify(namespace, run_name)
+
+    def _set_phase(self, namespace: str, run_name: str, pod_name: str, phase: Optional[str]):
+        # phase of a just created pod may be not set yet
+        self._pod_phases.setdefault((namespace, run_name), {})[pod_name] = phase or 'Pending'
+
+    def _delete_phase(self, namespace: str, run_name: str, pod_name: str):
+        pods = self._pod_phases.get((namespace, run_name), {})
+        pods.pop(pod_name, None)
+        if not pods:
+            self._pod_phases.pop((namespace, run_name), None)
+
+    async def _notify(self, namespace: str, run_name: str):
+        if self.on_change:
+            try:
+                await self.on_change(namespace, run_name)
+            except Exception:
+                logger.exception(f'Handling change of pods of Run {run_name} failed.')
@@ -216,19 +216,25 @@ class Run(CustomResource):
             if e.status != HTTPStatus.NOT_FOUND:
                 raise
 
-    async def calculate_current_state(self) -> RunStatus:
+    async def calculate_current_state(self, pod_phases: List[str] = None) -> RunStatus:
+        """
+        :param pod_phases: phases of pods of this Run, e.g. taken from a local cache - if not given,
+         pods are fetched from Kubernetes API
+        """
         # Check final statuses first
         if self.state in {RunStatus.COMPLETE, RunStatus.FAILED, RunStatus.CANCELLED}:
             return self.state
 
-        pods = await self.get_pods()
+        if pod_phases is None:
+            pods = await self.get_pods()
+            pod_phases = [pod.status.phase for pod in pods] if pods else []
 
-        if pods and any(pod.status.phase == 'Failed' for pod in pods):
+        if pod_phases and any(phase == 'Failed' for phase in pod_phases):
             return RunStatus.FAILED
-        elif not pods or (pods and any(pod.status.phase in {'Pending', 'Unknown'} for pod in pods)
-                          and self.state is not RunStatus.RUNNING):
+        elif not pod_phases or (any(phase in {'Pending', 'Unknown'} for phase in pod_phases)
+                                and self.state is not RunStatus.RUNNING):
             return RunStatus.QUEUED
-        elif pods and all(pod.status.phase == 'Succeeded' for pod in pods):
+        elif all(phase == 'Succeeded' for phase in pod_phases):
             return RunStatus.COMPLETE
         else:
             return RunStatus.RUNNING
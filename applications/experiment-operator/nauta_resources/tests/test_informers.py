@@ -0,0 +1,122 @@
+#
+# Copyright (c) 2019 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+from unittest.mock import MagicMock
+
+import pytest
+from kubernetes_asyncio.client import V1Pod, V1PodStatus, V1PodList, V1ObjectMeta, V1ListMeta
+from asynctest import CoroutineMock
+
+from nauta_resources.informers import PodInformer, RunCache, is_older_version
+from nauta_resources.platform_resource import K8SApiClient
+from nauta_resources.run import RunStatus
+
+RUN_BODY = {
+    'apiVersion': 'aipg.intel.com/v1',
+    'kind': 'Run',
+    'metadata': {'name': 'test-run', 'namespace': 'test-ns'},
+    'spec': {'state': 'RUNNING', 'pod-count': 2}
+}
+
+
+def run_body(state: str, resource_version: str) -> dict:
+    return {**RUN_BODY, 'metadata': {**RUN_BODY['metadata'], 'resourceVersion': resource_version},
+            'spec': {**RUN_BODY['spec'], 'state': state}}
+
+
+@pytest.fixture(scope='function')
+def mock_k8s_api_client():
+    k8s_api_mock = MagicMock()
+    K8SApiClient.core_api = k8s_api_mock
+
+    k8s_api_mock.list_pod_for_all_namespaces = CoroutineMock()
+    yield k8s_api_mock
+
+    K8SApiClient.core_api = None
+
+
+def test_run_cache():
+    run_cache = RunCache()
+    run_cache.update(RUN_BODY)
+
+    run = run_cache.get(namespace='test-ns', name='test-run')
+    assert run.name == 'test-run'
+    assert run.state == RunStatus.RUNNING
+
+    # changes of a returned Run don't modify the cache
+    run.state = RunStatus.COMPLETE
+    assert run_cache.get(namespace='test-ns', name='test-run').state == RunStatus.RUNNING
+
+    run_cache.delete(namespace='test-ns', name='test-run')
+    assert run_cache.get(namespace='test-ns', name='test-run') is None
+
+
+def test_run_cache_ignores_outdated_version():
+    run_cache = RunCache()
+    run_cache.update(run_body(state='QUEUED', resource_version='10'))
+    # Run updated by the operator
+    run_cache.update(run_body(state='RUNNING', resource_version='12'))
+    # event of the previous version, delivered after the update
+    run_cache.update(run_body(state='QUEUED', resource_version='10'))
+
+    assert run_cache.get(namespace='test-ns', name='test-run').state == RunStatus.RUNNING
+
+    # event of the update and of later changes
+    run_cache.update(run_body(state='RUNNING', resource_version='12'))
+    run_cache.update(run_body(state='COMPLETE', resource_version='13'))
+
+    assert run_cache.get(namespace='test-ns', name='test-run').state == RunStatus.COMPLETE
+
+
+@pytest.mark.parametrize('resource_version,other_resource_version,older', [
+    ('9', '10', True),
+    ('10', '10', False),
+    ('11', '10', False),
+    (None, '10', False),
+    ('abc', '10', False)
+])
+def test_is_older_version(resource_version, other_resource_version, older):
+    assert is_older_version(resource_version, other_resource_version) == older
+
+
+@pytest.mark.asyncio
+async def test_pod_informer_list(mock_k8s_api_client):
+    def pod(name, run_name, phase):
+        return V1Pod(metadata=V1ObjectMeta(name=name, namespace='test-ns', labels={'runName': run_name}),
+                     status=V1PodStatus(phase=phase))
+
+    mock_k8s_api_client.list_pod_for_all_namespaces.return_value = \
+        V1PodList(items=[pod('pod-1', 'run-1', 'Running'), pod('pod-2', 'run-1', None),
+                         pod('pod-3', 'run-2', 'Succeeded')],
+                  metadata=V1ListMeta(resource_version='123'))
+    on_change = CoroutineMock()
+
+    informer = PodInformer(on_change=on_change)
+    resource_version = await informer._list()
+
+    assert resource_version == '123'
+    assert sorted(informer.get_pod_phases('test-ns', 'run-1')) == ['Pending', 'Running']
+    assert informer.get_pod_phases('test-ns', 'run-2') == ['Succeeded']
+    assert informer.get_pod_phases('test-ns', 'run-3') == []
+    assert on_change.call_count == 2
+
+
+def test_pod_informer_delete_phase():
+    informer = PodInformer()
+    informer._set_phase(namespace='test-ns', run_name='run-1', pod_name='pod-1', phase='Running')
+    informer._delete_phase(namespace='test-ns', run_name='run-1', pod_name='pod-1')
+
+    assert informer.get_pod_phases('test-ns', 'run-1') == []
@@ -237,6 +237,21 @@ async def test_calculate_run_state_complete(mocker):
 
     run = Run(name=RUN_NAME, experiment_name='fake', state=RunStatus.COMPLETE)
     assert await run.calculate_current_state() == RunStatus.COMPLETE
+
+
+@pytest.mark.parametrize('pod_phases,state', [([], RunStatus.QUEUED),
+                                              (['Pending', 'Running'], RunStatus.QUEUED),
+                                              (['Running', 'Succeeded'], RunStatus.RUNNING),
+                                              (['Succeeded', 'Succeeded'], RunStatus.COMPLETE),
+                                              (['Running', 'Failed'], RunStatus.FAILED)])
+@pytest.mark.asyncio
+async def test_calculate_run_state_from_pod_phases(mocker, pod_phases, state):
+    get_pods_mock = mocker.patch('nauta_resources.run.Run.get_pods', new=CoroutineMock())
+
+    run = Run(name=RUN_NAME, experiment_name='fake')
+
+    assert await run.calculate_current_state(pod_phases=pod_phases) == state
+    assert get_pods_mock.call_count == 0
     
     
 LIST_RUNS_RESPONSE_RAW = \
@@ -0,0 +1,76 @@
+#
+# Copyright (c) 2019 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import asyncio
+
+import pytest
+
+from nauta_resources.work_queue import WorkQueue
+
+
+@pytest.mark.asyncio
+async def test_add_deduplicates_keys():
+    queue = WorkQueue(name='test')
+    queue.add('run-1')
+    queue.add('run-1')
+    queue.add('run-2')
+
+    assert len(queue) == 2
+    assert await queue.get() == 'run-1'
+    assert await queue.get() == 'run-2'
+
+
+@pytest.mark.asyncio
+async def test_key_added_during_processing_is_queued_after_done():
+    queue = WorkQueue(name='test')
+    queue.add('run-1')
+    key = await queue.get()
+
+    queue.add('run-1')
+    assert len(queue) == 0
+
+    queue.done(key)
+    assert len(queue) == 1
+    assert queue.get_metrics()['processed'] == 1
+
+
+@pytest.mark.asyncio
+async def test_add_rate_limited():
+    queue = WorkQueue(name='test', base_retry_delay=0.01)
+    queue.add_rate_limited('run-1')
+    queue.add_rate_limited('run-1')
+
+    assert queue.get_retries('run-1') == 2
+    assert len(queue) == 0
+
+    assert await asyncio.wait_for(queue.get(), timeout=1) == 'run-1'
+
+    queue.forget('run-1')
+    assert queue.get_retries('run-1') == 0
+    assert queue.get_metrics()['retries'] == 2
+
+
+@pytest.mark.asyncio
+async def test_remove():
+    queue = WorkQueue(name='test')
+    queue.add('run-1')
+    queue.add_after('run-2', 60)
+    queue.remove('run-1')
+    queue.remove('run-2')
+
+    metrics = queue.get_metrics()
+    assert metrics['depth'] == 0
+    assert metrics['delayed'] == 0
@@ -0,0 +1,147 @@
+#
+# Copyright (c) 2019 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import asyncio
+import time
+from collections import deque
+from typing import Deque, Dict, Hashable, Set
+
+
+class WorkQueue:
+    """
+    Queue of keys of objects to reconcile. A key is queued at most once, no matter how many times it was
+    added, and it is never processed by two workers at once - if it is added while being processed, it is
+    queued again after the processing is done. Keys which failed to reconcile are added again with a delay
+    growing exponentially with the number of consecutive failures.
+    """
+
+    def __init__(self, name: str, base_retry_delay: float = 1.0, max_retry_delay: float = 300.0):
+        self.name = name
+        self.base_retry_delay = base_retry_delay
+        self.max_retry_delay = max_retry_delay
+
+        self._queue: Deque[Hashable] = deque()
+        self._dirty: Set[Hashable] = set()
+        self._processing: Dict[Hashable, float] = {}  # key: time when processing has started
+        self._delayed: Dict[Hashable, asyncio.TimerHandle] = {}
+        self._failures: Dict[Hashable, int] = {}
+        self._not_empty = asyncio.Condition()
+
+        self.adds_count = 0
+        self.retries_count = 0
+        self.processed_count = 0
+        self.processing_time_sum = 0.0
+        self.processing_time_max = 0.0
+
+    def __len__(self):
+        return len(self._queue)
+
+    def add(self, key: Hashable):
+        self._cancel_delayed(key)
+        if key in self._dirty:
+            return
+
+        self.adds_count += 1
+        self._dirty.add(key)
+        if key not in self._processing:
+            self._queue.append(key)
+            asyncio.create_task(self._notify())
+
+    def add_after(self, key: Hashable, delay: float):
+        if delay <= 0:
+            self.add(key)
+            return
+
+        loop = asyncio.get_event_loop()
+        when = loop.time() + delay
+        pending = self._delayed.get(key)
+        # only the earliest of delayed additions of a key is kept
+        if pending and pending.when() <= when:
+            return
+        self._cancel_delayed(key)
+        self._delayed[key] = loop.call_at(when, self.add, key)
+
+    def add_rate_limited(self, key: Hashable):
+        failures = self._failures.get(key, 0)
+        self._failures[key] = failures + 1
+        self.retries_count += 1
+        self.add_after(key, min(self.base_retry_delay * 2 ** failures, self.max_retry_delay))
+
+    def forget(self, key: Hashable):
+        """
+        Resets the retry delay of the key. It should be called after the key was reconciled successfully.
+        """
+        self._failures.pop(key, None)
+
+    def remove(self, key: Hashable):
+        """
+        Stops tracking of the key, e.g. after its object was deleted. If the key is being processed, it's not
+        interrupted.
+        """
+        self.forget(key)
+        self._cancel_delayed(key)
+        if key in self._dirty:
+            self._dirty.discard(key)
+            try:
+                self._queue.remove(key)
+            except ValueError:
+                pass
+
+    def get_retries(self, key: Hashable) -> int:
+        return self._failures.get(key, 0)
+
+    async def get(self) -> Hashable:
+        async with self._not_empty:
+            await self._not_empty.wait_for(lambda: self._queue)
+            key = self._queue.popleft()
+
+        self._dirty.discard(key)
+        self._processing[key] = time.monotonic()
+        return key
+
+    def done(self, key: Hashable):
+        started = self._processing.pop(key, None)
+        if started is not None:
+            processing_time = time.monotonic() - started
+            self.processed_count += 1
+            self.processing_time_sum += processing_time
+            self.processing_time_max = max(self.processing_time_max, processing_time)
+
+        # key was added again while it was processed
+        if key in self._dirty:
+            self._queue.append(key)
+            asyncio.create_task(self._notify())
+
+    def get_metrics(self) -> dict:
+        return {
+            'depth': len(self._queue),
+            'processing': len(self._processing),
+            'delayed': len(self._delayed),
+            'adds': self.adds_count,
+            'retries': self.retries_count,
+            'processed': self.processed_count,
+            'processing_time_avg': self.processing_time_sum / self.processed_count if self.processed_count else 0.0,
+            'processing_time_max': self.processing_time_max
+        }
+
+    def _cancel_delayed(self, key: Hashable):
+        pending = self._delayed.pop(key, None)
+        if pending:
+            pending.cancel()
+
+    async def _notify(self):
+        async with self._not_empty:
+            self._not_empty.notify()
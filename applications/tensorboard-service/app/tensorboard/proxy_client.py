@@ -24,14 +24,20 @@ import requests
 import requests.exceptions
 
 
-def try_get_last_request_datetime(proxy_address: str) -> Optional[datetime]:
+DEFAULT_TIMEOUT = 5
+
+
+def try_get_last_request_datetime(proxy_address: str, timeout: float = DEFAULT_TIMEOUT) -> Optional[datetime]:
     # sometimes proxy times out with the response and that's okay - it might be too busy with getting the last request
     # timestamp. try again shortly - it should return proper response.
     try:
-        proxy_response = requests.get(f'http://{proxy_address}/inactivity', timeout=5)
+        proxy_response = requests.get(f'http://{proxy_address}/inactivity', timeout=timeout)
     except requests.exceptions.ConnectionError:
         log.exception('connection to proxy failed')
         return None
+    except requests.exceptions.Timeout:
+        log.warning(f'proxy {proxy_address} did not respond in {timeout} seconds')
+        return None
 
     proxy_resonse_body = proxy_response.content.decode('utf-8')
 
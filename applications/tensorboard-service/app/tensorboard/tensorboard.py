@@ -14,10 +14,12 @@
 # limitations under the License.
 #
 
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from http import HTTPStatus
 import logging as log
 from os import path
+from time import monotonic
 from typing import List, Optional
 from uuid import uuid4
 
@@ -37,6 +39,11 @@ class TensorboardManager:
     OUTPUT_PUBLIC_MOUNT_PATH = '/mnt/output'
     NGINX_INGRESS_ADDRESS = 'nauta-ingress.nauta'
 
+    # number of tensorboards checked (and removed) concurrently during garbage collection
+    GARBAGE_COLLECTION_WORKERS = 16
+    # garbage collection sweep runs every few seconds - unresponsive proxy is just checked again in the next one
+    PROXY_PROBE_TIMEOUT = 2.0
+
     def __init__(self, namespace: str, api_client: K8SAPIClient,
                  config: NautaPlatformConfig):
         self.client = api_client
@@ -202,19 +209,44 @@ class TensorboardManager:
 
         self.refresh_garbage_timeout()
 
-        for deployment in tensorboards:
-            meta: V1ObjectMeta = deployment.metadata
-            deployment_name = meta.name
+        sweep_start = monotonic()
+
+        with ThreadPoolExecutor(max_workers=TensorboardManager.GARBAGE_COLLECTION_WORKERS) as executor:
+            last_request_datetimes = executor.map(self._try_get_last_request_datetime, tensorboards)
+
+            garbage = [deployment for deployment, last_request_datetime in zip(tensorboards, last_request_datetimes)
+                       if self._is_garbage(last_request_datetime)]
+
+            removed = sum(executor.map(self._try_delete_garbage, garbage))
+
+        log.info(f'garbage collection sweep: {len(tensorboards)} tensorboards checked, {removed} of {len(garbage)} '
+                 f'garbage tensorboards removed in {monotonic() - sweep_start:.3f} seconds')
+
+    @staticmethod
+    def _try_get_last_request_datetime(deployment: V1Deployment) -> Optional[datetime]:
+        return try_get_last_request_datetime(proxy_address=deployment.metadata.name,
+                                             timeout=TensorboardManager.PROXY_PROBE_TIMEOUT)
+
+    def _is_garbage(self, last_request_datetime: Optional[datetime]) -> bool:
+        if last_request_datetime is None:
+            return False
+
+        delta = TensorboardManager._get_current_datetime() - last_request_datetime
+        return delta >= timedelta(seconds=self.get_garbage_timeout())
+
+    def _try_delete_garbage(self, deployment: V1Deployment) -> bool:
+        meta: V1ObjectMeta = deployment.metadata
 
-            last_request_datetime = try_get_last_request_datetime(proxy_address=deployment_name)
-            if last_request_datetime is None:
-                continue
+        log.debug(f'garbage detected: {meta.name} , removing...')
+        try:
+            self.delete(deployment)
+        except Exception:
+            # removal is repeated in the next sweep
+            log.exception(f'failed to remove garbage: {meta.name}')
+            return False
 
-            delta = TensorboardManager._get_current_datetime() - last_request_datetime
-            if delta >= timedelta(seconds=self.get_garbage_timeout()):
-                log.debug(f'garbage detected: {meta.name} , removing...')
-                self.delete(deployment)
-                log.debug(f'garbage removed: {meta.name}')
+        log.debug(f'garbage removed: {meta.name}')
+        return True
 
     @staticmethod
     def validate_runs(runs: List[Run]) -> (List[Run], List[Run]):
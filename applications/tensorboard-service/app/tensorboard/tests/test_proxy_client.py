@@ -41,6 +41,15 @@ def test_try_get_last_request_datetime_raise_known_ex(mocker):
     assert last_request_datetimestamp is None
 
 
+def test_try_get_last_request_datetime_timeout(mocker):
+    mocker.patch('requests.get').side_effect = requests.exceptions.ReadTimeout
+
+    last_request_datetimestamp = tensorboard.proxy_client.try_get_last_request_datetime(proxy_address='fake',
+                                                                                         timeout=1)
+
+    assert last_request_datetimestamp is None
+
+
 def test_try_get_last_request_datetime_raise_unknown_ex(mocker):
     mocker.patch('requests.get').side_effect = TypeError
 
@@ -382,6 +382,49 @@ def test_delete_garbage(mocker, tensorboard_manager_mocked: TensorboardManager,
     assert tensorboard_manager_mocked.delete.call_count == delete_count
 
 
+# noinspection PyShadowingNames
+def test_delete_garbage_many_tensorboards(mocker, tensorboard_manager_mocked: TensorboardManager):
+    mocker.patch.object(TensorboardManager, '_get_current_datetime').return_value = \
+        datetime(year=2018, month=6, day=19, hour=13, minute=0)
+    mocker.patch.object(tensorboard_manager_mocked, 'list').return_value = [
+        V1Deployment(metadata=V1ObjectMeta(name=f'fake-name-{i}')) for i in range(50)
+    ]
+    mocker.patch.object(tensorboard_manager_mocked, 'delete')
+
+    def fake_last_request_datetime(proxy_address: str, timeout: float):
+        if int(proxy_address.split('-')[-1]) % 2:
+            return None
+        return datetime(year=2018, month=6, day=19, hour=12, minute=0)
+
+    mocker.patch.object(tensorboard.tensorboard, 'try_get_last_request_datetime', new=fake_last_request_datetime)
+    mocker.patch.object(tensorboard_manager_mocked, 'refresh_garbage_timeout')
+    mocker.patch.object(tensorboard_manager_mocked, 'get_garbage_timeout').return_value = 1800
+    tensorboard_manager_mocked.delete_garbage()
+
+    # noinspection PyUnresolvedReferences
+    deleted = {call[0][0].metadata.name for call in tensorboard_manager_mocked.delete.call_args_list}
+    assert deleted == {f'fake-name-{i}' for i in range(0, 50, 2)}
+
+
+# noinspection PyShadowingNames
+def test_delete_garbage_delete_failure(mocker, tensorboard_manager_mocked: TensorboardManager):
+    mocker.patch.object(TensorboardManager, '_get_current_datetime').return_value = \
+        datetime(year=2018, month=6, day=19, hour=13, minute=0)
+    mocker.patch.object(tensorboard_manager_mocked, 'list').return_value = [
+        V1Deployment(metadata=V1ObjectMeta(name='fake-name-1')), V1Deployment(metadata=V1ObjectMeta(name='fake-name-2'))
+    ]
+    mocker.patch.object(tensorboard_manager_mocked, 'delete').side_effect = [ApiException(status=500), None]
+    mocker.patch.object(tensorboard.tensorboard, 'try_get_last_request_datetime').\
+        return_value = datetime(year=2018, month=6, day=19, hour=12, minute=0)
+    mocker.patch.object(tensorboard_manager_mocked, 'refresh_garbage_timeout')
+    mocker.patch.object(tensorboard_manager_mocked, 'get_garbage_timeout').return_value = 1800
+
+    tensorboard_manager_mocked.delete_garbage()
+
+    # noinspection PyUnresolvedReferences
+    assert tensorboard_manager_mocked.delete.call_count == 2
+
+
 def test_delete_garbage_gateway_timeout(mocker, tensorboard_manager_mocked: TensorboardManager):
     mocker.patch.object(tensorboard_manager_mocked, 'list').side_effect = ApiException(
         status=HTTPStatus.GATEWAY_TIMEOUT.value